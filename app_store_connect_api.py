@@ -2,18 +2,44 @@
 Core API logic for App Store Connect.
 This file contains the business logic for fetching data,
 which can be used by both the MCP server and a web server.
+Functions exposed as MCP tools are declared on ``registry`` together with
+their input schemas.
 """
 
 from appstore_service.app_store import AppStore
+from result_encoding import ResultEncoder
+from server_logging import dropped_records
+from tool_registry import Param, ToolRegistry
 
 app_store_instance = AppStore()
+registry = ToolRegistry(
+    fields=Param(
+        "fields", "array",
+        "Attribute names to keep on each returned resource (e.g. ['name', 'bundleId']). "
+        "Omit to get every attribute.",
+        items={"type": "string"}))
 
+# Relationships each tool keeps in its results; all others, and every
+# ``links`` object, are stripped before the result is sent.
+RESULT_PROJECTIONS = {
+    "app-store-connect/list-builds": ("preReleaseVersion",),
+}
+result_encoder = ResultEncoder(RESULT_PROJECTIONS)
 
+BUNDLE_ID = Param("bundle_id", "string", "The bundle ID of the app", required=True)
+GROUP_ID = Param("group_id", "string", "The ID of the beta group", required=True)
+
+
+@registry.tool("app-store-connect/list-apps", "List all apps in App Store Connect")
 def list_apps():
     """Returns a list of applications."""
     return app_store_instance.list_apps()
 
 
+@registry.tool(
+    "app-store-connect/get-app-info",
+    "Get detailed information about an app",
+    bundleId=BUNDLE_ID)
 def get_app_info(bundle_id):
     """Returns detailed information for a single app."""
     if not bundle_id:
@@ -21,6 +47,10 @@ def get_app_info(bundle_id):
     return app_store_instance.get_app_info(bundle_id)
 
 
+@registry.tool(
+    "app-store-connect/list-beta-testers",
+    "List all beta testers in a specific group",
+    groupId=GROUP_ID)
 def list_beta_testers(group_id):
     """Returns a list of beta testers for a specific group."""
     if not group_id:
@@ -28,6 +58,10 @@ def list_beta_testers(group_id):
     return app_store_instance.list_testers_in_group(group_id)
 
 
+@registry.tool(
+    "app-store-connect/list-beta-groups",
+    "List all beta groups for an app",
+    bundleId=BUNDLE_ID)
 def list_beta_groups(bundle_id):
     """Returns a list of beta groups for an app."""
     if not bundle_id:
@@ -35,6 +69,10 @@ def list_beta_groups(bundle_id):
     return app_store_instance.get_beta_groups(bundle_id)
 
 
+@registry.tool(
+    "app-store-connect/list-testers-in-group",
+    "List all beta testers in a specific group",
+    groupId=GROUP_ID)
 def list_testers_in_group(group_id):
     """Returns a list of beta testers for a specific group."""
     if not group_id:
@@ -42,6 +80,10 @@ def list_testers_in_group(group_id):
     return app_store_instance.list_testers_in_group(group_id)
 
 
+@registry.tool(
+    "app-store-connect/list-builds",
+    "List all builds for an app",
+    bundleId=BUNDLE_ID)
 def list_builds(bundle_id):
     """Returns a list of builds for an app."""
     if not bundle_id:
@@ -49,6 +91,16 @@ def list_builds(bundle_id):
     return app_store_instance.get_builds(bundle_id)
 
 
+@registry.tool(
+    "app-store-connect/release-version",
+    "Release a new version of an app",
+    bundleId=BUNDLE_ID,
+    version=Param("version_string", "string",
+                  "The version string to release (e.g., '1.2.3')", required=True),
+    buildNumber=Param("build_number", "string",
+                      "The build number corresponding to the version", required=True),
+    platform=Param("platform", "string",
+                   "The platform of the app (e.g., 'IOS', 'MAC_OS'). Defaults to 'IOS'."))
 def release_version(bundle_id, version_string, build_number, platform="IOS"):
     """Releases a new version of an app."""
     if not all([bundle_id, version_string, build_number]):
@@ -58,6 +110,93 @@ def release_version(bundle_id, version_string, build_number, platform="IOS"):
         bundle_id, version_string, build_number, platform)
 
 
+@registry.tool(
+    "app-store-connect/release-versions",
+    "Release several apps at once. Lookups and submissions for all apps run "
+    "concurrently; use dryRun to see the planned steps without changing anything.",
+    targets=Param(
+        "targets", "array",
+        "The apps to release, each an object with bundleId, version and buildNumber",
+        required=True, items={"type": "object"}),
+    dryRun=Param("dry_run", "boolean",
+                 "Only look up the apps and report the steps that would run"),
+    maxConcurrency=Param("max_concurrency", "integer",
+                         "Release steps to run at once across all apps"))
+def release_versions(targets, dry_run=False, max_concurrency=None):
+    """Releases several app versions, returning per-app results in completion order."""
+    parsed = []
+    for target in targets or []:
+        values = (target.get("bundleId"), target.get("version"), target.get("buildNumber"))
+        if not all(values):
+            return {"error": "Each target needs bundleId, version and buildNumber"}, 400
+        parsed.append(values)
+    if not parsed:
+        return {"error": "Missing required parameter: targets"}, 400
+    return app_store_instance.release_versions(
+        parsed, dry_run=dry_run, max_concurrency=max_concurrency)
+
+
+UNTIL = Param(
+    "until", "array",
+    "States that end the watch, e.g. ['READY_FOR_SALE', 'REJECTED']",
+    items={"type": "string"})
+
+
+@registry.tool(
+    "app-store-connect/watch-build",
+    "Watch a build until it finishes processing. State changes are sent as "
+    "log notifications.",
+    bundleId=BUNDLE_ID,
+    version=Param("version_string", "string",
+                  "The version string of the build (e.g., '1.2.3')", required=True),
+    buildNumber=Param("build_number", "string", "The build number", required=True),
+    until=UNTIL)
+def watch_build(bundle_id, version_string, build_number, until=None):
+    """Starts watching a build's processing state."""
+    if not all([bundle_id, version_string, build_number]):
+        return {"error": "Missing required parameters: bundleId, version, buildNumber"}, 400
+    return app_store_instance.watch_build(bundle_id, version_string, build_number, until)
+
+
+@registry.tool(
+    "app-store-connect/watch-version",
+    "Watch an App Store version until its state changes (e.g. leaves "
+    "WAITING_FOR_REVIEW). State changes are sent as log notifications.",
+    bundleId=BUNDLE_ID,
+    version=Param("version_string", "string",
+                  "The version string to watch (e.g., '1.2.3')", required=True),
+    until=UNTIL)
+def watch_version(bundle_id, version_string, until=None):
+    """Starts watching a version's App Store state."""
+    if not bundle_id or not version_string:
+        return {"error": "Missing required parameters: bundleId, version"}, 400
+    return app_store_instance.watch_version(bundle_id, version_string, until)
+
+
+@registry.tool(
+    "app-store-connect/list-watches",
+    "List the watched builds and versions with their last known state")
+def list_watches():
+    """Returns the watched builds and versions."""
+    return app_store_instance.list_watches()
+
+
+@registry.tool(
+    "app-store-connect/unwatch",
+    "Stop watching a build or version",
+    watchId=Param("watch_id", "integer", "The ID returned by watch-build or watch-version",
+                  required=True))
+def unwatch(watch_id):
+    """Stops a watch."""
+    return app_store_instance.unwatch(watch_id)
+
+
+@registry.tool(
+    "app-store-connect/submit-for-review",
+    "Submit an app version for review",
+    bundleId=BUNDLE_ID,
+    version=Param("version", "string",
+                  "The version string to submit (e.g., '1.2.3')", required=True))
 def submit_for_review(bundle_id, version):
     """Submitting an app version for review."""
     if not bundle_id or not version:
@@ -66,6 +205,12 @@ def submit_for_review(bundle_id, version):
                      "Use release_version instead."}, 400
 
 
+@registry.tool(
+    "app-store-connect/create-beta-group",
+    "Create a new beta group",
+    name=Param("name", "string", "The name of the beta group", required=True),
+    bundleId=Param("bundle_id", "string",
+                   "The bundle ID of the app to create the group for", required=True))
 def create_beta_group(name, bundle_id):
     """Creating a new beta group."""
     if not name or not bundle_id:
@@ -73,6 +218,11 @@ def create_beta_group(name, bundle_id):
     return app_store_instance.create_beta_group(name, bundle_id)
 
 
+@registry.tool(
+    "app-store-connect/add-beta-tester-to-group",
+    "Add a beta tester to a group",
+    email=Param("email", "string", "The tester's email address", required=True),
+    groupId=GROUP_ID)
 def add_beta_tester_to_group(email, group_id):
     """Adding a beta tester to a group."""
     if not email or not group_id:
@@ -80,6 +230,82 @@ def add_beta_tester_to_group(email, group_id):
     return app_store_instance.add_tester_to_group(email, group_id)
 
 
+GROUP_IDS = Param(
+    "group_ids", "array", "The IDs of the beta groups", required=True,
+    items={"type": "string"})
+TESTERS = Param(
+    "testers", "array",
+    "Testers as email strings or objects with email, firstName and lastName")
+TESTERS_CSV = Param(
+    "csv_text", "string",
+    "CSV with an email column (and optional firstName, lastName), or one email per line")
+
+
+@registry.tool(
+    "app-store-connect/bulk-add-beta-testers",
+    "Add many beta testers to groups. Existing testers are linked in batches; "
+    "new testers are created.",
+    groupIds=GROUP_IDS,
+    testers=TESTERS,
+    csv=TESTERS_CSV)
+def bulk_add_beta_testers(group_ids, testers=None, csv_text=None):
+    """Adds many beta testers to groups, returning per-tester outcomes."""
+    if not group_ids or not (testers or csv_text):
+        return {"error": "Missing required parameters: groupIds, and testers or csv"}, 400
+    return app_store_instance.bulk_update_testers("add", group_ids, testers, csv_text)
+
+
+@registry.tool(
+    "app-store-connect/bulk-remove-beta-testers",
+    "Remove many beta testers from groups in batches",
+    groupIds=GROUP_IDS,
+    testers=TESTERS,
+    csv=TESTERS_CSV)
+def bulk_remove_beta_testers(group_ids, testers=None, csv_text=None):
+    """Removes many beta testers from groups, returning per-tester outcomes."""
+    if not group_ids or not (testers or csv_text):
+        return {"error": "Missing required parameters: groupIds, and testers or csv"}, 400
+    return app_store_instance.bulk_update_testers("remove", group_ids, testers, csv_text)
+
+
+@registry.tool(
+    "app-store-connect/sync-beta-group",
+    "Make a beta group's members exactly the given testers. Only the missing "
+    "testers are added and the extra ones removed; an empty list empties the group.",
+    groupId=GROUP_ID,
+    testers=TESTERS,
+    csv=TESTERS_CSV,
+    dryRun=Param("dry_run", "boolean", "Only report the testers that would be added or removed"))
+def sync_beta_group(group_id, testers=None, csv_text=None, dry_run=False):
+    """Syncs a beta group's roster, returning the applied operations."""
+    if not group_id or (testers is None and csv_text is None):
+        return {"error": "Missing required parameters: groupId, and testers or csv"}, 400
+    return app_store_instance.sync_beta_group(group_id, testers, csv_text, dry_run)
+
+
+@registry.tool(
+    "app-store-connect/find-beta-tester",
+    "Find a beta tester by email, with every beta group they are in and every app "
+    "they test",
+    email=Param("email", "string", "The tester's email address", required=True))
+def find_beta_tester(email):
+    """Returns a tester's ID, groups and apps."""
+    if not email:
+        return {"error": "Missing required parameter: email"}, 400
+    return app_store_instance.find_beta_tester(email)
+
+
+@registry.tool(
+    "app-store-connect/get-beta-group-member-counts",
+    "Get the number of testers in each beta group across all apps. A tester in more "
+    "than 50 groups is counted in only 50 of them",
+    groupIds=Param("group_ids", "array", "Only report these beta groups",
+                   items={"type": "string"}))
+def get_beta_group_member_counts(group_ids=None):
+    """Returns the number of testers per beta group."""
+    return app_store_instance.get_beta_group_member_counts(group_ids)
+
+
 def remove_beta_tester_from_group(email, group_id, bundle_id):
     """Removing a beta tester from a group."""
     if not email or not group_id or not bundle_id:
@@ -88,8 +314,172 @@ def remove_beta_tester_from_group(email, group_id, bundle_id):
     return app_store_instance.remove_tester_from_group(email, group_id, bundle_id)
 
 
+def prewarm_app_index():
+    """Loads every bundle ID -> app ID mapping so lookups skip a round trip."""
+    return app_store_instance.prewarm_app_index()
+
+
+@registry.tool(
+    "app-store-connect/get-rate-limit-status",
+    "Get the remaining App Store Connect API quota and the current request pacing")
+def get_rate_limit_status():
+    """Returns the remaining API quota and current request pacing."""
+    return app_store_instance.get_rate_limit_status()
+
+
+@registry.tool(
+    "app-store-connect/get-cache-stats",
+    "Get hit/miss counters for the response cache and the bundle ID index, and the "
+    "number of log records dropped")
+def get_cache_stats():
+    """Returns hit/miss counters for the response cache and app ID index."""
+    return {**app_store_instance.get_cache_stats(),
+            "log_records_dropped": dropped_records()}
+
+
+@registry.tool(
+    "app-store-connect/get-result-size-stats",
+    "Get the bytes sent per tool and how much projection and compact encoding saved")
+def get_result_size_stats():
+    """Returns per-tool result sizes and the measured size reduction."""
+    return result_encoder.stats()
+
+
+@registry.tool(
+    "app-store-connect/get-performance-metrics",
+    "Get performance metrics for an app",
+    bundleId=BUNDLE_ID)
 def get_performance_metrics(bundle_id):
     """Returns a list of performance metrics for an app."""
     if not bundle_id:
         return {"error": "Missing required parameter: bundleId"}, 400
     return app_store_instance.get_performance_metrics(bundle_id)
+
+
+@registry.tool(
+    "app-store-connect/summarize-performance-metrics",
+    "Summarize an app's launch time, hang rate, memory and battery metrics per "
+    "version, with version-over-version deltas, instead of the raw metrics document",
+    bundleId=BUNDLE_ID,
+    categories=Param("categories", "array",
+                     "Metric categories to include (default LAUNCH, HANG, MEMORY, BATTERY)",
+                     items={"type": "string"}),
+    device=Param("device", "string", "Device class, e.g. all_iPhones or all_iPads"),
+    percentile=Param("percentile", "string",
+                     "percentile.fifty (typical) or percentile.ninety (worst 10%)"),
+    lastVersions=Param("last_versions", "integer", "Only include the newest N versions",
+                       minimum=1))
+def summarize_performance_metrics(bundle_id, categories=None, device=None,
+                                  percentile=None, last_versions=None):
+    """Returns one value per metric and version, with deltas between versions."""
+    if not bundle_id:
+        return {"error": "Missing required parameter: bundleId"}, 400
+    return app_store_instance.summarize_performance_metrics(
+        bundle_id, categories=categories, device=device, percentile=percentile,
+        last_versions=last_versions)
+
+
+@registry.tool(
+    "app-store-connect/detect-performance-regressions",
+    "Compare a version's performance metrics with an earlier version's and flag "
+    "statistically significant regressions, using locally stored metrics history",
+    bundleId=BUNDLE_ID,
+    version=Param("version", "string", "The version to check (default: the newest stored)"),
+    baselineVersion=Param("baseline", "string",
+                          "The version to compare with (default: the one before)"),
+    device=Param("device", "string", "Device class, e.g. all_iPhones or all_iPads"),
+    percentile=Param("percentile", "string",
+                     "percentile.fifty (typical) or percentile.ninety (worst 10%)"),
+    refresh=Param("refresh", "boolean",
+                  "Fetch the latest metrics first instead of using stored history only"))
+def detect_performance_regressions(  # pylint: disable=too-many-arguments
+        bundle_id, *, version=None, baseline=None, device=None, percentile=None,
+        refresh=False):
+    """Returns the metrics that got significantly worse or better between two versions."""
+    if not bundle_id:
+        return {"error": "Missing required parameter: bundleId"}, 400
+    return app_store_instance.detect_performance_regressions(
+        bundle_id, version=version, baseline=baseline, device=device,
+        percentile=percentile, refresh=refresh)
+
+
+@registry.tool(
+    "app-store-connect/get-top-diagnostic-signatures",
+    "Rank the heaviest hang and disk-write signatures across an app's recent builds",
+    bundleId=BUNDLE_ID,
+    lastBuilds=Param("last_builds", "integer", "Number of recent builds to scan (default 5)",
+                     minimum=1),
+    types=Param("diagnostic_types", "array",
+                "Diagnostic types to rank: HANGS, DISK_WRITES, LAUNCHES (default HANGS, "
+                "DISK_WRITES)", items={"type": "string"}),
+    limit=Param("limit", "integer", "Signatures to return per type (default 10)", minimum=1))
+def get_top_diagnostic_signatures(bundle_id, last_builds=None, diagnostic_types=None,
+                                  limit=None):
+    """Returns the top signatures per diagnostic type, weighted across builds."""
+    if not bundle_id:
+        return {"error": "Missing required parameter: bundleId"}, 400
+    return app_store_instance.get_top_diagnostic_signatures(
+        bundle_id, last_builds=last_builds, diagnostic_types=diagnostic_types, limit=limit)
+
+
+@registry.tool(
+    "app-store-connect/download-diagnostic-logs",
+    "Download the logs of diagnostic signatures to local files and return their paths",
+    signatureIds=Param("signature_ids", "array",
+                       "Signature IDs, as returned by get-top-diagnostic-signatures",
+                       required=True, items={"type": "string"}))
+def download_diagnostic_logs(signature_ids):
+    """Returns the file path and size of each downloaded log."""
+    if not signature_ids:
+        return {"error": "Missing required parameter: signatureIds"}, 400
+    return app_store_instance.download_diagnostic_logs(signature_ids)
+
+
+REVIEW_LIMIT = Param("limit", "integer", "Reviews to return (default 20)", minimum=1)
+
+
+@registry.tool(
+    "app-store-connect/get-new-customer-reviews",
+    "Fetch the customer reviews posted since the last sync into the local review "
+    "index and return them",
+    bundleId=BUNDLE_ID,
+    limit=REVIEW_LIMIT)
+def get_new_customer_reviews(bundle_id, limit=None):
+    """Returns the reviews added by this sync, newest first, and the sync's counters."""
+    if not bundle_id:
+        return {"error": "Missing required parameter: bundleId"}, 400
+    return app_store_instance.get_new_customer_reviews(bundle_id, limit=limit)
+
+
+@registry.tool(
+    "app-store-connect/search-customer-reviews",
+    "Full-text search of an app's customer reviews in the local review index",
+    bundleId=BUNDLE_ID,
+    query=Param("query", "string",
+                'Words to search for; supports OR, "exact phrases" and prefix*',
+                required=True),
+    rating=Param("rating", "integer", "Only reviews with this star rating",
+                 minimum=1, maximum=5),
+    territory=Param("territory", "string", "Only reviews from this territory, e.g. USA"),
+    version=Param("version", "string", "Only reviews of this app version"),
+    limit=REVIEW_LIMIT)
+def search_customer_reviews(  # pylint: disable=too-many-arguments
+        bundle_id, query, *, rating=None, territory=None, version=None, limit=None):
+    """Returns the best-matching reviews."""
+    if not bundle_id or not query:
+        return {"error": "Missing required parameters: bundleId and query"}, 400
+    return app_store_instance.search_customer_reviews(
+        bundle_id, query, rating=rating, territory=territory, version=version, limit=limit)
+
+
+@registry.tool(
+    "app-store-connect/get-review-rating-histogram",
+    "Count an app's customer reviews per star rating, by version or by territory",
+    bundleId=BUNDLE_ID,
+    groupBy=Param("group_by", "string", "Group by version (default) or territory",
+                  enum=["version", "territory"]))
+def get_review_rating_histogram(bundle_id, group_by="version"):
+    """Returns the rating counts and average rating of each version or territory."""
+    if not bundle_id:
+        return {"error": "Missing required parameter: bundleId"}, 400
+    return app_store_instance.get_review_rating_histogram(bundle_id, group_by=group_by)
@@ -8,8 +8,14 @@ import os
 import sys
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import app_store_connect_api as api
+from appstore_service import config
+from appstore_service.cancellation import RequestCancelled, cancellation_scope
+from server_logging import PayloadLogger, setup_logging
+from tool_registry import InvalidParams, ToolNotFound
 
 # Change to the correct working directory
 SCRIPT_DIR = Path(__file__).parent.absolute()
@@ -21,20 +27,14 @@ LOG_FILE = SCRIPT_DIR / "logs" / "app_store_connect_server.log"
 # Ensure the log directory exists
 LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler(sys.stderr)
-    ]
-)
+# Raw JSON-RPC messages are logged according to LOG_PAYLOADS in config.py.
+payload_log = PayloadLogger()
 
-# Log startup information
-logging.info("Script started at %s", os.getcwd())
-logging.info("Log file location: %s", LOG_FILE)
-logging.info("Script location: %s", __file__)
+# MCP log message levels, least severe first.
+LOG_LEVELS = ("debug", "info", "notice", "warning", "error", "critical", "alert", "emergency")
+
+# Least severe level the client wants notifications/message for; see logging/setLevel.
+client_log_level = {"level": "debug"}
 
 
 def handle_initialize(message):
@@ -47,7 +47,9 @@ def handle_initialize(message):
             "capabilities": {
                 "tools": {
                     "enabled": True
-                }
+                },
+                # Watch state changes are sent as notifications/message.
+                "logging": {}
             },
             "serverInfo": {
                 "name": "app-store-connect-services",
@@ -58,188 +60,11 @@ def handle_initialize(message):
 
 
 def handle_tools_list(message):
-    """Handle the tools/list message from Cursor."""
-    return {
-        "jsonrpc": "2.0",
-        "id": message.get("id"),
-        "result": {
-            "tools": [
-                {
-                    "name": "app-store-connect/list-apps",
-                    "description": "List all apps in App Store Connect",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {}
-                    }
-                },
-                {
-                    "name": "app-store-connect/get-app-info",
-                    "description": "Get detailed information about an app",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app"
-                            }
-                        },
-                        "required": ["bundleId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/list-beta-testers",
-                    "description": "List all beta testers in a specific group",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "groupId": {
-                                "type": "string",
-                                "description": "The ID of the beta group"
-                            }
-                        },
-                        "required": ["groupId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/list-beta-groups",
-                    "description": "List all beta groups for an app",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app"
-                            }
-                        },
-                        "required": ["bundleId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/list-testers-in-group",
-                    "description": "List all beta testers in a specific group",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "groupId": {
-                                "type": "string",
-                                "description": "The ID of the beta group"
-                            }
-                        },
-                        "required": ["groupId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/list-builds",
-                    "description": "List all builds for an app",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app"
-                            }
-                        },
-                        "required": ["bundleId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/submit-for-review",
-                    "description": "Submit an app version for review",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app"
-                            },
-                            "version": {
-                                "type": "string",
-                                "description": "The version string to submit (e.g., '1.2.3')"
-                            }
-                        },
-                        "required": ["bundleId", "version"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/create-beta-group",
-                    "description": "Create a new beta group",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "name": {
-                                "type": "string",
-                                "description": "The name of the beta group"
-                            },
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app to create the group for"
-                            }
-                        },
-                        "required": ["name", "bundleId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/add-beta-tester-to-group",
-                    "description": "Add a beta tester to a group",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "email": {
-                                "type": "string",
-                                "description": "The tester's email address"
-                            },
-                            "groupId": {
-                                "type": "string",
-                                "description": "The ID of the beta group"
-                            }
-                        },
-                        "required": ["email", "groupId"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/release-version",
-                    "description": "Release a new version of an app",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app"
-                            },
-                            "version": {
-                                "type": "string",
-                                "description": "The version string to release (e.g., '1.2.3')"
-                            },
-                            "buildNumber": {
-                                "type": "string",
-                                "description": "The build number corresponding to the version"
-                            },
-                            "platform": {
-                                "type": "string",
-                                "description": "The platform of the app (e.g., 'IOS', 'MAC_OS'). "
-                                "Defaults to 'IOS'."
-                            }
-                        },
-                        "required": ["bundleId", "version", "buildNumber"]
-                    }
-                },
-                {
-                    "name": "app-store-connect/get-performance-metrics",
-                    "description": "Get performance metrics for an app",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "bundleId": {
-                                "type": "string",
-                                "description": "The bundle ID of the app"
-                            }
-                        },
-                        "required": ["bundleId"]
-                    }
-                }
-            ]
-        }
-    }
+    """Handle the tools/list message from Cursor.
+
+    Returns the pre-encoded response; the tool list is serialized only once.
+    """
+    return api.registry.tools_list_response(message.get("id"))
 
 
 def handle_tools_call(message):
@@ -248,62 +73,27 @@ def handle_tools_call(message):
     tool_name = params.get("name")
     args = params.get("arguments", {})
 
-    logging.info(
-        "Handling tool call for tool '%s' with args: %s", tool_name, args)
+    logging.info("Handling tool call for tool '%s'", tool_name)
+    payload_log.log(f"Arguments for {tool_name}", args)
 
     result = None
     error = None
 
     try:
-        if tool_name == "app-store-connect/list-apps":
-            result = api.list_apps()
-        elif tool_name == "app-store-connect/get-app-info":
-            result = api.get_app_info(bundle_id=args.get("bundleId"))
-        elif tool_name == "app-store-connect/list-beta-testers":
-            # Server-side workaround for client-side caching.
-            # The client might still send a bundleId, but we will prioritize
-            # the groupId.
-            group_id = args.get("groupId")
-            if not group_id:
-                # Fallback for older client definitions that might not have
-                # groupId
-                error = {
-                    "code": -32602,
-                    "message": "Invalid params: groupId is required."}
-            else:
-                result = api.list_testers_in_group(group_id=group_id)
-        elif tool_name == "app-store-connect/list-beta-groups":
-            result = api.list_beta_groups(bundle_id=args.get("bundleId"))
-        elif tool_name == "app-store-connect/list-testers-in-group":
-            result = api.list_testers_in_group(group_id=args.get("groupId"))
-        elif tool_name == "app-store-connect/list-builds":
-            result = api.list_builds(bundle_id=args.get("bundleId"))
-        elif tool_name == "app-store-connect/submit-for-review":
-            result = api.submit_for_review(
-                bundle_id=args.get("bundleId"),
-                version=args.get("version"))
-        elif tool_name == "app-store-connect/create-beta-group":
-            result = api.create_beta_group(
-                name=args.get("name"),
-                bundle_id=args.get("bundleId"))
-        elif tool_name == "app-store-connect/add-beta-tester-to-group":
-            result = api.add_beta_tester_to_group(
-                email=args.get("email"), group_id=args.get("groupId"))
-        elif tool_name == "app-store-connect/release-version":
-            result = api.release_version(
-                bundle_id=args.get("bundleId"),
-                version_string=args.get("version"),
-                build_number=args.get("buildNumber"),
-                platform=args.get("platform", "IOS")
-            )
-        elif tool_name == "app-store-connect/get-performance-metrics":
-            result = api.get_performance_metrics(
-                bundle_id=args.get("bundleId"))
-        else:
-            error = {
-                "code": -32601,
-                "message": f"Tool '{tool_name}' not found"
-            }
+        result = api.registry.call(tool_name, args)
+    except ToolNotFound:
+        error = {
+            "code": -32601,
+            "message": f"Tool '{tool_name}' not found"
+        }
+    except InvalidParams as e:
+        error = {
+            "code": -32602,
+            "message": str(e)
+        }
+    except RequestCancelled:
+        # The dispatcher drops the response for cancelled calls.
+        raise
     except Exception as e:  # pylint: disable=broad-exception-caught
         logging.error("Error calling tool %s: %s", tool_name, e, exc_info=True)
         error = {
@@ -320,12 +110,13 @@ def handle_tools_call(message):
     else:
         # The client expects the result to have a "content" key with an array of content blocks.
         # We will format the JSON result as a string inside a "text" content
-        # block.
+        # block, projected and encoded as configured in config.py.
         response["result"] = {
             "content": [
                 {
                     "type": "text",
-                    "text": json.dumps(result, indent=2)
+                    "text": api.result_encoder.encode(
+                        tool_name, result, (args or {}).get("fields"))
                 }
             ]
         }
@@ -333,10 +124,155 @@ def handle_tools_call(message):
     return response
 
 
-def handle_notification(message):  # pylint: disable=unused-argument
+def handle_logging_set_level(message):
+    """Handle logging/setLevel: only send log notifications at or above the level."""
+    level = message.get("params", {}).get("level")
+    response = {
+        "jsonrpc": "2.0",
+        "id": message.get("id"),
+    }
+    if level not in LOG_LEVELS:
+        response["error"] = {
+            "code": -32602,
+            "message": f"Unknown log level '{level}'"
+        }
+    else:
+        client_log_level["level"] = level
+        logging.info("Client log level set to %s", level)
+        response["result"] = {}
+    return response
+
+
+def send_watch_notification(event):
+    """Send a watched build or version state change to the client as a log message."""
+    level = "notice" if event["from"] is not None else "info"
+    if LOG_LEVELS.index(level) < LOG_LEVELS.index(client_log_level["level"]):
+        return
+    write_message({
+        "jsonrpc": "2.0",
+        "method": "notifications/message",
+        "params": {
+            "level": level,
+            "logger": "app-store-connect/watch",
+            "data": event
+        }
+    })
+
+
+def handle_notification(message, dispatcher=None):
     """Handle notification messages from Cursor."""
+    if message.get("method") == "notifications/cancelled" and dispatcher:
+        params = message.get("params", {})
+        dispatcher.cancel(params.get("requestId"), params.get("reason"))
     # Notifications don't require a response
-    return None
+
+
+# Requests answered directly on the message loop; tools/call is dispatched.
+REQUEST_HANDLERS = {
+    "initialize": handle_initialize,
+    "tools/list": handle_tools_list,
+    "logging/setLevel": handle_logging_set_level,
+}
+
+
+class ToolCallDispatcher:
+    """Runs tools/call requests on a bounded worker pool.
+
+    Responses are written as soon as each call finishes, so they can go out
+    in a different order than the requests came in. The client matches them
+    back up using the JSON-RPC id.
+
+    In-flight calls are tracked by request id so that a
+    notifications/cancelled message can stop them. A queued call is dropped
+    before it starts; a running call stops at its next upstream request.
+    Either way no response is written for it.
+    """
+
+    def __init__(self, max_workers=None, handler=None, writer=None):
+        self.max_workers = max_workers or config.MAX_CONCURRENT_TOOL_CALLS
+        self._handler = handler or handle_tools_call
+        self._writer = writer or write_message
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="tool-call")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, message):
+        """Queue a tools/call message; its response is written when it completes."""
+        request_id = message.get("id")
+        cancel_event = threading.Event()
+        with self._lock:
+            future = self._executor.submit(self._run, message, cancel_event)
+            self._in_flight[request_id] = (future, cancel_event)
+        future.add_done_callback(
+            lambda _future: self._forget(request_id, _future))
+        return future
+
+    def cancel(self, request_id, reason=None):
+        """Cancel an in-flight call. Returns False if the id is unknown."""
+        with self._lock:
+            entry = self._in_flight.get(request_id)
+        if not entry:
+            logging.info("Ignoring cancellation for unknown request %s", request_id)
+            return False
+        future, cancel_event = entry
+        cancel_event.set()
+        # Frees the worker slot immediately if the call has not started yet.
+        future.cancel()
+        logging.info("Cancelled request %s: %s", request_id, reason or "no reason given")
+        return True
+
+    def in_flight(self):
+        """Return the ids of calls that are queued or running."""
+        with self._lock:
+            return list(self._in_flight)
+
+    def _forget(self, request_id, future):
+        """Stop tracking a call once it has finished."""
+        with self._lock:
+            entry = self._in_flight.get(request_id)
+            if entry and entry[0] is future:
+                del self._in_flight[request_id]
+
+    def _run(self, message, cancel_event):
+        """Execute a single tool call and write its response."""
+        try:
+            with cancellation_scope(cancel_event):
+                response = self._handler(message)
+        except RequestCancelled:
+            logging.info("Request %s stopped after cancellation", message.get("id"))
+            return None
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.error(
+                "Unhandled error in tool call %s: %s",
+                message.get("id"), e, exc_info=True)
+            response = {
+                "jsonrpc": "2.0",
+                "id": message.get("id"),
+                "error": {
+                    "code": -32000,
+                    "message": f"Internal server error: {e}"
+                }
+            }
+        if cancel_event.is_set():
+            # The client is no longer waiting for this response.
+            return None
+        if response:
+            self._writer(response)
+        return response
+
+    def shutdown(self, wait=True):
+        """Stop accepting calls, optionally waiting for in-flight ones to finish."""
+        self._executor.shutdown(wait=wait)
+
+
+def prewarm_app_index():
+    """Fill the bundle ID index in the background, logging any failure."""
+    try:
+        logging.info("App ID index: %s", api.prewarm_app_index())
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.warning("Could not prewarm the app ID index: %s", e)
 
 
 def read_message():
@@ -352,7 +288,7 @@ def read_message():
             logging.info("No input received")
             return None
 
-        logging.info("Raw input received: %s", repr(line))
+        payload_log.log("Raw input received", line)
         return json.loads(line.strip())
 
     except Exception as e:  # pylint: disable=broad-exception-caught
@@ -360,24 +296,37 @@ def read_message():
         return None
 
 
+# Serializes writes to stdout so concurrent responses never interleave.
+_write_lock = threading.Lock()
+
+
 def write_message(message):
     """Write a JSON message to stdout.
 
     Args:
-        message (dict): The message to send.
+        message (dict or str): The message to send, or its pre-encoded JSON.
     """
     try:
         # Convert message to JSON string
-        json_str = json.dumps(message)
-        sys.stdout.write(json_str + "\n")
-        sys.stdout.flush()
-        logging.info("Sent message: %s", repr(json_str))
+        json_str = message if isinstance(message, str) else json.dumps(message)
+        with _write_lock:
+            sys.stdout.write(json_str + "\n")
+            sys.stdout.flush()
+        payload_log.log("Sent message", json_str)
     except Exception as e:  # pylint: disable=broad-exception-caught
         logging.error("Error writing message: %s", str(e), exc_info=True)
 
 
 def main():
     """Main server loop for handling MCP messages."""
+    # Log records are written by a background thread; see server_logging.py.
+    setup_logging(LOG_FILE)
+
+    # Log startup information
+    logging.info("Script started at %s", os.getcwd())
+    logging.info("Log file location: %s", LOG_FILE)
+    logging.info("Script location: %s", __file__)
+
     # Log basic environment info
     logging.info("=== Environment Information ===")
     logging.info("Python version: %s", sys.version)
@@ -386,8 +335,26 @@ def main():
     logging.info("PYTHONPATH: %s", os.environ.get('PYTHONPATH', 'Not set'))
     logging.info("PATH: %s", os.environ.get('PATH', 'Not set'))
 
+    # Resolve bundle IDs in the background so the first tool call does not
+    # pay for the sweep over all apps.
+    if not api.app_store_instance.app_index.warm:
+        threading.Thread(
+            target=prewarm_app_index,
+            name="app-index-prewarm",
+            daemon=True).start()
+
+    # Report watched state changes as they are polled.
+    api.app_store_instance.watcher.add_listener(send_watch_notification)
+
+    # Serialize the tools/list payload once, before the first request.
+    api.registry.tools_list_json()
+    logging.info("Registered %d tools", len(api.registry.names()))
+
     # Keep the connection alive and handle messages
-    logging.info("=== Starting message loop ===")
+    dispatcher = ToolCallDispatcher()
+    logging.info(
+        "=== Starting message loop (max concurrent tool calls: %d) ===",
+        dispatcher.max_workers)
     while True:
         try:
             # Read a message
@@ -400,14 +367,14 @@ def main():
 
                 response = None
                 # Handle the message based on its method
-                if method == "initialize":
-                    response = handle_initialize(message)
-                elif method == "tools/list":
-                    response = handle_tools_list(message)
+                if method in REQUEST_HANDLERS:
+                    response = REQUEST_HANDLERS[method](message)
                 elif method == "tools/call":
-                    response = handle_tools_call(message)
+                    # Runs in the background; the dispatcher writes the
+                    # response once the call completes.
+                    dispatcher.submit(message)
                 elif method and method.startswith("notifications/"):
-                    handle_notification(message)
+                    handle_notification(message, dispatcher)
                 elif "id" in message:  # Only respond to requests, not notifications
                     response = {
                         "jsonrpc": "2.0",
@@ -441,6 +408,8 @@ def main():
                 write_message(error_response)
             break
 
+    # Let in-flight tool calls finish so their responses are delivered.
+    dispatcher.shutdown(wait=True)
     logging.info("=== Message loop ended ===")
 
 
@@ -1,33 +1,66 @@
 """JWT authentication for App Store Connect API."""
+import logging
+import threading
 import time
 import jwt
+from cryptography.hazmat.primitives import serialization
 from . import config
 
+# Tokens are replaced this many seconds before they expire, so a request
+# never goes out with a token that lapses in flight.
+TOKEN_REFRESH_MARGIN = 60
 
-class AppStoreConnectAuth:
+
+class AppStoreConnectAuth:  # pylint: disable=too-many-instance-attributes
     """Handles JWT authentication for App Store Connect API requests."""
 
-    def __init__(self):
-        self.key_id = config.KEY_ID
-        self.issuer_id = config.ISSUER_ID
-        self.private_key_path = config.PRIVATE_KEY_PATH
+    def __init__(
+            self,
+            key_id: str = None,
+            issuer_id: str = None,
+            private_key_path: str = None,
+            background_refresh: bool = True):
+        self.key_id = key_id or config.KEY_ID
+        self.issuer_id = issuer_id or config.ISSUER_ID
+        self.private_key_path = private_key_path or config.PRIVATE_KEY_PATH
         self.expiration_minutes = config.EXPIRATION_MINUTES
         self.base_url = "https://api.appstoreconnect.apple.com/v1"
+        self.background_refresh = background_refresh
         self._token = None
         self._token_generated_time = 0
+        self._private_key = None
+        self._lock = threading.Lock()
+        self._refresh_timer = None
+        self._token_used = False
+        self.signing_count = 0
+        self.signing_seconds = 0.0
+        self.last_signing_seconds = None
 
     @property
     def token(self):
-        """Get a valid JWT token, generating a new one if expired."""
-        # Check if token is expired or not generated
-        if not self._token or (
-            time.time() -
-            self._token_generated_time) >= (
-            self.expiration_minutes *
-                60):
-            self._generate_jwt()
+        """Get a valid JWT token, generating a new one if it is about to expire."""
+        if self._needs_refresh():
+            # Only one caller signs; the others wait and reuse its token.
+            with self._lock:
+                if self._needs_refresh():
+                    self._generate_jwt()
+        self._token_used = True
         return self._token
 
+    def _needs_refresh(self):
+        """Return True if there is no token or it is inside the refresh margin."""
+        lifetime = self.expiration_minutes * 60 - TOKEN_REFRESH_MARGIN
+        return not self._token or (
+            time.time() - self._token_generated_time) >= lifetime
+
+    def _load_private_key(self):
+        """Read and parse the .p8 key once, keeping the parsed key object."""
+        if self._private_key is None:
+            with open(self.private_key_path, "rb") as key_file:
+                self._private_key = serialization.load_pem_private_key(
+                    key_file.read(), password=None)
+        return self._private_key
+
     def _generate_jwt(self):
         """Generate a new JWT token for App Store Connect API authentication."""
         headers = {
@@ -42,15 +75,72 @@ class AppStoreConnectAuth:
             "exp": now + (self.expiration_minutes * 60),
             "aud": "appstoreconnect-v1"
         }
-        with open(self.private_key_path, "r", encoding="utf-8") as key_file:
-            private_key = key_file.read()
+        private_key = self._load_private_key()
 
+        started = time.perf_counter()
         self._token = jwt.encode(
             payload,
             private_key,
             algorithm="ES256",
             headers=headers)
+        elapsed = time.perf_counter() - started
         self._token_generated_time = now
+        self._token_used = False
+        self.signing_count += 1
+        self.signing_seconds += elapsed
+        self.last_signing_seconds = elapsed
+        logging.debug("Signed JWT for key %s in %.2f ms", self.key_id, elapsed * 1000)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        """Re-sign in the background shortly before the current token expires."""
+        if not self.background_refresh:
+            return
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        delay = max(0, self.expiration_minutes * 60 - TOKEN_REFRESH_MARGIN)
+        self._refresh_timer = threading.Timer(delay, self._refresh_in_background)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_in_background(self):
+        """Timer callback that replaces the token before it is needed.
+
+        A token no request has used since it was signed is left to expire:
+        the timer stops, and the next request signs synchronously (which
+        schedules it again), so an idle server does not keep signing.
+        """
+        try:
+            with self._lock:
+                if not self._token_used:
+                    logging.debug("JWT for key %s unused; pausing background refresh",
+                                  self.key_id)
+                    self._refresh_timer = None
+                    return
+                self._generate_jwt()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # The request path will retry synchronously on its next call.
+            logging.warning("Background JWT refresh failed: %s", e)
+
+    def close(self):
+        """Stop the background refresh timer."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def signing_stats(self):
+        """Return how often and how quickly tokens have been signed."""
+        average = (self.signing_seconds / self.signing_count
+                   if self.signing_count else None)
+        return {
+            "key_id": self.key_id,
+            "tokens_signed": self.signing_count,
+            "last_signing_ms": (round(self.last_signing_seconds * 1000, 3)
+                                if self.last_signing_seconds is not None else None),
+            "average_signing_ms": round(average * 1000, 3) if average is not None else None,
+            "token_age_seconds": (int(time.time() - self._token_generated_time)
+                                  if self._token else None),
+        }
 
     @property
     def headers(self):
@@ -59,3 +149,127 @@ class AppStoreConnectAuth:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+
+    @property
+    def write_headers(self):
+        """Get HTTP headers for a mutating request; same as ``headers`` for one key."""
+        return self.headers
+
+
+class PooledHeaders(dict):
+    """Request headers to be signed by a pool key picked when the request is sent.
+
+    Holds every header but Authorization. ``HttpClient`` resolves them only
+    when a request goes upstream, so a read answered from the response cache
+    or shared with an identical in-flight read does not count against a key,
+    and the key it would have used does not split the cache.
+    """
+
+    def __init__(self, pool, headers):
+        super().__init__(headers)
+        self.pool = pool
+
+    @property
+    def identity(self):
+        """The credentials these headers stand for, whichever key signs them."""
+        return self.pool.identity
+
+    def copy(self):
+        """Return a copy that is still signed on send."""
+        return PooledHeaders(self.pool, self)
+
+    def resolve(self):
+        """Return the headers signed by the key selected for this request."""
+        return {**self.pool.select().headers, **self}
+
+
+class CredentialPool:
+    """Spreads App Store Connect requests across several API keys.
+
+    Each key keeps its own JWT and, in the HTTP client, its own rate-limit
+    bucket, so read-heavy traffic scales with the number of keys. Reads pick
+    the key with the most remaining hourly quota (or the least used key);
+    mutating requests can be pinned to one key so that writes always come
+    from the same identity. The key of a read is picked only once it is
+    sent; see PooledHeaders.
+    """
+
+    def __init__(
+            self,
+            keys: list,
+            write_key_id: str = None,
+            selection: str = None,
+            budget=None):
+        if not keys:
+            raise ValueError("CredentialPool needs at least one key")
+        self.keys = {key.key_id: key for key in keys}
+        self.base_url = keys[0].base_url
+        self.write_key_id = write_key_id
+        self.selection = selection or config.KEY_SELECTION
+        # Callable returning the remaining hourly quota for a key ID, or None.
+        self.budget = budget
+        self._usage = {key_id: 0 for key_id in self.keys}
+        self._lock = threading.Lock()
+        if write_key_id and write_key_id not in self.keys:
+            raise ValueError(f"WRITE_KEY_ID {write_key_id} is not in the key pool")
+
+    @classmethod
+    def from_config(cls, budget=None):
+        """Build the pool from the key in config.py plus EXTRA_API_KEYS."""
+        keys = [AppStoreConnectAuth()]
+        for extra in config.EXTRA_API_KEYS:
+            keys.append(AppStoreConnectAuth(
+                key_id=extra["key_id"],
+                issuer_id=extra["issuer_id"],
+                private_key_path=extra["private_key_path"]))
+        return cls(keys, write_key_id=config.WRITE_KEY_ID, budget=budget)
+
+    @property
+    def identity(self):
+        """The issuers of the pooled keys; every key reads the same team's data."""
+        return ",".join(sorted({key.issuer_id for key in self.keys.values()}))
+
+    def select(self):
+        """Pick the key for the next read and count it as used."""
+        with self._lock:
+            if len(self.keys) == 1:
+                key_id = next(iter(self.keys))
+            elif self.selection == "remaining_budget" and self.budget:
+                key_id = max(self.keys, key=self._budget_rank)
+            else:
+                key_id = min(self.keys, key=self._usage.get)
+            self._usage[key_id] += 1
+            return self.keys[key_id]
+
+    def _budget_rank(self, key_id):
+        """Rank keys by remaining quota; keys not yet seen go first, then least used."""
+        remaining = self.budget(key_id)
+        return (float("inf") if remaining is None else remaining, -self._usage[key_id])
+
+    @property
+    def headers(self):
+        """Get HTTP headers signed, once sent, by the key selected for that request."""
+        return PooledHeaders(self, {"Content-Type": "application/json"})
+
+    @property
+    def write_headers(self):
+        """Get HTTP headers for a mutating request, honouring the pinned write key."""
+        if self.write_key_id:
+            with self._lock:
+                self._usage[self.write_key_id] += 1
+            return self.keys[self.write_key_id].headers
+        return self.headers
+
+    def usage(self):
+        """Return how many requests each key has signed."""
+        with self._lock:
+            return dict(self._usage)
+
+    def signing_stats(self):
+        """Return token signing statistics for every key."""
+        return [key.signing_stats() for key in self.keys.values()]
+
+    def close(self):
+        """Stop the background refresh of every key."""
+        for key in self.keys.values():
+            key.close()
@@ -0,0 +1,150 @@
+"""In-memory index from bundle IDs to App Store Connect app IDs."""
+import json
+import logging
+import os
+import threading
+import time
+from . import config
+from .utils import save_json_data
+
+
+class AppIdIndex:  # pylint: disable=too-many-instance-attributes
+    """Resolves bundle IDs to app IDs without a round trip per lookup.
+
+    The index is filled by one paginated sweep of ``GET /v1/apps`` and then
+    answers from memory, since an app's ID never changes. Bundle IDs that
+    are not on the account are remembered for ``negative_ttl`` seconds so
+    repeated typos do not cost a request each. The positive entries can be
+    saved to disk so a restarted server skips the sweep.
+    """
+
+    def __init__(self, app_info_service, path: str = None, negative_ttl: float = None):
+        self.app_info_service = app_info_service
+        self.path = path
+        self.negative_ttl = (config.APP_ID_NEGATIVE_TTL
+                             if negative_ttl is None else negative_ttl)
+        self.hits = 0
+        self.misses = 0
+        self._ids = {}
+        self._missing = {}
+        self._warm = False
+        self._lock = threading.Lock()
+        self._prewarm_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if path:
+            self.load()
+
+    @property
+    def warm(self):
+        """True once the index holds a full listing of the account's apps."""
+        return self._warm
+
+    def get(self, bundle_id: str):
+        """Return the app ID for a bundle ID, or None if it is not on the account."""
+        found, app_id = self._lookup(bundle_id)
+        if found:
+            return app_id
+
+        if not self._warm:
+            self.prewarm()
+            found, app_id = self._lookup(bundle_id, count=False)
+            if found:
+                return app_id
+        else:
+            # The app may have been added after the sweep.
+            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            if app_id:
+                self.add(bundle_id, app_id)
+                if self.path:
+                    self.save()
+                return app_id
+
+        with self._lock:
+            self._missing[bundle_id] = time.monotonic() + self.negative_ttl
+        return None
+
+    def _lookup(self, bundle_id, count=True):
+        """Return ``(found, app_id)`` from memory, honouring the negative cache."""
+        with self._lock:
+            if bundle_id in self._ids:
+                if count:
+                    self.hits += 1
+                return True, self._ids[bundle_id]
+            expires = self._missing.get(bundle_id)
+            if expires is not None:
+                if time.monotonic() < expires:
+                    if count:
+                        self.hits += 1
+                    return True, None
+                del self._missing[bundle_id]
+            if count:
+                self.misses += 1
+            return False, None
+
+    def add(self, bundle_id: str, app_id: str):
+        """Record a single mapping."""
+        with self._lock:
+            self._ids[bundle_id] = app_id
+            self._missing.pop(bundle_id, None)
+
+    def update_from(self, apps):
+        """Record the mappings found in a list of app resources."""
+        with self._lock:
+            for app in apps:
+                bundle_id = app.get("attributes", {}).get("bundleId")
+                if bundle_id and app.get("id"):
+                    self._ids[bundle_id] = app["id"]
+                    self._missing.pop(bundle_id, None)
+
+    def prewarm(self):
+        """Fill the index with one paginated sweep over all apps.
+
+        Concurrent callers wait for a sweep that is already running instead
+        of starting their own.
+        """
+        with self._prewarm_lock:
+            if self._warm:
+                return len(self._ids)
+            for page in self.app_info_service.iter_apps().pages():
+                self.update_from(page.get("data", []))
+            self._warm = True
+            logging.info("App ID index prewarmed with %d apps", len(self._ids))
+        if self.path:
+            self.save()
+        return len(self._ids)
+
+    def load(self):
+        """Load a previously saved index. Returns False if there is none."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable app ID index %s: %s", self.path, e)
+            return False
+        with self._lock:
+            self._ids.update(data.get("apps", {}))
+            self._warm = True
+        return True
+
+    def save(self):
+        """Write the known mappings to ``path``."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {"saved_at": int(time.time()), "apps": dict(self._ids)}
+        with self._save_lock:
+            save_json_data(data, self.path)
+
+    def stats(self):
+        """Return the size and hit counters of the index."""
+        with self._lock:
+            return {
+                "apps": len(self._ids),
+                "missing": len(self._missing),
+                "warm": self._warm,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,7 +1,9 @@
 """Service for retrieving App Store Connect app information and metadata."""
-import requests
 from . import config
 from .api_auth import AppStoreConnectAuth
+from .fieldsets import query_params
+from .http_client import HttpClient
+from .pagination import Paginator
 
 # Default timeout for all requests (30 seconds)
 REQUEST_TIMEOUT = 30
@@ -10,31 +12,48 @@ REQUEST_TIMEOUT = 30
 class AppInfoService:
     """Service for managing App Store Connect app information and metadata operations."""
 
-    def __init__(self, auth: AppStoreConnectAuth):
+    def __init__(self, auth: AppStoreConnectAuth, http: HttpClient = None):
         self.auth = auth
+        self.http = http or HttpClient()
 
-    def list_apps(self):
+    def iter_apps(
+            self,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
         """
-        Fetch a list of all apps on the account.
+        Page through all apps on the account.
         Endpoint: GET https://api.appstoreconnect.apple.com/v1/apps
+        ``fields`` maps resource types to the attributes to fetch and
+        ``include`` names related resources to embed; see fieldsets.query_params.
         """
         url = f"{self.auth.base_url}/apps"
-        response = requests.get(
-            url,
-            headers=self.auth.headers,
-            timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return Paginator(
+            self.http, self.auth, url, query_params("apps", fields, include),
+            max_items=max_items, max_seconds=max_seconds)
 
-    def get_app_info(self, bundle_id: str):
+    def list_apps(
+            self,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        Fetch a list of all apps on the account, following every page.
+        """
+        return self.iter_apps(max_items, max_seconds, fields, include).collect()
+
+    def get_app_info(self, bundle_id: str, fields: dict = None, include=None):
         """
         Fetch detailed information for a specific app by its bundle ID.
         Endpoint: GET https://api.appstoreconnect.apple.com/v1/apps?filter[bundleId]={bundle_id}
         """
         url = f"{self.auth.base_url}/apps?filter[bundleId]={bundle_id}"
-        response = requests.get(
+        response = self.http.get(
             url,
             headers=self.auth.headers,
+            params=query_params("apps", fields, include),
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
@@ -42,6 +61,34 @@ class AppInfoService:
             return data["data"][0]
         return {"error": "App not found"}
 
+    def get_apps_with_versions(
+            self,
+            app_ids: list,
+            fields: dict = None,
+            cache: bool = True):
+        """
+        Fetch several apps and their most recent App Store versions in one request.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/apps
+        ?filter[id]={ID1},{ID2}&include=appStoreVersions
+        Pass ``cache=False`` to see the latest version states.
+        """
+        url = f"{self.auth.base_url}/apps"
+        params = {
+            "filter[id]": ",".join(app_ids),
+            "limit": len(app_ids),
+            # Apple caps included to-many relationships at 50 per resource.
+            "limit[appStoreVersions]": 50,
+            **query_params("apps", fields, None, ("appStoreVersions",)),
+        }
+        response = self.http.get(
+            url,
+            headers=self.auth.headers,
+            params=params,
+            cache=cache,
+            timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
     def get_app_id_by_bundle_id(self, bundle_id: str):
         """
         Get the app ID for a given bundle ID.
@@ -59,17 +106,37 @@ class AppInfoService:
         url = f"{self.auth.base_url}/apps/{app_id}/perfPowerMetrics"
         headers = self.auth.headers.copy()
         headers["Accept"] = "application/vnd.apple.xcode-metrics+json, application/json"
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        response = self.http.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
+    def iter_customer_reviews(self, app_id: str, fields: dict = None):
+        """
+        Page through the customer reviews of an app, newest first.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/apps/{APP_ID}/customerReviews
+        ?sort=-createdDate
+        """
+        url = f"{self.auth.base_url}/apps/{app_id}/customerReviews"
+        params = {"sort": "-createdDate", **query_params("customerReviews", fields, ())}
+        return Paginator(self.http, self.auth, url, params)
+
+    def iter_version_customer_reviews(self, version_id: str, fields: dict = None):
+        """
+        Page through the customer reviews of one App Store version, newest first.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/appStoreVersions
+        /{VERSION_ID}/customerReviews?sort=-createdDate
+        """
+        url = f"{self.auth.base_url}/appStoreVersions/{version_id}/customerReviews"
+        params = {"sort": "-createdDate", **query_params("customerReviews", fields, ())}
+        return Paginator(self.http, self.auth, url, params)
+
     def fetch_customer_reviews(self, app_id: str):
         """
         Fetch customer reviews for a specific app.
         Endpoint: GET https://api.appstoreconnect.apple.com/v1/apps/{APP_ID}/customerReviews
         """
         url = f"{self.auth.base_url}/apps/{app_id}/customerReviews"
-        response = requests.get(
+        response = self.http.get(
             url,
             headers=self.auth.headers,
             timeout=REQUEST_TIMEOUT)
@@ -88,7 +155,7 @@ class AppInfoService:
         url = (f"{self.auth.base_url}/apps/{app_id}/appStoreVersions"
                f"?filter[appStoreState]=PREPARE_FOR_SUBMISSION"
                f"&sort=-versionString&limit=1")
-        response = requests.get(
+        response = self.http.get(
             url,
             headers=self.auth.headers,
             timeout=REQUEST_TIMEOUT)
@@ -2,28 +2,70 @@
 """Main AppStore class for orchestrating App Store Connect API operations."""
 import argparse
 import json
+import logging
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
 from appstore_service import api_auth
+from appstore_service import app_index
+from appstore_service import build_index
+from appstore_service import config
+from appstore_service.cancellation import run_in_scope, submit_in_context
+from appstore_service import http_client
+from appstore_service import metrics_store
 from appstore_service import build_service
 from appstore_service import beta_service
 from appstore_service import app_info_service
 from appstore_service import version_service
+from appstore_service import diagnostics
+from appstore_service import diagnostics_service
+from appstore_service import perf_metrics
 from appstore_service import performance_service
+from appstore_service import release_orchestrator
+from appstore_service import review_store
+from appstore_service import tester_import
+from appstore_service import tester_index
+from appstore_service import watcher
 
 
-class AppStore:
+class AppStore:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """Main class for interacting with the App Store Connect API."""
 
     def __init__(self):
-        self.auth = api_auth.AppStoreConnectAuth()
-        self.app_info_service = app_info_service.AppInfoService(self.auth)
-        self.build_service = build_service.BuildService(self.auth)
-        self.beta_service = beta_service.BetaService(self.auth)
-        self.version_service = version_service.VersionService(self.auth)
+        # One pooled session for every service, so multi-step operations
+        # reuse a warm connection to App Store Connect.
+        self.http = http_client.HttpClient()
+        # Reads go to the key with the most quota left, as seen by the client.
+        self.auth = api_auth.CredentialPool.from_config(
+            budget=self.http.remaining_budget)
+        self.app_info_service = app_info_service.AppInfoService(
+            self.auth, self.http)
+        self.build_service = build_service.BuildService(self.auth, self.http)
+        self.beta_service = beta_service.BetaService(self.auth, self.http)
+        self.version_service = version_service.VersionService(
+            self.auth, self.http)
         self.performance_service = performance_service.PerformanceService(
-            self.auth)
+            self.auth, self.http)
+        self.diagnostics_service = diagnostics_service.DiagnosticsService(
+            self.auth, self.http)
+        self.app_index = app_index.AppIdIndex(
+            self.app_info_service, config.APP_ID_INDEX_PATH)
+        # Every metrics snapshot fetched is kept, so versions can be compared later.
+        self.metrics_store = metrics_store.MetricsStore(config.METRICS_STORE_PATH)
+        self._recorded_metrics = {}
+        self.review_store = review_store.ReviewStore(
+            self.app_info_service, self.version_service, config.REVIEW_STORE_PATH)
+        self.build_index = build_index.BuildIndex(self.build_service)
+        self.watcher = watcher.Watcher(self.build_service, self.app_info_service)
+        # Email -> tester lookups are answered from memory, also inside BetaService.
+        self.tester_index = tester_index.TesterIndex(self.beta_service)
+        self.beta_service.tester_index = self.tester_index
+        # Runs the independent lookups of a multi-step operation side by side.
+        self.lookup_executor = ThreadPoolExecutor(
+            max_workers=config.LOOKUP_WORKERS, thread_name_prefix="lookup")
 
     def _handle_error(self, err):
         """Centralized error handler to return JSON."""
@@ -39,10 +81,24 @@ class AppStore:
                     "text": err.response.text}
         return {"error": str(err)}
 
+    def _get_app_id(self, bundle_id):
+        """Resolve a bundle ID to an app ID from the in-memory index."""
+        return self.app_index.get(bundle_id)
+
+    def prewarm_app_index(self):
+        """Load every bundle ID -> app ID mapping with one paginated sweep."""
+        try:
+            self.app_index.prewarm()
+            return self.app_index.stats()
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
     def list_apps(self):
         """Get a list of all apps."""
         try:
-            return self.app_info_service.list_apps()
+            apps = self.app_info_service.list_apps()
+            self.app_index.update_from(apps.get("data", []))
+            return apps
         except requests.exceptions.HTTPError as err:
             return self._handle_error(err)
 
@@ -56,7 +112,7 @@ class AppStore:
     def get_builds(self, bundle_id):
         """Get list of builds."""
         try:
-            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            app_id = self._get_app_id(bundle_id)
             if not app_id:
                 return {"error": f"App with bundle ID {bundle_id} not found."}
             return self.build_service.list_builds(app_id)
@@ -66,7 +122,7 @@ class AppStore:
     def get_beta_groups(self, bundle_id):
         """Get a list of beta groups for a specific app."""
         try:
-            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            app_id = self._get_app_id(bundle_id)
             if not app_id:
                 return {"error": f"App with bundle ID {bundle_id} not found."}
             return self.beta_service.fetch_beta_groups(app_id)
@@ -85,107 +141,365 @@ class AppStore:
         try:
             # Note: add_tester_to_groups from beta_service can handle multiple
             # groups
-            return self.beta_service.add_tester_to_groups(email, [group_id])
+            result = self.beta_service.add_tester_to_groups(email, [group_id])
+            self.tester_index.mark_dirty([email])
+            return result
         except requests.exceptions.HTTPError as err:
             return self._handle_error(err)
 
     def remove_tester_from_group(self, email, group_id, bundle_id):
         """Remove a beta tester from a group."""
         try:
-            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            app_id = self._get_app_id(bundle_id)
             if not app_id:
                 return {"error": f"App with bundle ID {bundle_id} not found."}
             # Note: remove_tester_from_groups from beta_service can handle
-            # multiple groups
-            return self.beta_service.remove_tester_from_groups(
+            # multiple groups; the tester ID comes from the tester index.
+            result = self.beta_service.remove_tester_from_groups(
                 email, [group_id], app_id)
+            if result:
+                self.tester_index.update_groups([email], [group_id], linked=False)
+            return result
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def bulk_update_testers(
+            self,
+            action,
+            group_ids,
+            testers=None,
+            csv_text=None,
+            on_outcome=None):
+        """Add or remove many beta testers; ``action`` is "add" or "remove".
+
+        Testers are emails or dicts with email, firstName and lastName, and/or
+        CSV text. Existing testers are linked in batches and new ones created
+        concurrently; see BulkTesterUpdate.
+        """
+        try:
+            parsed = tester_import.parse_testers(testers, csv_text)
+        except ValueError as err:
+            return {"error": str(err)}
+        if not parsed:
+            return {"error": "No testers given."}
+        bulk = tester_import.BulkTesterUpdate(self.beta_service)
+        try:
+            track = self._track_changes(group_ids, on_outcome)
+            if action == "remove":
+                return bulk.remove(parsed, group_ids, track)
+            return bulk.add(parsed, group_ids, track)
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def sync_beta_group(
+            self,
+            group_id,
+            testers=None,
+            csv_text=None,
+            dry_run=False,
+            on_outcome=None):
+        """Make a beta group's members exactly the given testers, applying only the delta."""
+        try:
+            parsed = tester_import.parse_testers(testers, csv_text)
+        except ValueError as err:
+            return {"error": str(err)}
+        bulk = tester_import.BulkTesterUpdate(self.beta_service)
+        try:
+            return bulk.sync(
+                group_id, parsed, dry_run, self._track_changes([group_id], on_outcome))
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def _track_changes(self, group_ids, on_outcome):
+        """Wrap a bulk outcome callback so changed testers are updated in the index."""
+        def track(outcome):
+            if outcome["status"] in ("linked", "removed"):
+                self.tester_index.update_groups(
+                    [outcome["email"]], group_ids, linked=outcome["status"] == "linked")
+            elif outcome["status"] == "created":
+                self.tester_index.mark_dirty([outcome["email"]])
+            if on_outcome:
+                on_outcome(outcome)
+        return track
+
+    def find_beta_tester(self, email):
+        """Return a tester's ID, groups and apps from the tester index."""
+        try:
+            tester = self.tester_index.find(email)
+            return tester or {"error": f"No beta tester with email {email}."}
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def get_beta_group_member_counts(self, group_ids=None):
+        """Return the number of testers in each (or the given) beta group."""
+        try:
+            return self.tester_index.group_member_counts(group_ids)
         except requests.exceptions.HTTPError as err:
             return self._handle_error(err)
 
     def get_performance_metrics(self, bundle_id):
         """Get performance metrics for a specific app."""
         try:
-            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            app_id = self._get_app_id(bundle_id)
             if not app_id:
                 return {"error": f"App with bundle ID {bundle_id} not found."}
-            return self.performance_service.get_perf_power_metrics(app_id)
+            document = self.performance_service.get_perf_power_metrics(app_id)
+            self._record_metrics(app_id, document)
+            return document
         except requests.exceptions.HTTPError as err:
             return self._handle_error(err)
 
-    def release_version(
-            self,
-            bundle_id,
-            version_string,
-            build_number,
-            _platform="IOS"):
-        """Creates a new version, assigns a build and submits it for review."""
+    def _record_metrics(self, app_id, document=None):
+        """Fetch (unless given) the app's metrics and store any snapshot not yet stored."""
+        columns = self.performance_service.get_metric_columns(app_id, document)
+        if self._recorded_metrics.get(app_id) is not columns:
+            self.metrics_store.record(app_id, columns)
+            self._recorded_metrics[app_id] = columns
+        return columns
+
+    def summarize_performance_metrics(  # pylint: disable=too-many-arguments
+            self, bundle_id, categories=None, device=None, percentile=None,
+            last_versions=None):
+        """Get launch, hang, memory and battery metrics per version with deltas."""
         try:
-            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            app_id = self._get_app_id(bundle_id)
             if not app_id:
-                return {
-                    "error": f"Could not find app with bundle ID {bundle_id}"}
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            columns = self._record_metrics(app_id)
+            summary = columns.summarize(
+                categories=categories or perf_metrics.SUMMARY_CATEGORIES,
+                device=device,
+                percentile=percentile,
+                last_versions=last_versions)
+            summary["bundleId"] = bundle_id
+            return summary
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
 
-            build_id = self._find_build_id(
-                app_id, version_string, build_number)
-            if not build_id:
-                return {
-                    "error": f"Could not find build for version {version_string} "
-                             f"and build number {build_number}"}
+    def detect_performance_regressions(  # pylint: disable=too-many-arguments
+            self, bundle_id, *, version=None, baseline=None, device=None,
+            percentile=None, refresh=False):
+        """Compare a version's metrics with an earlier version's from stored history.
 
-            version_info = self._find_version_info(app_id, version_string)
-            if not version_info:
-                return {
-                    "error": f"Version {version_string} not found. "
-                             f"Please create it on App Store Connect first."}
+        Metrics are fetched only when ``refresh`` is set or nothing is
+        stored for the app yet.
+        """
+        try:
+            app_id = self._get_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            if refresh or not self.metrics_store.versions(app_id):
+                self._record_metrics(app_id)
+            result = self.metrics_store.regressions(
+                app_id, version=version, baseline=baseline, device=device,
+                percentile=percentile)
+            if not result["baseline"]:
+                result["error"] = "No earlier version with stored metrics to compare with."
+            result["bundleId"] = bundle_id
+            return result
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def get_top_diagnostic_signatures(
+            self, bundle_id, last_builds=None, diagnostic_types=None, limit=None):
+        """Rank the hang and disk-write signatures of an app's recent builds."""
+        try:
+            app_id = self._get_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            report = diagnostics.DiagnosticsReport(
+                self.build_service, self.diagnostics_service)
+            result = report.top_signatures(
+                app_id, last_builds=last_builds,
+                diagnostic_types=diagnostic_types or diagnostics.DEFAULT_TYPES,
+                limit=limit)
+            result["bundleId"] = bundle_id
+            return result
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def download_diagnostic_logs(self, signature_ids):
+        """Stream the logs of diagnostic signatures to files."""
+        report = diagnostics.DiagnosticsReport(self.build_service, self.diagnostics_service)
+        return {"logs": report.download_logs(signature_ids)}
 
-            return self._handle_version_state(version_info, build_id)
+    def _reviews_app_id(self, bundle_id):
+        """Resolve a bundle ID, syncing its reviews first if none are stored yet."""
+        app_id = self._get_app_id(bundle_id)
+        if app_id and not self.review_store.has_reviews(app_id):
+            self.review_store.sync(app_id)
+        return app_id
 
+    def get_new_customer_reviews(self, bundle_id, limit=None):
+        """Sync an app's customer reviews and return the ones that are new."""
+        try:
+            app_id = self._get_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            result = self.review_store.sync(app_id)
+            result["reviews"] = self.review_store.new_since_last_sync(
+                app_id, limit or config.REVIEW_RESULT_LIMIT)
+            return result
         except requests.exceptions.HTTPError as err:
             return self._handle_error(err)
 
-    def _find_build_id(self, app_id, version_string, build_number):
-        """Helper method to find build ID by version string and build number."""
-        builds = self.build_service.list_builds(app_id)
+    def search_customer_reviews(  # pylint: disable=too-many-arguments
+            self, bundle_id, query, *, rating=None, territory=None, version=None,
+            limit=None):
+        """Search the locally stored customer reviews of an app."""
+        try:
+            app_id = self._reviews_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            return {"reviews": self.review_store.search(
+                app_id, query, rating=rating, territory=territory, version=version,
+                limit=limit or config.REVIEW_RESULT_LIMIT)}
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
 
-        if not builds or 'data' not in builds:
-            return None
+    def get_review_rating_histogram(self, bundle_id, group_by="version"):
+        """Count an app's stored reviews per star rating, by version or territory."""
+        try:
+            app_id = self._reviews_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            return {"groupBy": group_by,
+                    "groups": self.review_store.histogram(app_id, group_by)}
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
 
-        pre_release_versions = {
-            item['id']: item['attributes']
-            for item in builds.get('included', [])
-            if item['type'] == 'preReleaseVersions'
+    def get_rate_limit_status(self):
+        """Get the remaining API quota and current pace for each API key."""
+        return {
+            "keys": self.http.rate_limit_status(),
+            "requests_per_key": self.auth.usage(),
         }
 
-        for build in builds['data']:
-            attributes = build.get('attributes', {})
-            relationships = build.get('relationships', {})
+    def get_cache_stats(self):
+        """Get cache, request coalescing and token signing counters."""
+        return {
+            "jwt": self.auth.signing_stats(),
+            "responses": self.http.cache_stats(),
+            "coalesced_requests": self.http.coalescing_stats(),
+            "app_ids": self.app_index.stats(),
+            "builds": self.build_index.stats(),
+            "testers": self.tester_index.stats(),
+            "metrics_history": self.metrics_store.stats(),
+            "reviews": self.review_store.stats(),
+        }
 
-            pre_release_version_ref = relationships.get(
-                'preReleaseVersion', {}).get('data')
-            if not pre_release_version_ref:
-                continue
+    def release_version(
+            self,
+            bundle_id,
+            version_string,
+            build_number,
+            _platform="IOS"):
+        """Creates a new version, assigns a build and submits it for review.
 
-            pre_release_version_id = pre_release_version_ref.get('id')
-            pre_release_version_attrs = pre_release_versions.get(
-                pre_release_version_id)
+        Once the app ID is known, the build and version lookups run
+        concurrently. The result carries the time spent in each phase.
+        """
+        timings = {}
+        started = time.perf_counter()
+        try:
+            app_id = self._timed(timings, "app_id", self._get_app_id, bundle_id)
+            if not app_id:
+                return self._with_timings({
+                    "error": f"Could not find app with bundle ID {bundle_id}"},
+                    timings, started)
+
+            lookups_started = time.perf_counter()
+            build_cancelled = threading.Event()
+            build_future = submit_in_context(
+                self.lookup_executor, run_in_scope, build_cancelled, self._timed,
+                timings, "build_lookup", self._find_build_id, app_id, version_string,
+                build_number)
+            try:
+                version_info = self._timed(
+                    timings, "version_lookup",
+                    self._find_version_info, app_id, version_string)
+            except BaseException:
+                build_future.cancel()
+                build_cancelled.set()
+                raise
 
-            if not pre_release_version_attrs:
-                continue
+            if not version_info:
+                # The build is not needed; a lookup already running stops
+                # before its next request.
+                build_future.cancel()
+                build_cancelled.set()
+                timings["lookups"] = time.perf_counter() - lookups_started
+                return self._with_timings({
+                    "error": f"Version {version_string} not found. "
+                             f"Please create it on App Store Connect first."},
+                    timings, started)
 
-            build_v = attributes.get('version')
-            marketing_v = pre_release_version_attrs.get('version')
+            build_id = build_future.result()
+            timings["lookups"] = time.perf_counter() - lookups_started
 
-            if build_v == build_number and marketing_v == version_string:
-                return build['id']
-        return None
+            if not build_id:
+                return self._with_timings({
+                    "error": f"Could not find build for version {version_string} "
+                             f"and build number {build_number}"},
+                    timings, started)
+
+            result = self._timed(
+                timings, "action", self._handle_version_state, version_info, build_id)
+            return self._with_timings(result, timings, started)
+
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def release_versions(
+            self,
+            targets,
+            dry_run=False,
+            max_concurrency=None,
+            on_result=None):
+        """Releases several apps at once; see ReleaseOrchestrator.
+
+        ``targets`` is a list of ``(bundle_id, version_string, build_number)``.
+        With ``dry_run`` only the lookups run and the write steps are planned.
+        """
+        orchestrator = release_orchestrator.ReleaseOrchestrator(self, max_concurrency)
+        return orchestrator.run(targets, dry_run=dry_run, on_result=on_result)
+
+    @staticmethod
+    def _timed(timings, phase, fn, *args):
+        """Call ``fn(*args)`` and record how long it took under ``phase``."""
+        phase_started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[phase] = time.perf_counter() - phase_started
+
+    @staticmethod
+    def _with_timings(result, timings, started):
+        """Log the phase timings and attach them, in milliseconds, to a dict result."""
+        timings["total"] = time.perf_counter() - started
+        timings_ms = {phase: round(seconds * 1000, 1) for phase, seconds in timings.items()}
+        logging.info("release_version timings (ms): %s", timings_ms)
+        if isinstance(result, dict):
+            return {**result, "timings_ms": timings_ms}
+        return result
+
+    def _find_build_id(self, app_id, version_string, build_number):
+        """Helper method to find build ID by version string and build number.
+
+        Uses a server-filtered request first and falls back to paging
+        through the builds; see BuildIndex.
+        """
+        return self.build_index.get(app_id, version_string, build_number)
 
     def _find_version_info(self, app_id, version_string):
-        """Helper method to find version info by version string."""
-        all_versions = self.version_service.list(app_id)
-        if all_versions and 'data' in all_versions:
-            for v in all_versions['data']:
-                if v['attributes']['versionString'] == version_string:
-                    return v
+        """Helper method to find version info by version string.
+
+        The version is filtered on the server instead of listing every version.
+        """
+        versions = self.version_service.get_version(app_id, version_string)
+        for v in versions.get('data', []):
+            if v['attributes']['versionString'] == version_string:
+                return v
         return None
 
     def _handle_version_state(self, version_info, build_id):
@@ -216,10 +530,47 @@ class AppStore:
             return {
                 "error": f"Version is in an unhandled state: '{version_state}'. No action taken."}
 
+    def watch_build(self, bundle_id, version_string, build_number, until=None):
+        """Watch a build until it finishes processing (or reaches a state in ``until``)."""
+        try:
+            app_id = self._get_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            build_id = self._find_build_id(app_id, version_string, build_number)
+            if not build_id:
+                return {
+                    "error": f"Could not find build for version {version_string} "
+                             f"and build number {build_number}"}
+            return self.watcher.watch_build(
+                app_id, build_id, f"{bundle_id} {version_string} ({build_number})", until)
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def watch_version(self, bundle_id, version_string, until=None):
+        """Watch a version's App Store state until it changes (or reaches ``until``)."""
+        try:
+            app_id = self._get_app_id(bundle_id)
+            if not app_id:
+                return {"error": f"App with bundle ID {bundle_id} not found."}
+            return self.watcher.watch_version(
+                app_id, version_string, f"{bundle_id} {version_string}", until)
+        except requests.exceptions.HTTPError as err:
+            return self._handle_error(err)
+
+    def list_watches(self):
+        """Return the watched builds and versions and the polling counters."""
+        return self.watcher.list()
+
+    def unwatch(self, watch_id):
+        """Stop watching a build or version."""
+        if self.watcher.unwatch(watch_id):
+            return {"status": f"Watch {watch_id} removed."}
+        return {"error": f"No watch with ID {watch_id}."}
+
     def create_beta_group(self, name, bundle_id):
         """Create a new beta group."""
         try:
-            app_id = self.app_info_service.get_app_id_by_bundle_id(bundle_id)
+            app_id = self._get_app_id(bundle_id)
             if not app_id:
                 return {"error": f"App with bundle ID {bundle_id} not found."}
             return self.beta_service.create_beta_group(app_id, name)
@@ -227,8 +578,8 @@ class AppStore:
             return self._handle_error(err)
 
 
-def main():
-    """Command-line interface for App Store Connect API operations."""
+def _build_parser():
+    """Return the argument parser of the command-line interface."""
     parser = argparse.ArgumentParser(
         description="Interact with the App Store Connect API.")
     subparsers = parser.add_subparsers(dest="action", required=True)
@@ -256,6 +607,71 @@ def main():
         default="IOS",
         help="The platform (e.g., IOS, MAC_OS, TV_OS). Defaults to IOS.")
 
+    # Release several apps
+    parser_release_many = subparsers.add_parser(
+        "release_versions",
+        help="Release several apps at once, printing each result as it finishes.")
+    parser_release_many.add_argument(
+        "targets", nargs="+", metavar="BUNDLE_ID:VERSION:BUILD",
+        help="An app to release, e.g. 'com.example.app:1.2.3:42'.")
+    parser_release_many.add_argument(
+        "--dry-run", action="store_true",
+        help="Run the lookups only and print the steps that would run.")
+    parser_release_many.add_argument(
+        "--max-concurrency", type=int, default=None,
+        help="Release steps to run at once. Defaults to RELEASE_MAX_CONCURRENCY.")
+
+    # Bulk add or remove beta testers
+    parser_bulk = subparsers.add_parser(
+        "bulk_testers",
+        help="Add or remove many beta testers, printing each outcome as it is known.")
+    parser_bulk.add_argument("bulk_action", choices=["add", "remove"])
+    parser_bulk.add_argument(
+        "--group", dest="group_ids", action="append", required=True,
+        help="A beta group ID; repeat for several groups.")
+    parser_bulk.add_argument(
+        "--csv", dest="csv_file",
+        help="CSV file with an email column (and optional firstName, lastName), "
+             "or one email per line.")
+    parser_bulk.add_argument("emails", nargs="*", help="Tester email addresses.")
+
+    return parser
+
+
+def _release_versions(appstore, parser, args):
+    """Release the ``BUNDLE_ID:VERSION:BUILD`` targets, printing each result."""
+    targets = []
+    for target in args.targets:
+        parts = target.split(":")
+        if len(parts) != 3 or not all(parts):
+            parser.error(f"Invalid target '{target}', expected BUNDLE_ID:VERSION:BUILD")
+        targets.append(tuple(parts))
+    return appstore.release_versions(
+        targets,
+        dry_run=args.dry_run,
+        max_concurrency=args.max_concurrency,
+        on_result=lambda result: print(json.dumps(result), flush=True))
+
+
+def _bulk_testers(appstore, args):
+    """Add or remove testers, printing each outcome; returns the summary."""
+    csv_text = None
+    if args.csv_file:
+        with open(args.csv_file, "r", encoding="utf-8") as csv_file:
+            csv_text = csv_file.read()
+    report = appstore.bulk_update_testers(
+        args.bulk_action,
+        args.group_ids,
+        args.emails,
+        csv_text,
+        on_outcome=lambda outcome: print(json.dumps(outcome), flush=True))
+    # Outcomes were printed as they came in; finish with the summary.
+    return {key: value for key, value in report.items() if key != "outcomes"}
+
+
+def main():
+    """Command-line interface for App Store Connect API operations."""
+    parser = _build_parser()
     args = parser.parse_args()
     appstore = AppStore()
 
@@ -272,6 +688,10 @@ def main():
             args.version_string,
             args.build_number,
             args.platform)
+    elif args.action == "release_versions":
+        data = _release_versions(appstore, parser, args)
+    elif args.action == "bulk_testers":
+        data = _bulk_testers(appstore, args)
 
     if data:
         print(json.dumps(data, indent=2))
@@ -1,6 +1,8 @@
 """Service for managing App Store Connect beta testing operations."""
-import requests
 from .api_auth import AppStoreConnectAuth
+from .fieldsets import query_params
+from .http_client import HttpClient
+from .pagination import Paginator
 
 # Default timeout for all requests (30 seconds)
 REQUEST_TIMEOUT = 30
@@ -9,20 +11,42 @@ REQUEST_TIMEOUT = 30
 class BetaService:
     """Service for managing App Store Connect beta testing functionality."""
 
-    def __init__(self, auth: AppStoreConnectAuth):
+    def __init__(self, auth: AppStoreConnectAuth, http: HttpClient = None):
         self.auth = auth
+        self.http = http or HttpClient()
+        # Optional TesterIndex used to resolve emails without a request each.
+        self.tester_index = None
 
-    def fetch_beta_groups(self, app_id: str):
+    def iter_beta_groups(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
         """
-        Fetch a list of beta groups for a specific app.
+        Page through the beta groups of a specific app.
+        ``fields`` maps resource types to the attributes to fetch and
+        ``include`` names related resources to embed; see fieldsets.query_params.
         """
-        url = f"{self.auth.base_url}/betaGroups?filter[app]={app_id}"
-        response = requests.get(
-            url,
-            headers=self.auth.headers,
-            timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self.auth.base_url}/betaGroups"
+        params = {"filter[app]": app_id, **query_params("betaGroups", fields, include)}
+        return Paginator(
+            self.http, self.auth, url, params,
+            max_items=max_items, max_seconds=max_seconds)
+
+    def fetch_beta_groups(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        Fetch a list of beta groups for a specific app, following every page.
+        """
+        return self.iter_beta_groups(
+            app_id, max_items, max_seconds, fields, include).collect()
 
     def add_tester_to_groups(
             self,
@@ -55,9 +79,9 @@ class BetaService:
             }
         }
 
-        response = requests.post(
+        response = self.http.post(
             url,
-            headers=self.auth.headers,
+            headers=self.auth.write_headers,
             json=payload,
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
@@ -67,10 +91,13 @@ class BetaService:
         """
         Helper function to find a beta tester's ID by their email for a specific app.
         """
+        if self.tester_index is not None:
+            return self.tester_index.tester_id(email, app_id)
         url = f"{self.auth.base_url}/betaTesters?filter[email]={email}&filter[apps]={app_id}"
-        response = requests.get(
+        response = self.http.get(
             url,
             headers=self.auth.headers,
+            params=query_params("betaTesters", {"betaTesters": ("email",)}),
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
@@ -95,37 +122,144 @@ class BetaService:
                          for group_id in group_ids]
         payload = {"data": linkages_data}
 
-        response = requests.delete(
+        response = self.http.delete(
             url,
-            headers=self.auth.headers,
+            headers=self.auth.write_headers,
             json=payload,
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.status_code == 204
 
-    def list_beta_testers(self, app_id: str):
+    def find_testers_by_email(self, emails: list, fields: dict = None):
         """
-        List all beta testers for a specific app.
+        Fetch the beta testers with any of the given email addresses in one request.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/betaTesters?filter[email]={E1},{E2}
         """
-        url = f"{self.auth.base_url}/betaTesters?filter[apps]={app_id}"
-        response = requests.get(
+        url = f"{self.auth.base_url}/betaTesters"
+        params = {
+            "filter[email]": ",".join(emails),
+            "limit": 200,
+            **query_params("betaTesters", fields or {"betaTesters": ("email",)}),
+        }
+        return Paginator(self.http, self.auth, url, params).collect()
+
+    def iter_testers_with_memberships(self, emails: list = None):
+        """
+        Page through beta testers across all apps with their groups and apps included.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/betaTesters
+        ?include=betaGroups,apps
+        Pass ``emails`` to fetch only those testers.
+        """
+        url = f"{self.auth.base_url}/betaTesters"
+        params = {
+            # Apple caps included to-many relationships at 50 per resource.
+            "limit[betaGroups]": 50,
+            "limit[apps]": 50,
+            **query_params(
+                "betaTesters",
+                {"betaTesters": ("email", "firstName", "lastName"),
+                 "betaGroups": ("name",),
+                 "apps": ("bundleId", "name")},
+                ("betaGroups", "apps")),
+        }
+        if emails:
+            params["filter[email]"] = ",".join(emails)
+        return Paginator(self.http, self.auth, url, params)
+
+    def add_testers_to_group(self, group_id: str, tester_ids: list):
+        """
+        Link existing beta testers to a beta group in one request.
+        Endpoint: POST https://api.appstoreconnect.apple.com/v1/betaGroups/{id}
+        /relationships/betaTesters
+        """
+        url = f"{self.auth.base_url}/betaGroups/{group_id}/relationships/betaTesters"
+        payload = {"data": [{"type": "betaTesters", "id": tester_id}
+                            for tester_id in tester_ids]}
+        response = self.http.post(
             url,
-            headers=self.auth.headers,
+            headers=self.auth.write_headers,
+            json=payload,
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return response.status_code == 204
 
-    def list_testers_in_group(self, group_id: str):
+    def remove_testers_from_group(self, group_id: str, tester_ids: list):
         """
-        Fetch a list of beta testers from a specific beta group.
+        Unlink beta testers from a beta group in one request.
+        Endpoint: DELETE https://api.appstoreconnect.apple.com/v1/betaGroups/{id}
+        /relationships/betaTesters
         """
-        url = f"{self.auth.base_url}/betaGroups/{group_id}/betaTesters"
-        response = requests.get(
+        url = f"{self.auth.base_url}/betaGroups/{group_id}/relationships/betaTesters"
+        payload = {"data": [{"type": "betaTesters", "id": tester_id}
+                            for tester_id in tester_ids]}
+        response = self.http.delete(
             url,
-            headers=self.auth.headers,
+            headers=self.auth.write_headers,
+            json=payload,
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return response.status_code == 204
+
+    def iter_beta_testers(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        Page through the beta testers of a specific app.
+        ``fields`` maps resource types to the attributes to fetch and
+        ``include`` names related resources to embed; see fieldsets.query_params.
+        """
+        url = f"{self.auth.base_url}/betaTesters"
+        params = {"filter[apps]": app_id, **query_params("betaTesters", fields, include)}
+        return Paginator(
+            self.http, self.auth, url, params,
+            max_items=max_items, max_seconds=max_seconds)
+
+    def list_beta_testers(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        List all beta testers for a specific app, following every page.
+        """
+        return self.iter_beta_testers(
+            app_id, max_items, max_seconds, fields, include).collect()
+
+    def iter_testers_in_group(
+            self,
+            group_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        Page through the beta testers of a specific beta group.
+        ``fields`` maps resource types to the attributes to fetch and
+        ``include`` names related resources to embed; see fieldsets.query_params.
+        """
+        url = f"{self.auth.base_url}/betaGroups/{group_id}/betaTesters"
+        return Paginator(
+            self.http, self.auth, url, query_params("betaTesters", fields, include),
+            max_items=max_items, max_seconds=max_seconds)
+
+    def list_testers_in_group(
+            self,
+            group_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        Fetch a list of beta testers from a specific beta group, following every page.
+        """
+        return self.iter_testers_in_group(
+            group_id, max_items, max_seconds, fields, include).collect()
 
     def create_beta_group(self, app_id: str, name: str):
         """
@@ -148,9 +282,9 @@ class BetaService:
                 }
             }
         }
-        response = requests.post(
+        response = self.http.post(
             url,
-            headers=self.auth.headers,
+            headers=self.auth.write_headers,
             json=payload,
             timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
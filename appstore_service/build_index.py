@@ -0,0 +1,132 @@
+"""In-memory index from (marketing version, build number) to build IDs."""
+import logging
+import threading
+import time
+import requests
+from . import config
+
+# Returned by the filtered lookup when the server rejected the filter.
+_FILTER_REJECTED = object()
+
+
+def builds_in_page(page: dict):
+    """Yield ``(marketing_version, build_number, build_id)`` for each build in a page.
+
+    The page must come from ``GET /v1/builds`` with
+    ``include=preReleaseVersion``; builds whose pre-release version is not
+    included are skipped.
+    """
+    pre_release_versions = {
+        item["id"]: item.get("attributes", {}).get("version")
+        for item in page.get("included", [])
+        if item.get("type") == "preReleaseVersions"
+    }
+    for build in page.get("data", []):
+        reference = (build.get("relationships", {})
+                     .get("preReleaseVersion", {}).get("data"))
+        if not reference:
+            continue
+        marketing_version = pre_release_versions.get(reference.get("id"))
+        build_number = build.get("attributes", {}).get("version")
+        if marketing_version and build_number:
+            yield marketing_version, build_number, build["id"]
+
+
+class BuildIndex:  # pylint: disable=too-many-instance-attributes
+    """Resolves a marketing version and build number to a build ID.
+
+    A lookup asks App Store Connect for the exact build with
+    ``filter[version]`` and ``filter[preReleaseVersion.version]``. Only if
+    the server rejects that filter are the builds paged through newest
+    first until the build turns up. Every build seen on the way is
+    recorded, since a build's ID never changes, so later lookups are
+    answered from memory. Builds that do not exist (yet) are remembered as
+    missing for ``negative_ttl`` seconds.
+    """
+
+    def __init__(self, build_service, negative_ttl: float = None):
+        self.build_service = build_service
+        self.negative_ttl = (config.BUILD_NEGATIVE_TTL
+                             if negative_ttl is None else negative_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.filtered_lookups = 0
+        self.scans = 0
+        self._ids = {}
+        self._missing = {}
+        self._lock = threading.Lock()
+
+    def get(self, app_id: str, version_string: str, build_number: str):
+        """Return the build ID, or None if the app has no such build."""
+        key = (app_id, version_string, build_number)
+        with self._lock:
+            build_id = self._ids.get(key)
+            if build_id:
+                self.hits += 1
+                return build_id
+            expires = self._missing.get(key)
+            if expires is not None:
+                if time.monotonic() < expires:
+                    self.hits += 1
+                    return None
+                del self._missing[key]
+            self.misses += 1
+
+        build_id = self._filtered_lookup(app_id, version_string, build_number)
+        if build_id is _FILTER_REJECTED:
+            build_id = self._scan(app_id, key)
+        if not build_id:
+            with self._lock:
+                self._missing[key] = time.monotonic() + self.negative_ttl
+        return build_id
+
+    def _filtered_lookup(self, app_id, version_string, build_number):
+        """Ask the server for the build directly.
+
+        Returns the build ID, None if there is no such build, or
+        ``_FILTER_REJECTED`` if the server did not accept the filter.
+        """
+        with self._lock:
+            self.filtered_lookups += 1
+        try:
+            page = self.build_service.find_builds(app_id, version_string, build_number)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            # The filter was rejected; the scan still finds the build.
+            logging.warning("Filtered build lookup failed, scanning builds: %s", e)
+            return _FILTER_REJECTED
+        self.add_page(app_id, page)
+        with self._lock:
+            return self._ids.get((app_id, version_string, build_number))
+
+    def _scan(self, app_id, key):
+        """Page through the app's builds until ``key`` is found."""
+        with self._lock:
+            self.scans += 1
+        for page in self.build_service.iter_builds(app_id).pages():
+            self.add_page(app_id, page)
+            with self._lock:
+                build_id = self._ids.get(key)
+            if build_id:
+                return build_id
+        return None
+
+    def add_page(self, app_id: str, page: dict):
+        """Record every build in a page of builds for ``app_id``."""
+        with self._lock:
+            for marketing_version, build_number, build_id in builds_in_page(page):
+                key = (app_id, marketing_version, build_number)
+                self._ids[key] = build_id
+                self._missing.pop(key, None)
+
+    def stats(self):
+        """Return the size and hit counters of the index."""
+        with self._lock:
+            return {
+                "builds": len(self._ids),
+                "hits": self.hits,
+                "misses": self.misses,
+                "filtered_lookups": self.filtered_lookups,
+                "scans": self.scans,
+            }
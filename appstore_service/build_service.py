@@ -1,6 +1,8 @@
 """Service for managing App Store Connect build operations."""
-import requests
 from .api_auth import AppStoreConnectAuth
+from .fieldsets import query_params
+from .http_client import HttpClient
+from .pagination import Paginator
 
 # Default timeout for all requests (30 seconds)
 REQUEST_TIMEOUT = 30
@@ -9,28 +11,109 @@ REQUEST_TIMEOUT = 30
 class BuildService:
     """Service for managing App Store Connect build operations."""
 
-    def __init__(self, auth: AppStoreConnectAuth):
+    def __init__(self, auth: AppStoreConnectAuth, http: HttpClient = None):
         self.auth = auth
+        self.http = http or HttpClient()
 
-    def list_builds(self, app_id: str):
+    def iter_builds(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
         """
-        Fetch a list of builds for a specific app.
+        Page through the builds of a specific app, newest first.
         Endpoint: GET https://api.appstoreconnect.apple.com/v1/builds
         ?filter[app]={APP_ID}&include=preReleaseVersion
+        ``fields`` maps resource types to the attributes to fetch and
+        ``include`` names related resources to embed; see fieldsets.query_params.
         """
-        url = f"{self.auth.base_url}/builds?filter[app]={app_id}&include=preReleaseVersion&limit=50"
-        response = requests.get(
-            url, headers=self.auth.headers, timeout=REQUEST_TIMEOUT)
+        url = f"{self.auth.base_url}/builds"
+        params = {
+            "filter[app]": app_id,
+            "sort": "-uploadedDate",
+            **query_params("builds", fields, include, ("preReleaseVersion",)),
+        }
+        return Paginator(
+            self.http, self.auth, url, params,
+            max_items=max_items, max_seconds=max_seconds)
+
+    def list_builds(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        Fetch the builds of a specific app, following every page.
+        """
+        return self.iter_builds(
+            app_id, max_items, max_seconds, fields, include).collect()
+
+    def find_builds(
+            self,
+            app_id: str,
+            version_string: str,
+            build_number: str,
+            fields: dict = None):
+        """
+        Fetch the builds of an app with a given marketing version and build number.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/builds
+        ?filter[app]={APP_ID}&filter[version]={BUILD_NUMBER}
+        &filter[preReleaseVersion.version]={VERSION}&include=preReleaseVersion
+        """
+        url = f"{self.auth.base_url}/builds"
+        params = {
+            "filter[app]": app_id,
+            "filter[version]": build_number,
+            "filter[preReleaseVersion.version]": version_string,
+            **query_params("builds", fields, None, ("preReleaseVersion",)),
+        }
+        response = self.http.get(
+            url,
+            headers=self.auth.headers,
+            params=params,
+            timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def get_builds_by_id(
+            self,
+            build_ids: list,
+            fields: dict = None,
+            cache: bool = True):
+        """
+        Fetch several builds in one request.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/builds?filter[id]={ID1},{ID2}
+        Pass ``cache=False`` to see the latest processing state.
+        """
+        url = f"{self.auth.base_url}/builds"
+        params = {
+            "filter[id]": ",".join(build_ids),
+            "limit": len(build_ids),
+            **query_params("builds", fields, ()),
+        }
+        response = self.http.get(
+            url,
+            headers=self.auth.headers,
+            params=params,
+            cache=cache,
+            timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
-    def get_build_details(self, build_id: str):
+    def get_build_details(self, build_id: str, fields: dict = None, include=None):
         """
         Fetch details for a specific build.
         Endpoint: GET https://api.appstoreconnect.apple.com/v1/builds/{build_id}
         """
         url = f"{self.auth.base_url}/builds/{build_id}"
-        response = requests.get(
-            url, headers=self.auth.headers, timeout=REQUEST_TIMEOUT)
+        response = self.http.get(
+            url,
+            headers=self.auth.headers,
+            params=query_params("builds", fields, include),
+            timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
@@ -0,0 +1,84 @@
+"""Cooperative cancellation for in-flight App Store Connect operations.
+
+The MCP server runs every tool call inside a cancellation scope. Code that is
+about to start another upstream request calls ``check_cancelled()`` so that a
+call the client has given up on stops spending rate-limit budget.
+"""
+import contextlib
+import contextvars
+import time
+
+
+class RequestCancelled(Exception):
+    """Raised when the operation running in the current context was cancelled."""
+
+
+# The cancel events of the current scope and every scope enclosing it.
+_current_events = contextvars.ContextVar("cancel_events", default=())
+
+# How often wait() looks at the enclosing scopes' events.
+_POLL_SECONDS = 0.05
+
+
+@contextlib.contextmanager
+def cancellation_scope(event):
+    """Bind a ``threading.Event`` as the cancel signal for the enclosed code.
+
+    Scopes nest: the enclosed code is cancelled when ``event`` or the event
+    of any enclosing scope is set.
+    """
+    token = _current_events.set(_current_events.get() + (event,))
+    try:
+        yield event
+    finally:
+        _current_events.reset(token)
+
+
+def is_cancelled():
+    """Return True if the current operation has been cancelled."""
+    return any(event.is_set() for event in _current_events.get())
+
+
+def check_cancelled():
+    """Raise RequestCancelled if the current operation has been cancelled."""
+    if is_cancelled():
+        raise RequestCancelled("Operation was cancelled by the client")
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """Submit ``fn`` to ``executor`` with a copy of the caller's context.
+
+    Worker threads otherwise start with an empty context, so work fanned out
+    from a tool call would not see that call's cancellation scope.
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+def run_in_scope(event, fn, *args, **kwargs):
+    """Call ``fn`` inside ``cancellation_scope(event)``.
+
+    Submitted with ``submit_in_context``, this lets the submitter cancel one
+    task by setting ``event`` while the task still sees its caller's scope.
+    """
+    with cancellation_scope(event):
+        return fn(*args, **kwargs)
+
+
+def wait(seconds):
+    """Sleep for ``seconds``, waking early to raise if the operation is cancelled."""
+    events = _current_events.get()
+    if not events:
+        time.sleep(seconds)
+        return
+    if len(events) == 1:
+        if events[0].wait(seconds):
+            raise RequestCancelled("Operation was cancelled by the client")
+        return
+    deadline = time.monotonic() + seconds
+    while True:
+        check_cancelled()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events[-1].wait(min(remaining, _POLL_SECONDS))
@@ -5,3 +5,70 @@ ISSUER_ID = "REDACT"  # The issuer ID of the key you want to use to access the a
 PRIVATE_KEY_PATH = "REDACT"
 APP_ID = "REDACT"  # The app ID of the app you want to access
 EXPIRATION_MINUTES = 19  # 19 minutes is the minimum allowed by Apple
+MAX_CONCURRENT_TOOL_CALLS = 4  # Number of MCP tool calls the server runs at the same time
+HTTP_POOL_CONNECTIONS = 4  # Number of hosts to keep pooled keep-alive connections for
+HTTP_POOL_MAXSIZE = 10  # Maximum keep-alive connections kept open per host
+HTTP_POOL_BLOCK = True  # Wait for a free pooled connection instead of opening extra ones
+RATE_LIMIT_PER_SECOND = 5  # Sustained request rate allowed while the hourly quota is healthy
+RATE_LIMIT_BURST = 10  # Requests that may go out back-to-back before pacing kicks in
+RATE_LIMIT_LOW_WATERMARK = 0.1  # Fraction of the hourly quota below which requests slow down
+RATE_LIMIT_MAX_RETRIES = 4  # Retries for 429 and 5xx responses
+RATE_LIMIT_BACKOFF_BASE = 1.0  # Seconds before the first retry; doubled on each attempt
+RATE_LIMIT_BACKOFF_MAX = 60  # Upper bound in seconds for a single retry delay
+# Where the bundle ID -> app ID index is saved between runs (None keeps it in memory only)
+APP_ID_INDEX_PATH = "cache/app_id_index.json"
+APP_ID_NEGATIVE_TTL = 300  # Seconds an unknown bundle ID is remembered as missing
+BUILD_NEGATIVE_TTL = 60  # Seconds a build that was not found is remembered as missing
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Memory budget for cached GET responses
+# Seconds a GET response is reused, keyed by the resource type it returns (0 disables)
+RESPONSE_CACHE_TTLS = {
+    "apps": 3600,
+    "builds": 60,
+    "betaGroups": 300,
+    "betaTesters": 120,
+    "appStoreVersions": 60,
+    "perfPowerMetrics": 3600,
+}
+# More API keys to spread requests across, each a dict with "key_id", "issuer_id"
+# and "private_key_path". The key configured above is always part of the pool.
+EXTRA_API_KEYS = []
+WRITE_KEY_ID = None  # Key ID that all mutating requests are pinned to (None: pick like reads)
+KEY_SELECTION = "remaining_budget"  # How reads pick a key: "remaining_budget" or "least_used"
+LOG_LEVEL = "INFO"  # Minimum level written to logs/app_store_connect_server.log
+LOG_STDERR_LEVEL = "INFO"  # Minimum level written to stderr
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Log file size that triggers a rotation
+LOG_BACKUP_COUNT = 5  # Rotated log files kept next to the current one
+LOG_QUEUE_SIZE = 10000  # Log records buffered for the writer thread before new ones are dropped
+# How raw JSON-RPC messages are logged: "off", "truncate" or "full"
+LOG_PAYLOADS = "truncate"
+LOG_PAYLOAD_MAX_CHARS = 1000  # Characters of each payload kept when truncating
+LOG_PAYLOAD_SAMPLE_RATE = 1.0  # Fraction of payloads that are logged at all
+RESULT_ENCODING = "compact"  # Tool result JSON layout: "compact" or "pretty" (indented)
+RESULT_PROJECTION = True  # Strip links and unused relationships from tool results
+RESULT_SIZE_SAMPLE_EVERY = 10  # Measure the unprojected size of every Nth result per tool
+# Request only the attributes the tools use (fields[type]=...); False fetches every attribute
+SPARSE_FIELDSETS = True
+LOOKUP_WORKERS = 4  # Threads for lookups that run side by side within one tool call
+RELEASE_MAX_CONCURRENCY = 4  # Release steps run at the same time across apps in release-versions
+WATCH_MIN_INTERVAL = 30  # Seconds between watch polls right after a state change
+WATCH_MAX_INTERVAL = 300  # Longest wait between watch polls while nothing changes
+WATCH_BACKOFF = 1.5  # Factor the watch poll interval grows by after a quiet poll
+WATCH_BATCH_SIZE = 50  # Builds or apps checked per request with filter[id]
+BULK_TESTER_WORKERS = 4  # New beta testers created at the same time by bulk imports
+BULK_TESTER_BATCH_SIZE = 100  # Testers per filter[email] lookup and per group link request
+TESTER_INDEX_MAX_AGE = 3600  # Seconds before the beta tester index is rebuilt from a full listing
+TESTER_NEGATIVE_TTL = 60  # Seconds an email with no beta tester is remembered as missing
+PERF_METRICS_DEVICE = "all_iPhones"  # Device class summarized by summarize-performance-metrics
+PERF_METRICS_PERCENTILE = "percentile.fifty"  # Percentile summarized ("percentile.ninety" for p90)
+# Where every performance metric point seen is kept, for regression checks (None: memory only)
+METRICS_STORE_PATH = "cache/perf_metrics.sqlite3"
+METRICS_REGRESSION_Z = 1.96  # z-score a change must reach to count as significant (95%)
+METRICS_REGRESSION_MIN_CHANGE = 0.05  # Smallest relative change reported as a regression
+DIAGNOSTICS_WORKERS = 4  # Builds whose diagnostic signatures (or logs) are fetched at once
+DIAGNOSTICS_LAST_BUILDS = 5  # Recent builds scanned for diagnostic signatures by default
+DIAGNOSTICS_TOP_SIGNATURES = 10  # Signatures reported per diagnostic type
+DIAGNOSTIC_LOG_DIR = "cache/diagnostic_logs"  # Where diagnostic logs are streamed to
+# Where customer reviews are kept for search and histograms (None: memory only)
+REVIEW_STORE_PATH = "cache/customer_reviews.sqlite3"
+REVIEW_SYNC_VERSIONS = 3  # Newest versions whose reviews are tagged with the version on each sync
+REVIEW_RESULT_LIMIT = 20  # Reviews returned by review search and new-review tools by default
@@ -0,0 +1,148 @@
+"""Diagnostic signatures ranked across the recent builds of an app.
+
+App Store Connect reports diagnostic signatures per build, each with a
+weight: the share of that build's hangs (or disk writes, or launches)
+that the signature accounts for. ``DiagnosticsReport`` fetches the
+signatures of the last N builds concurrently and merges them by signature,
+so a hang that has been in every recent build ranks above one that spiked
+once.
+"""
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from . import config
+from .build_index import builds_in_page
+from .cancellation import submit_in_context
+
+# Diagnostic types ranked unless others are asked for.
+DEFAULT_TYPES = ("HANGS", "DISK_WRITES")
+
+# Signature IDs become file names, so only plain IDs are accepted.
+_SIGNATURE_ID = re.compile(r"^[A-Za-z0-9][\w-]*$")
+
+
+class DiagnosticsReport:
+    """Aggregates diagnostic signatures across builds with bounded concurrency."""
+
+    def __init__(self, build_service, diagnostics_service, max_workers: int = None):
+        self.build_service = build_service
+        self.diagnostics_service = diagnostics_service
+        self.max_workers = max(1, max_workers or config.DIAGNOSTICS_WORKERS)
+
+    def recent_builds(self, app_id: str, count: int):
+        """Return ``[{"id", "version", "buildNumber"}]`` for the newest ``count`` builds."""
+        builds = []
+        for page in self.build_service.iter_builds(
+                app_id, max_items=count,
+                fields={"builds": ("version",),
+                        "preReleaseVersions": ("version",)}).pages():
+            builds.extend({"id": build_id, "version": version, "buildNumber": number}
+                          for version, number, build_id in builds_in_page(page))
+        return builds[:count]
+
+    def top_signatures(  # pylint: disable=too-many-locals
+            self,
+            app_id: str,
+            last_builds: int = None,
+            diagnostic_types=DEFAULT_TYPES,
+            limit: int = None):
+        """Return the heaviest signatures of each type across the recent builds.
+
+        A signature's ``weight`` is its mean weight over all builds scanned,
+        counting builds where it did not occur as zero.
+        """
+        started = time.perf_counter()
+        last_builds = last_builds or config.DIAGNOSTICS_LAST_BUILDS
+        limit = limit or config.DIAGNOSTICS_TOP_SIGNATURES
+        builds = self.recent_builds(app_id, last_builds)
+
+        merged, errors = {}, {}
+        with ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="diagnostics") as executor:
+            futures = {
+                submit_in_context(executor, self._signatures, build["id"],
+                                  diagnostic_types): build
+                for build in builds}
+            for future in as_completed(futures):
+                build = futures[future]
+                try:
+                    signatures = future.result()
+                except requests.exceptions.RequestException as e:
+                    errors[build["id"]] = str(e)
+                    continue
+                for signature in signatures:
+                    attributes = signature.get("attributes", {})
+                    key = (attributes.get("diagnosticType"), attributes.get("signature"))
+                    entry = merged.setdefault(key, {"weight": 0.0, "builds": []})
+                    entry["weight"] += attributes.get("weight") or 0.0
+                    entry["builds"].append({
+                        "version": build["version"],
+                        "buildNumber": build["buildNumber"],
+                        "weight": attributes.get("weight"),
+                        "signatureId": signature["id"],
+                    })
+
+        scanned = len(builds) - len(errors)
+        ranked = {diagnostic_type: [] for diagnostic_type in diagnostic_types}
+        for (diagnostic_type, signature), entry in sorted(
+                merged.items(), key=lambda item: -item[1]["weight"]):
+            top = ranked.setdefault(diagnostic_type, [])
+            if len(top) < limit:
+                top.append({
+                    "signature": signature,
+                    "weight": round(entry["weight"] / scanned, 4) if scanned else None,
+                    "buildCount": len(entry["builds"]),
+                    "builds": sorted(entry["builds"],
+                                     key=lambda build: build["weight"] or 0, reverse=True),
+                })
+
+        result = {
+            "builds": [f"{build['version']} ({build['buildNumber']})" for build in builds],
+            "signatures": ranked,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if errors:
+            result["errors"] = errors
+        return result
+
+    def _signatures(self, build_id, diagnostic_types):
+        """Return every signature of the given types for one build."""
+        return list(self.diagnostics_service.iter_signatures(
+            build_id, diagnostic_types))
+
+    def download_logs(self, signature_ids, directory: str = None):
+        """Stream the logs of several signatures to files, concurrently.
+
+        Each log is written to ``<directory>/<signature id>.json`` as it
+        downloads. Returns one ``{"signatureId", "path", "bytes"}`` (or
+        ``"error"``) per signature.
+        """
+        directory = directory or config.DIAGNOSTIC_LOG_DIR
+        os.makedirs(directory, exist_ok=True)
+        with ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="diagnostic-logs") as executor:
+            futures = [submit_in_context(executor, self._download, signature_id, directory)
+                       for signature_id in signature_ids]
+            return [future.result() for future in futures]
+
+    def _download(self, signature_id, directory):
+        """Stream one signature's logs to a file, replacing it only once complete."""
+        if not _SIGNATURE_ID.match(signature_id):
+            return {"signatureId": signature_id, "error": "Invalid signature ID"}
+        path = os.path.join(directory, f"{signature_id}.json")
+        partial = f"{path}.part"
+        try:
+            with open(partial, "wb") as out:
+                written = self.diagnostics_service.stream_logs(signature_id, out)
+            os.replace(partial, path)
+        except (requests.exceptions.RequestException, OSError) as e:
+            return {"signatureId": signature_id, "error": str(e)}
+        finally:
+            # Left behind by any failure, including a cancellation mid-stream.
+            if os.path.exists(partial):
+                os.remove(partial)
+        return {"signatureId": signature_id, "path": path, "bytes": written}
@@ -0,0 +1,54 @@
+"""Service for retrieving App Store Connect diagnostic signatures and logs."""
+from .api_auth import AppStoreConnectAuth
+from .fieldsets import query_params
+from .http_client import HttpClient
+from .pagination import Paginator
+
+# Default timeout for all requests (30 seconds)
+REQUEST_TIMEOUT = 30
+
+# Bytes read from a streamed log response at a time.
+LOG_CHUNK_SIZE = 64 * 1024
+
+
+class DiagnosticsService:
+    """Service for retrieving hang, disk-write and launch diagnostics of builds."""
+
+    def __init__(self, auth: AppStoreConnectAuth, http: HttpClient = None):
+        self.auth = auth
+        self.http = http or HttpClient()
+
+    def iter_signatures(self, build_id: str, diagnostic_types=None, fields: dict = None):
+        """
+        Page through the diagnostic signatures of a build.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/builds/{BUILD_ID}
+        /diagnosticSignatures?filter[diagnosticType]=HANGS,DISK_WRITES
+        """
+        url = f"{self.auth.base_url}/builds/{build_id}/diagnosticSignatures"
+        params = query_params("diagnosticSignatures", fields, ())
+        if diagnostic_types:
+            params["filter[diagnosticType]"] = ",".join(diagnostic_types)
+        return Paginator(self.http, self.auth, url, params)
+
+    def stream_logs(self, signature_id: str, out):
+        """
+        Write the logs of a diagnostic signature to the binary file ``out``.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/diagnosticSignatures
+        /{SIGNATURE_ID}/logs
+        The body is copied in chunks as it arrives, so large logs are never
+        held in memory. Returns the number of bytes written.
+        """
+        url = f"{self.auth.base_url}/diagnosticSignatures/{signature_id}/logs"
+        headers = self.auth.headers.copy()
+        headers["Accept"] = "application/vnd.apple.diagnostic-logs+json, application/json"
+        response = self.http.get(
+            url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+        try:
+            response.raise_for_status()
+            written = 0
+            for chunk in response.iter_content(chunk_size=LOG_CHUNK_SIZE):
+                out.write(chunk)
+                written += len(chunk)
+            return written
+        finally:
+            response.close()
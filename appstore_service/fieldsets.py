@@ -0,0 +1,80 @@
+"""JSON:API sparse fieldsets and includes for App Store Connect requests.
+
+App Store Connect returns every attribute of a resource unless the request
+names the ones it wants with ``fields[type]=``. The defaults below cover
+what the MCP tools return and what the services read internally, so
+responses scale with what is used rather than with Apple's full schema.
+"""
+from . import config
+
+# Attributes (and relationships, which JSON:API lists in the same fieldset)
+# requested by default for each resource type. A relationship has to be in
+# its resource's fieldset for included resources to be linked to it.
+DEFAULT_FIELDS = {
+    "apps": ("name", "bundleId", "sku", "primaryLocale"),
+    "builds": ("version", "uploadedDate", "expirationDate", "expired",
+               "minOsVersion", "processingState"),
+    "preReleaseVersions": ("version", "platform"),
+    "betaGroups": ("name", "isInternalGroup", "publicLinkEnabled", "publicLink",
+                   "createdDate"),
+    "betaTesters": ("firstName", "lastName", "email", "inviteType"),
+    "appStoreVersions": ("versionString", "platform", "appStoreState",
+                         "releaseType", "createdDate"),
+    "diagnosticSignatures": ("diagnosticType", "signature", "weight"),
+    "customerReviews": ("rating", "title", "body", "reviewerNickname", "createdDate",
+                        "territory"),
+}
+
+# Resource type returned by each relationship that can be included.
+INCLUDE_TYPES = {
+    "app": "apps",
+    "build": "builds",
+    "builds": "builds",
+    "preReleaseVersion": "preReleaseVersions",
+    "appStoreVersions": "appStoreVersions",
+    "betaGroups": "betaGroups",
+    "betaTesters": "betaTesters",
+}
+
+
+def query_params(
+        resource_type: str,
+        fields: dict = None,
+        include=None,
+        default_include=()):
+    """Return the ``fields[...]`` and ``include`` query parameters for a request.
+
+    Args:
+        resource_type: Type of the primary resources, e.g. ``"builds"``.
+        fields: Attribute names per resource type, replacing the defaults
+            for that type. ``None`` for a type requests all of its
+            attributes.
+        include: Relationships to include; ``None`` uses ``default_include``
+            and an empty sequence includes nothing.
+        default_include: The method's default relationships to include.
+
+    Returns:
+        dict: Query parameters to merge into the request's params.
+    """
+    include = tuple(default_include if include is None else include)
+    params = {}
+    if include:
+        params["include"] = ",".join(include)
+    if not config.SPARSE_FIELDSETS:
+        return params
+
+    selected = {resource_type: DEFAULT_FIELDS.get(resource_type)}
+    for name in include:
+        included_type = INCLUDE_TYPES.get(name)
+        if included_type:
+            selected[included_type] = DEFAULT_FIELDS.get(included_type)
+    selected.update(fields or {})
+
+    for type_name, names in selected.items():
+        if not names:
+            continue
+        names = list(names)
+        if type_name == resource_type:
+            names += [name for name in include if name not in names]
+        params[f"fields[{type_name}]"] = ",".join(names)
+    return params
@@ -0,0 +1,200 @@
+"""Shared, connection-pooled HTTP client for App Store Connect requests."""
+import functools
+import threading
+import jwt
+import requests
+from requests.adapters import HTTPAdapter
+from . import config
+from .api_auth import PooledHeaders
+from .cancellation import check_cancelled, wait
+from .rate_limit import RateLimiter
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+
+# Default timeout for all requests (30 seconds)
+REQUEST_TIMEOUT = 30
+
+
+@functools.lru_cache(maxsize=64)
+def _token_identity(token: str):
+    """Return the API key ID a bearer token was signed with."""
+    try:
+        return jwt.get_unverified_header(token).get("kid") or token
+    except jwt.PyJWTError:
+        return token
+
+
+def request_identity(headers: dict):
+    """Identify the credentials behind a request from its Authorization header.
+
+    Tokens are re-signed every few minutes, so the key ID is used rather than
+    the token itself to keep cache entries valid across refreshes.
+    """
+    authorization = (headers or {}).get("Authorization", "")
+    return _token_identity(authorization.rpartition(" ")[2])
+
+
+def _share_parsed_json(response):
+    """Decode the body once so every caller sharing the response reuses it."""
+    if response.status_code != 200 or not response.content:
+        return
+    try:
+        parsed = response.json()
+    except ValueError:
+        return
+    response.json = lambda **_kwargs: parsed
+
+
+class HttpClient:  # pylint: disable=too-many-instance-attributes
+    """Pooled HTTP session shared by every App Store Connect service.
+
+    All services send their requests through one ``requests.Session`` so that
+    consecutive calls reuse a warm keep-alive connection instead of doing a
+    new TCP and TLS handshake each time. Every request is paced by the
+    ``RateLimiter`` of the API key that signed it (each key has its own
+    hourly quota) and retried on 429 and 5xx responses. GET responses are
+    served from the ``ResponseCache`` while fresh, and any write drops the
+    cached responses it affects. Identical GETs issued at the same time share
+    one upstream request and one decoded body; treat returned documents as
+    read-only.
+    """
+
+    def __init__(
+            self,
+            pool_connections: int = None,
+            pool_maxsize: int = None,
+            pool_block: bool = None,
+            rate_limiter_factory=None,
+            response_cache: ResponseCache = None):
+        self.pool_connections = pool_connections or config.HTTP_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or config.HTTP_POOL_MAXSIZE
+        self.pool_block = config.HTTP_POOL_BLOCK if pool_block is None else pool_block
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block)
+        self.session.mount("https://", adapter)
+        self._rate_limiter_factory = rate_limiter_factory or RateLimiter
+        self._rate_limiters = {}
+        self._rate_limiters_lock = threading.Lock()
+        self.response_cache = response_cache or ResponseCache()
+        self.single_flight = SingleFlight()
+
+    def request(self, method: str, url: str, cache: bool = True, **kwargs):
+        """Send a request on the pooled session.
+
+        Pass ``cache=False`` to bypass the response cache for a GET that must
+        see the latest state.
+        """
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        if method.upper() != "GET":
+            response = self._send(method, url, **kwargs)
+            self.response_cache.invalidate(url)
+            return response
+
+        if kwargs.get("stream"):
+            # A streamed body can only be read once, so it is never shared.
+            return self._send(method, url, **kwargs)
+
+        check_cancelled()
+        key = self._cache_key(url, kwargs)
+        if cache:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        return self.single_flight.do(key, lambda: self._fetch(key, url, kwargs))
+
+    def _fetch(self, key, url, kwargs):
+        """Send a GET whose response may be shared by several callers."""
+        # A write landing while this GET is in flight must keep it out of the cache.
+        generation = self.response_cache.generation(url, kwargs.get("params"))
+        response = self._send("GET", url, **kwargs)
+        _share_parsed_json(response)
+        self.response_cache.put(
+            key, response, url, kwargs.get("params"), generation=generation)
+        return response
+
+    @staticmethod
+    def _cache_key(url, kwargs):
+        """Key a GET on its credentials, URL, query parameters and Accept header.
+
+        Pooled credentials are keyed on their issuer, not on the key that
+        would sign the request, so every key shares the same entries.
+        """
+        headers = kwargs.get("headers") or {}
+        params = tuple(sorted(
+            (name, str(value)) for name, value in (kwargs.get("params") or {}).items()))
+        identity = (headers.identity if isinstance(headers, PooledHeaders)
+                    else request_identity(headers))
+        return (identity, url, params, headers.get("Accept"))
+
+    def _send(self, method, url, **kwargs):
+        """Send a request, retrying 429 and 5xx responses."""
+        if isinstance(kwargs.get("headers"), PooledHeaders):
+            # Only a request that goes upstream picks, and uses up, a pool key.
+            kwargs["headers"] = kwargs["headers"].resolve()
+        rate_limiter = self.rate_limiter_for(request_identity(kwargs.get("headers")))
+        attempt = 0
+        while True:
+            # Stop before spending another round trip on a call nobody awaits.
+            check_cancelled()
+            rate_limiter.acquire()
+            response = self.session.request(method, url, **kwargs)
+            rate_limiter.update(response)
+            if not rate_limiter.should_retry(method, response, attempt):
+                return response
+            delay = rate_limiter.backoff(response, attempt)
+            # Hand the connection back to the pool; a streamed body holds it until read.
+            response.close()
+            wait(delay)
+            attempt += 1
+
+    def rate_limiter_for(self, identity: str):
+        """Return the rate limiter tracking the quota of one API key."""
+        with self._rate_limiters_lock:
+            rate_limiter = self._rate_limiters.get(identity)
+            if rate_limiter is None:
+                rate_limiter = self._rate_limiters[identity] = self._rate_limiter_factory()
+            return rate_limiter
+
+    def remaining_budget(self, identity: str):
+        """Return the hourly quota left for a key, or None if not yet known."""
+        with self._rate_limiters_lock:
+            rate_limiter = self._rate_limiters.get(identity)
+        return rate_limiter.remaining if rate_limiter else None
+
+    def rate_limit_status(self):
+        """Return the current rate-limit budget of every key seen so far."""
+        with self._rate_limiters_lock:
+            rate_limiters = dict(self._rate_limiters)
+        return {identity: rate_limiter.budget()
+                for identity, rate_limiter in rate_limiters.items()}
+
+    def cache_stats(self):
+        """Return the response cache counters."""
+        return self.response_cache.stats()
+
+    def coalescing_stats(self):
+        """Return how many GETs were deduplicated by request coalescing."""
+        return self.single_flight.stats()
+
+    def get(self, url: str, **kwargs):
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        """Send a PATCH request."""
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        """Send a DELETE request."""
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
@@ -0,0 +1,202 @@
+"""On-disk history of performance metrics and regression checks between versions."""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from . import config
+from .perf_metrics import version_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_points (
+    app_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    category TEXT,
+    metric TEXT NOT NULL,
+    unit TEXT,
+    device TEXT NOT NULL,
+    percentile TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value REAL NOT NULL,
+    error_margin REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (app_id, platform, metric, device, percentile, version)
+) WITHOUT ROWID
+"""
+
+# A point seen again only moves last_seen; a changed value replaces the old one.
+_UPSERT = """
+INSERT INTO metric_points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (app_id, platform, metric, device, percentile, version) DO UPDATE SET
+    value = excluded.value,
+    error_margin = excluded.error_margin,
+    last_seen = excluded.last_seen
+"""
+
+# Apple reports errorMargin as the half-width of a 95% confidence interval.
+_MARGIN_Z = 1.96
+
+
+def _point_rows(app_id, columns, now):
+    """Yield the metric_points row of every point in a MetricColumns snapshot."""
+    names = (columns.platform_names, columns.category_names, columns.metric_names,
+             columns.device_names, columns.percentile_names, columns.version_names)
+    codes = zip(columns.platform.tolist(), columns.category.tolist(),
+                columns.metric.tolist(), columns.device.tolist(),
+                columns.percentile.tolist(), columns.version.tolist())
+    for (platform, category, metric, device, percentile, version), value, margin in zip(
+            codes, columns.value.tolist(), columns.error_margin.tolist()):
+        metric_name = names[2][metric]
+        yield (app_id, names[0][platform], names[1][category], metric_name,
+               columns.units.get(metric_name), names[3][device], names[4][percentile],
+               names[5][version], value, None if math.isnan(margin) else margin,
+               now, now)
+
+
+class MetricsStore:
+    """Keeps every perfPowerMetrics point seen, one row per app, metric,
+    device, percentile and version.
+
+    Snapshots are appended with ``record``. A point that is already stored
+    is updated in place, so repeated snapshots do not grow the store.
+    ``regressions`` compares two versions from the stored points alone.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def _conn(self):
+        """The database connection, opened (and the schema created) on first use."""
+        if self._db is None:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            with self._db:
+                if self.path:
+                    self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(_SCHEMA)
+        return self._db
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def record(self, app_id: str, columns):
+        """Store the points of a MetricColumns snapshot. Returns the rows written."""
+        rows = list(_point_rows(app_id, columns, time.time()))
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(_UPSERT, rows)
+            written = self._conn.total_changes - before
+        logging.info("Recorded %d performance metric points for app %s", written, app_id)
+        return written
+
+    def versions(self, app_id: str):
+        """Return the versions with stored points for ``app_id``, oldest first."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT DISTINCT version FROM metric_points WHERE app_id = ?",
+                (app_id,)).fetchall()
+        return sorted((row[0] for row in found), key=version_key)
+
+    def history(self, app_id: str, metric: str, device: str = None, percentile: str = None):
+        """Return ``[{"version", "value", "errorMargin"}]`` of one metric, oldest first."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT version, value, error_margin FROM metric_points "
+                "WHERE app_id = ? AND metric = ? AND device = ? AND percentile = ?",
+                (app_id, metric, device or config.PERF_METRICS_DEVICE,
+                 percentile or config.PERF_METRICS_PERCENTILE)).fetchall()
+        found.sort(key=lambda row: version_key(row[0]))
+        return [{"version": version, "value": value, "errorMargin": margin}
+                for version, value, margin in found]
+
+    def regressions(  # pylint: disable=too-many-arguments,too-many-locals
+            self,
+            app_id: str,
+            *,
+            version: str = None,
+            baseline: str = None,
+            device: str = None,
+            percentile: str = None,
+            z_threshold: float = None,
+            min_change: float = None):
+        """Compare every metric of ``version`` with ``baseline``.
+
+        Lower is better for all perfPowerMetrics, so a significant increase
+        is a regression and a significant decrease an improvement. A change
+        is significant when it is at least ``min_change`` (relative) and,
+        where both points have an error margin, its z-score is at least
+        ``z_threshold``. By default the newest stored version is compared
+        with the one before it.
+        """
+        z_threshold = config.METRICS_REGRESSION_Z if z_threshold is None else z_threshold
+        min_change = (config.METRICS_REGRESSION_MIN_CHANGE
+                      if min_change is None else min_change)
+        device = device or config.PERF_METRICS_DEVICE
+        percentile = percentile or config.PERF_METRICS_PERCENTILE
+        known = self.versions(app_id)
+        version = version or (known[-1] if known else None)
+        if baseline is None and version in known and known.index(version) > 0:
+            baseline = known[known.index(version) - 1]
+        result = {"version": version, "baseline": baseline, "device": device,
+                  "percentile": percentile, "regressions": [], "improvements": [],
+                  "unchanged": []}
+        if not version or not baseline:
+            return result
+
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT new.platform, new.category, new.metric, new.unit, "
+                "old.value, old.error_margin, new.value, new.error_margin "
+                "FROM metric_points AS new JOIN metric_points AS old "
+                "USING (app_id, platform, metric, device, percentile) "
+                "WHERE app_id = ? AND device = ? AND percentile = ? "
+                "AND new.version = ? AND old.version = ? "
+                "ORDER BY new.category, new.metric",
+                (app_id, device, percentile, version, baseline)).fetchall()
+
+        for platform, category, metric, unit, old, old_margin, new, new_margin in found:
+            change = new - old
+            relative = change / old if old else math.inf if change else 0.0
+            z_score = None
+            if old_margin is not None and new_margin is not None:
+                spread = math.hypot(old_margin, new_margin) / _MARGIN_Z
+                z_score = change / spread if spread else math.inf if change else 0.0
+            significant = (abs(relative) >= min_change
+                           and (z_score is None or abs(z_score) >= z_threshold))
+            entry = {
+                "metric": metric,
+                "category": category,
+                "platform": platform,
+                "unit": unit,
+                "baseline": round(old, 3),
+                "value": round(new, 3),
+                "change": round(change, 3),
+                "changePercent": (round(relative * 100, 1)
+                                  if math.isfinite(relative) else None),
+                "zScore": (round(z_score, 2)
+                           if z_score is not None and math.isfinite(z_score) else None),
+            }
+            if not significant:
+                result["unchanged"].append(entry)
+            elif change > 0:
+                result["regressions"].append(entry)
+            else:
+                result["improvements"].append(entry)
+        return result
+
+    def stats(self):
+        """Return the number of stored points and apps."""
+        with self._lock:
+            points, apps = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT app_id) FROM metric_points").fetchone()
+        return {"points": points, "apps": apps, "path": self.path}
@@ -0,0 +1,104 @@
+"""Pagination over App Store Connect JSON:API collection endpoints."""
+import time
+
+# Largest page size App Store Connect accepts on collection endpoints.
+MAX_PAGE_LIMIT = 200
+
+
+class Paginator:  # pylint: disable=too-many-instance-attributes
+    """Follows ``links.next`` across a collection, one page at a time.
+
+    Pages are fetched lazily, so callers that stop iterating early (for
+    example once they find the build they were looking for) never download
+    the remaining pages. Iteration can be capped by item count or by a time
+    budget; ``truncated`` records whether a cap cut the listing short.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            http,
+            auth,
+            url: str,
+            params: dict = None,
+            *,
+            max_items: int = None,
+            max_seconds: float = None):
+        self.http = http
+        self.auth = auth
+        self.url = url
+        self.params = dict(params or {})
+        self.params.setdefault("limit", MAX_PAGE_LIMIT)
+        if max_items:
+            self.params["limit"] = min(self.params["limit"], max_items)
+        self.max_items = max_items
+        self.max_seconds = max_seconds
+        self.pages_fetched = 0
+        self.items_yielded = 0
+        self.truncated = False
+        self.total = None
+
+    def pages(self):
+        """Yield each page document, trimmed to ``max_items`` if set."""
+        url, params = self.url, self.params
+        deadline = None
+        if self.max_seconds is not None:
+            deadline = time.monotonic() + self.max_seconds
+        while url:
+            # Headers are read per page so a long listing survives a token refresh.
+            response = self.http.get(url, headers=self.auth.headers, params=params)
+            response.raise_for_status()
+            page = response.json()
+            self.pages_fetched += 1
+            self.total = page.get("meta", {}).get("paging", {}).get("total", self.total)
+
+            data = page.get("data", [])
+            url = page.get("links", {}).get("next")
+            # The next link already carries the cursor and page size.
+            params = None
+
+            if self.max_items is not None:
+                remaining = self.max_items - self.items_yielded
+                if len(data) > remaining:
+                    data = data[:remaining]
+                    page = dict(page, data=data)
+                    self.truncated = True
+                    url = None
+                elif len(data) == remaining and url:
+                    self.truncated = True
+                    url = None
+            if url and deadline is not None and time.monotonic() >= deadline:
+                self.truncated = True
+                url = None
+
+            self.items_yielded += len(data)
+            yield page
+
+    def __iter__(self):
+        """Yield individual resources across all pages."""
+        for page in self.pages():
+            yield from page.get("data", [])
+
+    def collect(self):
+        """Read every page into a single JSON:API style document.
+
+        ``included`` resources are de-duplicated across pages.
+        """
+        data = []
+        included = []
+        seen = set()
+        for page in self.pages():
+            data.extend(page.get("data", []))
+            for item in page.get("included", []):
+                key = (item.get("type"), item.get("id"))
+                if key not in seen:
+                    seen.add(key)
+                    included.append(item)
+
+        document = {"data": data}
+        if included:
+            document["included"] = included
+        document["meta"] = {
+            "paging": {"total": self.total, "fetched": len(data)},
+            "truncated": self.truncated,
+        }
+        return document
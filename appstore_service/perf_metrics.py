@@ -0,0 +1,182 @@
+"""Columnar view of perfPowerMetrics documents and per-version summaries.
+
+``GET /v1/apps/{id}/perfPowerMetrics`` returns a deeply nested document:
+product data per platform, metric categories, metrics, one dataset per
+device and percentile, and one point per app version. ``MetricColumns``
+flattens it into one NumPy array per field, with strings interned into
+small lookup tables, so a summary is a handful of vectorized masks and
+scatters instead of nested loops over the JSON.
+"""
+import numpy as np
+from . import config
+
+# Metric categories reported by summarize() unless others are asked for.
+SUMMARY_CATEGORIES = ("LAUNCH", "HANG", "MEMORY", "BATTERY")
+
+
+def version_key(version: str):
+    """Sort key ordering "1.10" after "1.9"."""
+    return tuple(int(part) if part.isdigit() else 0 for part in version.split("."))
+
+
+def _to_list(values, digits=3):
+    """Round a float array to a JSON list, with None where there is no value."""
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+class _Interned:  # pylint: disable=too-few-public-methods
+    """Assigns each distinct string a small integer code."""
+
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def __call__(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+def _metric_rows(metric, prefix, devices, percentiles, versions):
+    """Yield a row for every point of one metric.
+
+    ``prefix`` holds the platform, category and metric codes; the other
+    string columns are interned as they are met.
+    """
+    for dataset in metric.get("datasets") or []:
+        criteria = dataset.get("filterCriteria") or {}
+        device = devices(criteria.get("device") or "all")
+        percentile = percentiles(criteria.get("percentile") or "")
+        for point in dataset.get("points") or []:
+            if point.get("value") is None or not point.get("version"):
+                continue
+            margin = point.get("errorMargin")
+            yield (*prefix, device, percentile, versions(point["version"]),
+                   point["value"], np.nan if margin is None else margin)
+
+
+class MetricColumns:  # pylint: disable=too-many-instance-attributes
+    """The points of a perfPowerMetrics document as parallel NumPy columns.
+
+    Every row is one value of one metric, for one platform, device,
+    percentile and app version. String columns hold codes into the
+    matching ``*_names`` list.
+    """
+
+    def __init__(self, document: dict):
+        platforms, categories, metrics = _Interned(), _Interned(), _Interned()
+        devices, percentiles, versions = _Interned(), _Interned(), _Interned()
+        self.units = {}
+        rows = []
+        for product in document.get("productData") or []:
+            platform = platforms(product.get("platform") or "unknown")
+            for category in product.get("metricCategories") or []:
+                category_code = categories(category.get("identifier"))
+                for metric in category.get("metrics") or []:
+                    self.units[metric.get("identifier")] = (
+                        (metric.get("unit") or {}).get("identifier"))
+                    rows.extend(_metric_rows(
+                        metric, (platform, category_code, metrics(metric.get("identifier"))),
+                        devices, percentiles, versions))
+
+        codes = np.array([row[:6] for row in rows], dtype=np.int32).reshape(-1, 6)
+        (self.platform, self.category, self.metric, self.device,
+         self.percentile, self.version) = codes.T
+        self.value, self.error_margin = np.array(
+            [row[6:] for row in rows], dtype=np.float64).reshape(-1, 2).T
+        self.platform_names = platforms.names
+        self.category_names = categories.names
+        self.metric_names = metrics.names
+        self.device_names = devices.names
+        self.percentile_names = percentiles.names
+        self.version_names = versions.names
+
+    def __len__(self):
+        return len(self.value)
+
+    @property
+    def nbytes(self):
+        """Memory held by the columns."""
+        return sum(column.nbytes for column in (
+            self.platform, self.category, self.metric, self.device,
+            self.percentile, self.version, self.value, self.error_margin))
+
+    @staticmethod
+    def _code(names, name):
+        """Return the code of ``name``, or -1 (matching no row) if it never occurs."""
+        return names.index(name) if name in names else -1
+
+    def summarize(  # pylint: disable=too-many-arguments,too-many-locals
+            self,
+            categories=SUMMARY_CATEGORIES,
+            platform: str = None,
+            device: str = None,
+            percentile: str = None,
+            last_versions: int = None):
+        """Return one value per metric and version, with version-over-version deltas.
+
+        Args:
+            categories: Metric categories to report.
+            platform: Platform to report; the document's first one by default.
+            device: Device class, e.g. ``all_iPhones`` (config.PERF_METRICS_DEVICE).
+            percentile: e.g. ``percentile.fifty`` (config.PERF_METRICS_PERCENTILE).
+            last_versions: Report only the newest N versions.
+        """
+        platform = platform or (self.platform_names[0] if self.platform_names else None)
+        device = device or config.PERF_METRICS_DEVICE
+        percentile = percentile or config.PERF_METRICS_PERCENTILE
+        wanted = [self._code(self.category_names, name) for name in categories]
+
+        mask = ((self.platform == self._code(self.platform_names, platform))
+                & (self.device == self._code(self.device_names, device))
+                & (self.percentile == self._code(self.percentile_names, percentile))
+                & np.isin(self.category, wanted))
+
+        # Only versions with a value in the selection, oldest first.
+        version_codes = sorted(set(self.version[mask].tolist()),
+                               key=lambda code: version_key(self.version_names[code]))
+        if last_versions:
+            version_codes = version_codes[-last_versions:]
+        column_of = np.full(len(self.version_names), -1, dtype=np.int32)
+        column_of[version_codes] = np.arange(len(version_codes), dtype=np.int32)
+        mask &= column_of[self.version] >= 0
+
+        metric_codes = sorted(set(self.metric[mask].tolist()),
+                              key=lambda code: self.metric_names[code])
+        row_of = np.full(len(self.metric_names), -1, dtype=np.int32)
+        row_of[metric_codes] = np.arange(len(metric_codes), dtype=np.int32)
+
+        shape = (len(metric_codes), len(version_codes))
+        values = np.full(shape, np.nan)
+        margins = np.full(shape, np.nan)
+        rows, columns = row_of[self.metric[mask]], column_of[self.version[mask]]
+        values[rows, columns] = self.value[mask]
+        margins[rows, columns] = self.error_margin[mask]
+        categories_of = np.empty(len(metric_codes), dtype=np.int32)
+        categories_of[rows] = self.category[mask]
+
+        deltas = np.diff(values, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta_percent = deltas / values[:, :-1] * 100
+        delta_percent[~np.isfinite(delta_percent)] = np.nan
+
+        summary = {}
+        for row, code in enumerate(metric_codes):
+            name = self.metric_names[code]
+            summary[name] = {
+                "category": self.category_names[categories_of[row]],
+                "unit": self.units.get(name),
+                "values": _to_list(values[row]),
+                "errorMargins": _to_list(margins[row]),
+                "deltas": _to_list(deltas[row]),
+                "deltaPercent": _to_list(delta_percent[row], 1),
+            }
+        return {
+            "platform": platform,
+            "device": device,
+            "percentile": percentile,
+            "versions": [self.version_names[code] for code in version_codes],
+            "metrics": summary,
+        }
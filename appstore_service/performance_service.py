@@ -1,23 +1,47 @@
 """Service for retrieving App Store Connect performance metrics."""
-import requests
+import threading
 from .api_auth import AppStoreConnectAuth
+from .http_client import HttpClient
+from .perf_metrics import MetricColumns
 
 # Default timeout for all requests (30 seconds)
 REQUEST_TIMEOUT = 30
 
 
-class PerformanceService:  # pylint: disable=too-few-public-methods
+class PerformanceService:
     """Service for retrieving App Store Connect performance and power metrics."""
 
-    def __init__(self, auth: AppStoreConnectAuth):
+    def __init__(self, auth: AppStoreConnectAuth, http: HttpClient = None):
         self.auth = auth
+        self.http = http or HttpClient()
+        self._columns = {}
+        self._lock = threading.Lock()
 
     def get_perf_power_metrics(self, app_id: str):
         """
         Get a list of performance power metrics for a specific app.
         """
         url = f"{self.auth.base_url}/apps/{app_id}/perfPowerMetrics"
-        response = requests.get(
-            url, headers=self.auth.headers, timeout=REQUEST_TIMEOUT)
+        headers = self.auth.headers.copy()
+        headers["Accept"] = "application/vnd.apple.xcode-metrics+json, application/json"
+        response = self.http.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
+
+    def get_metric_columns(self, app_id: str, document: dict = None):
+        """Return the app's metrics (or those in ``document``) as MetricColumns.
+
+        The columns are rebuilt only when the underlying document changes;
+        while the response cache serves the same parsed document, the
+        columns built from it are reused.
+        """
+        if document is None:
+            document = self.get_perf_power_metrics(app_id)
+        with self._lock:
+            cached = self._columns.get(app_id)
+            if cached and cached[0] is document:
+                return cached[1]
+        columns = MetricColumns(document)
+        with self._lock:
+            self._columns[app_id] = (document, columns)
+        return columns
@@ -0,0 +1,155 @@
+"""Rate-limit-aware request scheduling for App Store Connect.
+
+App Store Connect reports the hourly quota of the calling key in the
+``X-Rate-Limit`` response header (``user-hour-lim:3600;user-hour-rem:3412;``)
+and answers 429 once it is used up. ``RateLimiter`` paces outgoing requests
+with a token bucket that slows down as the reported quota runs low, and
+computes jittered exponential backoff for responses worth retrying.
+"""
+import random
+import threading
+import time
+from . import config
+from .cancellation import wait
+
+RATE_LIMIT_HEADER = "X-Rate-Limit"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Server errors are only retried for requests that are safe to repeat.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Slowest pace the bucket drops to, so a drained quota still probes for recovery.
+MIN_RATE_PER_SECOND = 1 / 60
+
+
+def parse_rate_limit_header(value: str):
+    """Parse an X-Rate-Limit header into ``(limit, remaining)``.
+
+    Either value is None when the header does not carry it.
+    """
+    fields = {}
+    for part in (value or "").split(";"):
+        name, _, number = part.partition(":")
+        if number.strip().isdigit():
+            fields[name.strip()] = int(number)
+    return fields.get("user-hour-lim"), fields.get("user-hour-rem")
+
+
+class RateLimiter:  # pylint: disable=too-many-instance-attributes
+    """Token bucket shaped by the quota App Store Connect reports."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            *,
+            rate_per_second: float = None,
+            burst: int = None,
+            low_watermark: float = None,
+            max_retries: int = None,
+            backoff_base: float = None,
+            backoff_max: float = None):
+        self.rate_per_second = rate_per_second or config.RATE_LIMIT_PER_SECOND
+        self.burst = burst or config.RATE_LIMIT_BURST
+        self.low_watermark = (config.RATE_LIMIT_LOW_WATERMARK
+                              if low_watermark is None else low_watermark)
+        self.max_retries = (config.RATE_LIMIT_MAX_RETRIES
+                            if max_retries is None else max_retries)
+        self.backoff_base = backoff_base or config.RATE_LIMIT_BACKOFF_BASE
+        self.backoff_max = backoff_max or config.RATE_LIMIT_BACKOFF_MAX
+
+        self.hourly_limit = None
+        self.remaining = None
+        self.requests_sent = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+        self._tokens = float(self.burst)
+        self._rate = float(self.rate_per_second)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last refill."""
+        self._tokens = min(
+            float(self.burst),
+            self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1 and now >= self._paused_until:
+                    self._tokens -= 1
+                    self.requests_sent += 1
+                    return
+                delay = max(
+                    self._paused_until - now,
+                    (1 - self._tokens) / self._rate)
+                self.throttled_seconds += delay
+            wait(delay)
+
+    def update(self, response):
+        """Record the quota reported by a response and adapt the pace."""
+        limit, remaining = parse_rate_limit_header(
+            response.headers.get(RATE_LIMIT_HEADER))
+        with self._lock:
+            if limit:
+                self.hourly_limit = limit
+            if remaining is not None:
+                self.remaining = remaining
+                # Never hold more tokens than the quota has left.
+                self._tokens = min(self._tokens, float(remaining))
+            self._rate = self._current_rate()
+
+    def _current_rate(self):
+        """Full speed while the quota is healthy, slowing linearly below the watermark."""
+        if not self.hourly_limit or self.remaining is None or not self.low_watermark:
+            return float(self.rate_per_second)
+        fraction = self.remaining / self.hourly_limit
+        scale = min(1.0, fraction / self.low_watermark)
+        return max(MIN_RATE_PER_SECOND, self.rate_per_second * scale)
+
+    def should_retry(self, method: str, response, attempt: int):
+        """Return True if the response should be retried."""
+        if attempt >= self.max_retries or response.status_code not in RETRY_STATUSES:
+            return False
+        return response.status_code == 429 or method.upper() in IDEMPOTENT_METHODS
+
+    def backoff(self, response, attempt: int):
+        """Return the delay before the next attempt and pause the bucket for it.
+
+        A ``Retry-After`` header wins; otherwise the delay is drawn with full
+        jitter from an exponentially growing window.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            window = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            delay = random.uniform(0, window)
+        with self._lock:
+            self.retries += 1
+            if response.status_code == 429:
+                # Everything sharing this key is over quota, not just this call.
+                self._tokens = 0.0
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def budget(self):
+        """Return a snapshot of the current quota and pacing state."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "hourly_limit": self.hourly_limit,
+                "remaining": self.remaining,
+                "tokens": round(self._tokens, 2),
+                "rate_per_second": round(self._rate, 3),
+                "paused_for_seconds": round(
+                    max(0.0, self._paused_until - time.monotonic()), 2),
+                "requests_sent": self.requests_sent,
+                "retries": self.retries,
+                "throttled_seconds": round(self.throttled_seconds, 2),
+            }
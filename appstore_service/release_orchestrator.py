@@ -0,0 +1,280 @@
+"""Releases of several apps, planned as a dependency graph of steps.
+
+Each target (bundle ID, version, build number) becomes the steps below.
+Steps of all targets run on one bounded pool as soon as their dependencies
+are done, so the lookups of one app overlap with the writes of another::
+
+    resolve_app -> find_build   -> associate_build -> submit_for_review
+                -> find_version -> release
+
+Which write steps apply depends on the version's App Store state, which is
+only known once ``find_version`` has run. Every request goes through the
+shared HTTP client, so the rate limiter paces the pool as a whole.
+"""
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from . import config
+from .cancellation import check_cancelled, submit_in_context
+
+# Version states the orchestrator knows what to do with.
+HANDLED_STATES = frozenset({
+    "PREPARE_FOR_SUBMISSION",
+    "PENDING_DEVELOPER_RELEASE",
+    "WAITING_FOR_REVIEW",
+    "READY_FOR_SALE",
+})
+
+
+class StepSkipped(Exception):
+    """Raised by a step that does not apply to its target."""
+
+
+class StepFailed(Exception):
+    """Raised by a step that could not complete; its dependents are blocked."""
+
+
+class Step:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """One node of the release graph."""
+
+    def __init__(self, target, name, fn, deps=(), writes=False):
+        self.target = target
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.writes = writes
+        self.dependents = []
+        self.status = "pending"
+        self.detail = None
+        self.seconds = None
+
+    def report(self):
+        """Return the step's outcome for the result document."""
+        report = {"status": self.status}
+        if self.seconds is not None:
+            report["ms"] = round(self.seconds * 1000, 1)
+        if self.detail is not None:
+            report["detail"] = self.detail
+        return report
+
+
+class ReleaseTarget:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """An app to release and the state gathered for it along the way."""
+
+    def __init__(self, bundle_id, version_string, build_number):
+        self.bundle_id = bundle_id
+        self.version_string = version_string
+        self.build_number = build_number
+        self.app_id = None
+        self.build_id = None
+        self.version = None
+        self.steps = {}
+        self.outcome = None
+        self.reported = False
+
+    @property
+    def state(self):
+        """The App Store state of the target version, once it has been looked up."""
+        return self.version["attributes"]["appStoreState"] if self.version else None
+
+    def result(self):
+        """Return the per-app result reported to the caller."""
+        statuses = {step.status for step in self.steps.values()}
+        if statuses & {"failed", "blocked"}:
+            status = "failed"
+        elif "planned" in statuses:
+            status = "planned"
+        elif self.outcome:
+            status = self.outcome
+        else:
+            status = "no_action"
+        return {
+            "bundleId": self.bundle_id,
+            "version": self.version_string,
+            "buildNumber": self.build_number,
+            "status": status,
+            "appStoreState": self.state,
+            "steps": {name: step.report() for name, step in self.steps.items()},
+        }
+
+    def finished(self):
+        """True once no step of this target is pending or running."""
+        return all(step.status not in ("pending", "running")
+                   for step in self.steps.values())
+
+
+class ReleaseOrchestrator:
+    """Plans and runs the releases of several apps with bounded concurrency."""
+
+    def __init__(self, app_store, max_concurrency: int = None):
+        self.app_store = app_store
+        self.max_concurrency = max(1, max_concurrency or config.RELEASE_MAX_CONCURRENCY)
+
+    def plan(self, targets):
+        """Build the step graph for ``targets``; returns the ReleaseTargets."""
+        planned = []
+        for target in targets:
+            release = ReleaseTarget(*target)
+            steps = [
+                Step(release, "resolve_app", self._resolve_app),
+                Step(release, "find_build", self._find_build, ["resolve_app"]),
+                Step(release, "find_version", self._find_version, ["resolve_app"]),
+                Step(release, "associate_build", self._associate_build,
+                     ["find_build", "find_version"], writes=True),
+                Step(release, "submit_for_review", self._submit_for_review,
+                     ["associate_build"], writes=True),
+                Step(release, "release", self._release,
+                     ["find_build", "find_version"], writes=True),
+            ]
+            release.steps = {step.name: step for step in steps}
+            for step in steps:
+                for dep in step.deps:
+                    release.steps[dep].dependents.append(step)
+            planned.append(release)
+        return planned
+
+    def run(self, targets, dry_run: bool = False, on_result=None):
+        """Run the releases and return the per-app results in completion order.
+
+        Args:
+            targets: ``(bundle_id, version_string, build_number)`` tuples.
+            dry_run: Run only the lookups and report the write steps that
+                would run as ``planned``.
+            on_result: Called with each app's result as soon as it finishes.
+        """
+        started = time.perf_counter()
+        planned = self.plan(targets)
+        results = []
+        ready = deque(step for release in planned for step in release.steps.values()
+                      if not step.deps)
+        waiting = {step: len(step.deps) for release in planned
+                   for step in release.steps.values()}
+        running = {}
+
+        def settle(step):
+            # Release dependents of a finished step, blocking them if it failed.
+            done = [step]
+            while done:
+                finished = done.pop()
+                for dependent in finished.dependents:
+                    if finished.status in ("failed", "blocked"):
+                        if dependent.status == "pending":
+                            dependent.status = "blocked"
+                            dependent.detail = f"{finished.name} did not complete"
+                            done.append(dependent)
+                        continue
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0 and dependent.status == "pending":
+                        ready.append(dependent)
+            release = step.target
+            if not release.reported and release.finished():
+                release.reported = True
+                result = release.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+        with ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="release") as executor:
+            while ready or running:
+                check_cancelled()
+                while ready and len(running) < self.max_concurrency:
+                    step = ready.popleft()
+                    step.status = "running"
+                    running[submit_in_context(
+                        executor, self._run_step, step, dry_run)] = step
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    settle(running.pop(future))
+
+        return {
+            "dry_run": dry_run,
+            "max_concurrency": self.max_concurrency,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "results": results,
+        }
+
+    def _run_step(self, step, dry_run):
+        """Run one step, recording its status, detail and duration."""
+        started = time.perf_counter()
+        try:
+            if step.writes and dry_run:
+                # The applicability check runs with no request sent.
+                self._check_applies(step)
+                step.status = "planned"
+            else:
+                step.detail = step.fn(step.target)
+                step.status = "done"
+        except StepSkipped as e:
+            step.status = "skipped"
+            step.detail = str(e)
+        except StepFailed as e:
+            step.status = "failed"
+            step.detail = str(e)
+        except requests.exceptions.HTTPError as e:
+            step.status = "failed"
+            step.detail = self.app_store._handle_error(e)  # pylint: disable=protected-access
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Includes RequestCancelled; the scheduler stops on its next check.
+            step.status = "failed"
+            step.detail = str(e)
+        finally:
+            step.seconds = time.perf_counter() - started
+
+    @staticmethod
+    def _check_applies(step):
+        """Raise StepSkipped if a write step does not apply to the version's state."""
+        state = step.target.state
+        if step.name in ("associate_build", "submit_for_review"):
+            if state != "PREPARE_FOR_SUBMISSION":
+                raise StepSkipped(f"Version is in state {state}")
+        elif step.name == "release" and state != "PENDING_DEVELOPER_RELEASE":
+            raise StepSkipped(f"Version is in state {state}")
+
+    def _resolve_app(self, target):
+        target.app_id = self.app_store._get_app_id(  # pylint: disable=protected-access
+            target.bundle_id)
+        if not target.app_id:
+            raise StepFailed(f"Could not find app with bundle ID {target.bundle_id}")
+        return target.app_id
+
+    def _find_build(self, target):
+        target.build_id = self.app_store._find_build_id(  # pylint: disable=protected-access
+            target.app_id, target.version_string, target.build_number)
+        if not target.build_id:
+            raise StepFailed(
+                f"Could not find build for version {target.version_string} "
+                f"and build number {target.build_number}")
+        return target.build_id
+
+    def _find_version(self, target):
+        target.version = self.app_store._find_version_info(  # pylint: disable=protected-access
+            target.app_id, target.version_string)
+        if not target.version:
+            raise StepFailed(
+                f"Version {target.version_string} not found. "
+                f"Please create it on App Store Connect first.")
+        if target.state not in HANDLED_STATES:
+            raise StepFailed(f"Version is in an unhandled state: '{target.state}'")
+        return target.version["id"]
+
+    def _associate_build(self, target):
+        self._check_applies(target.steps["associate_build"])
+        self.app_store.version_service.associate_build_to_version(
+            target.version["id"], target.build_id)
+        return target.build_id
+
+    def _submit_for_review(self, target):
+        self._check_applies(target.steps["submit_for_review"])
+        response = self.app_store.version_service.submit_for_review(target.version["id"])
+        target.outcome = "submitted"
+        return (response or {}).get("data", {}).get("id")
+
+    def _release(self, target):
+        self._check_applies(target.steps["release"])
+        response = self.app_store.version_service.release_pending_version(
+            target.version["id"])
+        target.outcome = "released"
+        return (response or {}).get("data", {}).get("id")
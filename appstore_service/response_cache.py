@@ -0,0 +1,163 @@
+"""TTL + LRU cache for idempotent App Store Connect GET responses."""
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl
+from . import config
+
+_COLLECTION_SEGMENT = re.compile(r"^[a-z][A-Za-z]+$")
+_NON_RESOURCE_SEGMENTS = frozenset({"v1", "v2", "relationships"})
+
+# Writes to these resources change what is cached under the related ones.
+RELATED_RESOURCES = {
+    "betaTesters": {"betaGroups"},
+    "betaGroups": {"betaTesters"},
+    "appStoreVersionSubmissions": {"appStoreVersions"},
+    "appStoreVersionReleaseRequests": {"appStoreVersions"},
+    "appStoreVersions": {"builds"},
+}
+
+
+def resource_types(url: str, params: dict = None):
+    """Return the resource collections a URL touches, in path order.
+
+    ``/v1/apps/123/appStoreVersions`` yields ``["apps", "appStoreVersions"]``.
+    Relationships named in ``include`` are appended so that a response which
+    embeds them is invalidated along with them.
+    """
+    parts = urlsplit(url)
+    types = [segment for segment in parts.path.split("/")
+             if _COLLECTION_SEGMENT.match(segment)
+             and segment not in _NON_RESOURCE_SEGMENTS]
+    query = dict(parse_qsl(parts.query))
+    query.update(params or {})
+    for name in str(query.get("include", "")).split(","):
+        if name and name not in types:
+            types.append(name)
+    return types
+
+
+class ResponseCache:  # pylint: disable=too-many-instance-attributes
+    """Bounded LRU cache of GET responses with per-resource TTLs.
+
+    Entries are tagged with the resource types in their URL. A write to a
+    resource drops every entry tagged with it or with a related resource,
+    so a tool never reads back stale data after a change it made itself.
+    Each tag also has a generation, bumped by every invalidation, so a GET
+    that was already in flight when the write happened is not cached.
+    """
+
+    def __init__(self, max_bytes: int = None, ttls: dict = None):
+        self.max_bytes = max_bytes or config.RESPONSE_CACHE_MAX_BYTES
+        self.ttls = dict(config.RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, url: str):
+        """Return the TTL for a URL, based on the resource type it returns."""
+        path_types = resource_types(url.split("?", 1)[0])
+        if not path_types:
+            return 0
+        return self.ttls.get(path_types[-1], 0)
+
+    def get(self, key):
+        """Return the cached response for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            response, expires, _tags, size = entry
+            if time.monotonic() >= expires:
+                self._remove(key, size)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def generation(self, url: str, params: dict = None):
+        """Return the current generation of the tags a GET of ``url`` would get.
+
+        Take it before sending the request and pass it to ``put``.
+        """
+        tags = resource_types(url, params)
+        with self._lock:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def put(self, key, response, url: str, params: dict = None, generation: dict = None):
+        """Store a successful response if its resource type is cacheable.
+
+        If ``generation`` is given and any of the response's tags has been
+        invalidated since it was taken, the response may predate a write
+        and is not stored.
+        """
+        ttl = self.ttl_for(url)
+        size = len(response.content or b"")
+        if ttl <= 0 or response.status_code != 200 or size > self.max_bytes:
+            return False
+        tags = frozenset(resource_types(url, params))
+        with self._lock:
+            if generation is not None and any(
+                    self._generations.get(tag, 0) != generation.get(tag, 0)
+                    for tag in tags):
+                self.stale_puts += 1
+                return False
+            if key in self._entries:
+                self._remove(key, self._entries[key][3])
+            self._entries[key] = (response, time.monotonic() + ttl, tags, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, old_entry = self._entries.popitem(last=False)
+                self.bytes -= old_entry[3]
+                self.evictions += 1
+        return True
+
+    def invalidate(self, url: str):
+        """Drop every entry affected by a write to ``url``."""
+        tags = set(resource_types(url))
+        for name in list(tags):
+            tags.update(RELATED_RESOURCES.get(name, ()))
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale = [key for key, entry in self._entries.items() if entry[2] & tags]
+            for key in stale:
+                self._remove(key, self._entries[key][3])
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key, size):
+        """Remove an entry; the caller holds the lock."""
+        del self._entries[key]
+        self.bytes -= size
+
+    def stats(self):
+        """Return the hit/miss counters and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+            }
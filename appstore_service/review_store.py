@@ -0,0 +1,283 @@
+"""Local full-text index of customer reviews, kept current by incremental syncs."""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from . import config
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS reviews (
+        id TEXT PRIMARY KEY,
+        app_id TEXT NOT NULL,
+        rating INTEGER,
+        title TEXT,
+        body TEXT,
+        nickname TEXT,
+        territory TEXT,
+        created_date TEXT,
+        version TEXT,
+        sync_id INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS reviews_by_date ON reviews (app_id, created_date)",
+    "CREATE INDEX IF NOT EXISTS reviews_by_version ON reviews (app_id, version, rating)",
+    "CREATE INDEX IF NOT EXISTS reviews_by_territory ON reviews (app_id, territory, rating)",
+    "CREATE INDEX IF NOT EXISTS reviews_by_sync ON reviews (app_id, sync_id)",
+    # External-content FTS5 table: the text is stored once, in reviews.
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        title, body, content='reviews', content_rowid='rowid')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts (rowid, title, body)
+        VALUES (new.rowid, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, title, body)
+        VALUES ('delete', old.rowid, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS review_syncs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        app_id TEXT NOT NULL,
+        finished_at REAL,
+        new_reviews INTEGER,
+        complete INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+)
+
+_COLUMNS = ("id", "rating", "title", "body", "nickname", "territory",
+            "created_date", "version")
+
+_GROUP_COLUMNS = {"version": "version", "territory": "territory"}
+
+
+def _review_row(review, app_id, sync_id, version=None):
+    """Return the table row of a customerReviews resource."""
+    attributes = review.get("attributes", {})
+    return (review["id"], app_id, attributes.get("rating"), attributes.get("title"),
+            attributes.get("body"), attributes.get("reviewerNickname"),
+            attributes.get("territory"), attributes.get("createdDate"), version, sync_id)
+
+
+def _review(row):
+    """Return a stored review as a tool result dict."""
+    review = dict(zip(_COLUMNS, row))
+    review["reviewerNickname"] = review.pop("nickname")
+    review["createdDate"] = review.pop("created_date")
+    return review
+
+
+class ReviewStore:
+    """Keeps an app's customer reviews in SQLite with an FTS5 index on their text.
+
+    ``sync`` pages through the reviews newest first and stops at the first
+    page holding a review that is already stored, so after the initial
+    backfill a sync reads one page of reviews. The listing by app does not
+    say which version a review is for; the newest ``version_window``
+    versions are paged through the same way to fill that in (one more page
+    each), so version histograms cover recent versions and older reviews
+    count as version "unknown".
+    """
+
+    def __init__(self, app_info_service, version_service, path: str = None,
+                 version_window: int = None):
+        self.app_info_service = app_info_service
+        self.version_service = version_service
+        self.path = path
+        self.version_window = (config.REVIEW_SYNC_VERSIONS
+                               if version_window is None else version_window)
+        self._db = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    @property
+    def _conn(self):
+        """The database connection, opened (and the schema created) on first use."""
+        if self._db is None:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            with self._db:
+                if self.path:
+                    self._db.execute("PRAGMA journal_mode=WAL")
+                for statement in _SCHEMA:
+                    self._db.execute(statement)
+        return self._db
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def has_reviews(self, app_id: str):
+        """True once a sync of ``app_id`` has completed."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM review_syncs WHERE app_id = ? AND complete = 1 LIMIT 1",
+                (app_id,)).fetchone() is not None
+
+    def sync(self, app_id: str):
+        """Fetch the reviews added since the last sync. Returns the sync's counters."""
+        started = time.perf_counter()
+        with self._sync_lock:
+            backfilled = self.has_reviews(app_id)
+            with self._lock, self._conn:
+                sync_id = self._conn.execute(
+                    "INSERT INTO review_syncs (app_id) VALUES (?)", (app_id,)).lastrowid
+
+            pages = 0
+            for page in self.app_info_service.iter_customer_reviews(app_id).pages():
+                pages += 1
+                added = self._insert(app_id, page.get("data", []), sync_id)
+                # Until the first sync completes, older reviews may still be missing.
+                if backfilled and added < len(page.get("data", [])):
+                    break
+
+            tagged = self._tag_versions(app_id, sync_id)
+            with self._lock, self._conn:
+                new = self._conn.execute(
+                    "SELECT COUNT(*) FROM reviews WHERE app_id = ? AND sync_id = ?",
+                    (app_id, sync_id)).fetchone()[0]
+                self._conn.execute(
+                    "UPDATE review_syncs SET finished_at = ?, new_reviews = ?, complete = 1 "
+                    "WHERE id = ?", (time.time(), new, sync_id))
+        logging.info("Synced %d new reviews for app %s in %d pages", new, app_id, pages)
+        return {
+            "syncId": sync_id,
+            "new": new,
+            "pages": pages,
+            "versionsTagged": tagged,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def _insert(self, app_id, reviews, sync_id, version=None):
+        """Store the reviews not stored yet. Returns how many were new."""
+        rows = [_review_row(review, app_id, sync_id, version) for review in reviews]
+        with self._lock, self._conn:
+            return self._conn.executemany(
+                "INSERT OR IGNORE INTO reviews "
+                "(id, app_id, rating, title, body, nickname, territory, created_date, "
+                "version, sync_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+
+    def _tag_versions(self, app_id, sync_id):
+        """Record the version of the recent versions' reviews. Returns the reviews tagged."""
+        if not self.version_window:
+            return 0
+        versions = sorted(
+            self.version_service.iter_versions(
+                app_id, fields={"appStoreVersions": ("versionString", "createdDate")}),
+            key=lambda version: version.get("attributes", {}).get("createdDate") or "",
+            reverse=True)[:self.version_window]
+
+        tagged = 0
+        for version in versions:
+            version_string = version.get("attributes", {}).get("versionString")
+            for page in self.app_info_service.iter_version_customer_reviews(
+                    version["id"]).pages():
+                reviews = page.get("data", [])
+                ids = [review["id"] for review in reviews]
+                if not ids:
+                    break
+                with self._lock:
+                    done = self._conn.execute(
+                        f"SELECT COUNT(*) FROM reviews WHERE version IS NOT NULL "
+                        f"AND id IN ({','.join('?' * len(ids))})", ids).fetchone()[0]
+                self._insert(app_id, reviews, sync_id, version_string)
+                with self._lock, self._conn:
+                    tagged += self._conn.executemany(
+                        "UPDATE reviews SET version = ? WHERE id = ? AND version IS NULL",
+                        [(version_string, review_id) for review_id in ids]).rowcount
+                if done:
+                    break
+        return tagged
+
+    def search(  # pylint: disable=too-many-arguments
+            self,
+            app_id: str,
+            query: str,
+            *,
+            rating: int = None,
+            territory: str = None,
+            version: str = None,
+            limit: int = 20):
+        """Return the reviews matching an FTS5 query, best match first.
+
+        ``query`` uses FTS5 syntax (``crash OR freeze``, ``"dark mode"``,
+        ``sync*``); if it does not parse, its words are searched as plain
+        terms.
+        """
+        where, params = ["reviews_fts MATCH ?", "r.app_id = ?"], [query, app_id]
+        for column, value in (("rating", rating), ("territory", territory),
+                              ("version", version)):
+            if value is not None:
+                where.append(f"r.{column} = ?")
+                params.append(value)
+        sql = (f"SELECT {', '.join('r.' + column for column in _COLUMNS)} "
+               f"FROM reviews_fts JOIN reviews AS r ON r.rowid = reviews_fts.rowid "
+               f"WHERE {' AND '.join(where)} ORDER BY bm25(reviews_fts) LIMIT ?")
+        with self._lock:
+            try:
+                found = self._conn.execute(sql, (*params, limit)).fetchall()
+            except sqlite3.OperationalError:
+                params[0] = " ".join(
+                    '"' + word.replace('"', '""') + '"' for word in query.split())
+                found = self._conn.execute(sql, (*params, limit)).fetchall()
+        return [_review(row) for row in found]
+
+    def histogram(self, app_id: str, group_by: str = "version"):
+        """Return the count of each star rating, and the average, per version or territory.
+
+        Reviews without a rating are left out.
+        """
+        column = _GROUP_COLUMNS[group_by]
+        with self._lock:
+            found = self._conn.execute(
+                f"SELECT {column}, rating, COUNT(*) FROM reviews "
+                f"WHERE app_id = ? AND rating IS NOT NULL "
+                f"GROUP BY {column}, rating", (app_id,)).fetchall()
+        groups = {}
+        for key, rating, count in found:
+            group = groups.setdefault(key or "unknown", {
+                "ratings": {str(stars): 0 for stars in range(1, 6)},
+                "count": 0,
+                "total": 0,
+            })
+            group["ratings"][str(rating)] = count
+            group["count"] += count
+            group["total"] += rating * count
+        return {
+            key: {"ratings": group["ratings"], "count": group["count"],
+                  "average": round(group["total"] / group["count"], 2)}
+            for key, group in groups.items()
+        }
+
+    def new_since_last_sync(self, app_id: str, limit: int = 50):
+        """Return the reviews the most recent sync added, newest first."""
+        with self._lock:
+            last = self._conn.execute(
+                "SELECT id FROM review_syncs WHERE app_id = ? AND complete = 1 "
+                "ORDER BY id DESC LIMIT 1", (app_id,)).fetchone()
+            if last is None:
+                return []
+            found = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM reviews "
+                f"WHERE app_id = ? AND sync_id = ? ORDER BY created_date DESC LIMIT ?",
+                (app_id, last[0], limit)).fetchall()
+        return [_review(row) for row in found]
+
+    def stats(self):
+        """Return the number of stored reviews and apps."""
+        with self._lock:
+            reviews, apps = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT app_id) FROM reviews").fetchone()
+        return {"reviews": reviews, "apps": apps, "path": self.path}
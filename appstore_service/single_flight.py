@@ -0,0 +1,75 @@
+"""Coalescing of identical concurrent calls into a single execution."""
+import threading
+from .cancellation import RequestCancelled, check_cancelled
+
+# How often a waiting caller checks whether its own call was cancelled.
+_WAIT_POLL_SECONDS = 0.25
+
+
+class _Call:  # pylint: disable=too-few-public-methods
+    """A call in progress and, once finished, its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    Callers that ask for a key while a call for it is running wait for that
+    call and share its result (or its exception) instead of repeating it.
+    """
+
+    def __init__(self):
+        self.executed = 0
+        self.deduplicated = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return ``fn()``, sharing the result with concurrent callers of ``key``."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.executed += 1
+                else:
+                    self.deduplicated += 1
+
+            if leader:
+                return self._lead(key, call, fn)
+
+            while not call.done.wait(_WAIT_POLL_SECONDS):
+                check_cancelled()
+            if isinstance(call.error, RequestCancelled):
+                # The leader's client gave up, not ours: run the call again.
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _lead(self, key, call, fn):
+        """Execute ``fn`` on behalf of every caller waiting on ``key``."""
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Return how many calls ran and how many were served by another caller."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "deduplicated": self.deduplicated,
+            }
@@ -0,0 +1,263 @@
+"""Bulk addition and removal of beta testers.
+
+Testers that already exist are found with one ``filter[email]`` request
+per batch and linked to (or unlinked from) each group with one request
+per batch on ``betaGroups/{id}/relationships/betaTesters``. Only testers
+that do not exist yet need a request each; those are created concurrently,
+paced by the shared rate limiter.
+"""
+import csv
+import io
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from . import config
+from .cancellation import submit_in_context
+
+
+# CSV headers, lowercased with punctuation and spaces removed, for each tester field.
+_COLUMN_NAMES = {
+    "email": "email",
+    "emailaddress": "email",
+    "firstname": "firstName",
+    "givenname": "firstName",
+    "lastname": "lastName",
+    "surname": "lastName",
+    "familyname": "lastName",
+}
+
+
+def _chunks(items, size):
+    """Split ``items`` into lists of at most ``size``."""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _column_name(header):
+    """Return the tester field a CSV header names, or None for other columns."""
+    return _COLUMN_NAMES.get("".join(char for char in header.lower() if char.isalnum()))
+
+
+def parse_testers(testers=None, csv_text: str = None):
+    """Return a de-duplicated list of ``{"email", "firstName", "lastName"}`` dicts.
+
+    ``testers`` may mix email strings and dicts. ``csv_text`` is either a
+    CSV with a header row naming an email column (and optionally first and
+    last name columns, e.g. ``Email Address,First Name,last_name``), or one
+    email per line. A first row without an ``@`` is taken as the header.
+    Later duplicates of an email are dropped.
+
+    Raises:
+        ValueError: If an entry has no email address.
+    """
+    entries = list(testers or [])
+    if csv_text:
+        lines = csv_text.strip().splitlines()
+        if lines and "@" not in lines[0]:
+            for row in csv.DictReader(io.StringIO("\n".join(lines))):
+                tester = {}
+                for key, value in row.items():
+                    field = _column_name(key) if key else None
+                    if field and not tester.get(field):
+                        tester[field] = (value or "").strip()
+                entries.append(tester)
+        else:
+            entries.extend(line.strip() for line in lines if line.strip())
+
+    parsed, seen = [], set()
+    for entry in entries:
+        tester = {"email": entry} if isinstance(entry, str) else dict(entry)
+        email = (tester.get("email") or "").strip()
+        if not email or "@" not in email:
+            raise ValueError(f"Invalid tester entry: {entry!r}")
+        if email.lower() in seen:
+            continue
+        seen.add(email.lower())
+        parsed.append({
+            "email": email,
+            "firstName": tester.get("firstName") or None,
+            "lastName": tester.get("lastName") or None,
+        })
+    return parsed
+
+
+class BulkTesterUpdate:
+    """Adds or removes many beta testers with as few requests as possible.
+
+    Per-tester outcomes are passed to ``on_outcome`` as soon as they are
+    known and returned, with a summary, at the end.
+    """
+
+    def __init__(self, beta_service, max_workers: int = None, batch_size: int = None):
+        self.beta_service = beta_service
+        self.max_workers = max(1, max_workers or config.BULK_TESTER_WORKERS)
+        self.batch_size = batch_size or config.BULK_TESTER_BATCH_SIZE
+
+    def find_existing(self, emails):
+        """Return ``{lowercase email: tester_id}`` for the testers that exist."""
+        existing = {}
+        for batch in _chunks(emails, self.batch_size):
+            for tester in self.beta_service.find_testers_by_email(batch).get("data", []):
+                email = tester.get("attributes", {}).get("email")
+                if email:
+                    existing[email.lower()] = tester["id"]
+        return existing
+
+    def add(self, testers, group_ids, on_outcome=None):
+        """Add ``testers`` to every group in ``group_ids``, creating missing testers."""
+        started = time.perf_counter()
+        outcomes = []
+        emit = self._emitter(outcomes, on_outcome)
+        self._add(testers, group_ids, emit)
+        return self._report("add", group_ids, outcomes, started)
+
+    def _add(self, testers, group_ids, emit):
+        """Link the testers that exist and create the rest."""
+        existing = self.find_existing([tester["email"] for tester in testers])
+
+        to_link = [(tester["email"], existing[tester["email"].lower()])
+                   for tester in testers if tester["email"].lower() in existing]
+        to_create = [tester for tester in testers
+                     if tester["email"].lower() not in existing]
+
+        self._link(to_link, group_ids, "linked",
+                   self.beta_service.add_testers_to_group, emit)
+
+        if to_create:
+            with ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="tester-import") as executor:
+                futures = {
+                    submit_in_context(
+                        executor, self.beta_service.add_tester_to_groups,
+                        tester["email"], group_ids,
+                        tester["firstName"], tester["lastName"]): tester
+                    for tester in to_create}
+                for future in as_completed(futures):
+                    email = futures[future]["email"]
+                    try:
+                        created = future.result()
+                        emit(email, "created", (created or {}).get("data", {}).get("id"))
+                    except requests.exceptions.RequestException as e:
+                        emit(email, "failed", _error_detail(e))
+
+    def remove(self, testers, group_ids, on_outcome=None):
+        """Remove ``testers`` from every group in ``group_ids``."""
+        started = time.perf_counter()
+        outcomes = []
+        emit = self._emitter(outcomes, on_outcome)
+        existing = self.find_existing([tester["email"] for tester in testers])
+
+        to_unlink = []
+        for tester in testers:
+            tester_id = existing.get(tester["email"].lower())
+            if tester_id:
+                to_unlink.append((tester["email"], tester_id))
+            else:
+                emit(tester["email"], "not_found", None)
+
+        self._link(to_unlink, group_ids, "removed",
+                   self.beta_service.remove_testers_from_group, emit)
+        return self._report("remove", group_ids, outcomes, started)
+
+    def sync(self, group_id, testers, dry_run: bool = False, on_outcome=None):
+        """Make the members of ``group_id`` exactly ``testers``.
+
+        The current membership is read once; only the difference is
+        applied. Members to remove are unlinked by the IDs that listing
+        returned, so no per-email lookups are needed.
+        """
+        started = time.perf_counter()
+        to_add, to_remove, operations = self._sync_plan(group_id, testers)
+
+        outcomes = []
+        emit = self._emitter(outcomes, on_outcome)
+        if dry_run:
+            for tester in to_add:
+                emit(tester["email"], "would_add", None)
+            for email, tester_id in to_remove:
+                emit(email, "would_remove", tester_id)
+        else:
+            self._add(to_add, [group_id], emit)
+            self._link(to_remove, [group_id], "removed",
+                       self.beta_service.remove_testers_from_group, emit)
+
+        report = self._report("sync", [group_id], outcomes, started)
+        report["dry_run"] = dry_run
+        report["operations"] = operations
+        return report
+
+    def _sync_plan(self, group_id, testers):
+        """Work out the changes that make the members of ``group_id`` match ``testers``.
+
+        Returns the testers to add, the ``(email, tester_id)`` members to
+        remove and the operation counts.
+        """
+        members = {}
+        for tester in self.beta_service.iter_testers_in_group(
+                group_id, fields={"betaTesters": ("email",)}):
+            email = tester.get("attributes", {}).get("email")
+            if email:
+                members[email.lower()] = (email, tester["id"])
+
+        desired = {tester["email"].lower() for tester in testers}
+        to_add = [tester for tester in testers if tester["email"].lower() not in members]
+        to_remove = [members[email] for email in sorted(members) if email not in desired]
+        return to_add, to_remove, {
+            "current": len(members),
+            "desired": len(desired),
+            "unchanged": len(desired) - len(to_add),
+            "to_add": len(to_add),
+            "to_remove": len(to_remove),
+        }
+
+    def _link(self, testers, group_ids, status, request, emit):
+        """Send ``request(group_id, tester_ids)`` per group and batch, emitting outcomes."""
+        for batch in _chunks(testers, self.batch_size):
+            errors = {}
+            for group_id in group_ids:
+                try:
+                    request(group_id, [tester_id for _, tester_id in batch])
+                except requests.exceptions.RequestException as e:
+                    errors[group_id] = _error_detail(e)
+            for email, tester_id in batch:
+                if errors:
+                    emit(email, "failed", errors)
+                else:
+                    emit(email, status, tester_id)
+
+    @staticmethod
+    def _emitter(outcomes, on_outcome):
+        """Return a function recording one tester's outcome and passing it on."""
+        def emit(email, status, detail):
+            outcome = {"email": email, "status": status}
+            if detail is not None:
+                outcome["detail" if status == "failed" else "testerId"] = detail
+            outcomes.append(outcome)
+            if on_outcome:
+                on_outcome(outcome)
+        return emit
+
+    @staticmethod
+    def _report(action, group_ids, outcomes, started):
+        """Return the outcomes of a bulk run with per-status counts."""
+        return {
+            "action": action,
+            "groupIds": list(group_ids),
+            "summary": dict(Counter(outcome["status"] for outcome in outcomes),
+                            total=len(outcomes)),
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "outcomes": outcomes,
+        }
+
+
+def _error_detail(err):
+    """Return the API error body of a failed request, or its message."""
+    response = getattr(err, "response", None)
+    if response is not None:
+        try:
+            return response.json()
+        except ValueError:
+            return {"status": response.status_code, "message": response.text}
+    return str(err)
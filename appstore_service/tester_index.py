@@ -0,0 +1,224 @@
+"""In-memory index of beta testers, their groups and their apps."""
+import logging
+import threading
+import time
+from . import config
+
+
+class TesterIndex:  # pylint: disable=too-many-instance-attributes
+    """Answers tester questions from memory instead of one request per email.
+
+    The index is built from one paginated listing of ``GET /v1/betaTesters``
+    with ``include=betaGroups,apps`` and then kept current incrementally:
+    group links and unlinks made through this server update the tester's
+    entry in place, and other writes mark the affected emails dirty, to be
+    re-fetched in bulk with ``filter[email]`` before the next lookup. Emails
+    the index has never seen are fetched on demand, and those that do not
+    exist are remembered as missing for ``negative_ttl`` seconds. The whole
+    index is rebuilt once it is older than ``max_age`` seconds, to pick up
+    changes made elsewhere.
+
+    Apple includes at most 50 groups per tester, so a tester in more groups
+    is counted only in the first 50.
+    """
+
+    def __init__(self, beta_service, max_age: float = None, batch_size: int = None,
+                 negative_ttl: float = None):
+        self.beta_service = beta_service
+        self.max_age = config.TESTER_INDEX_MAX_AGE if max_age is None else max_age
+        self.batch_size = batch_size or config.BULK_TESTER_BATCH_SIZE
+        self.negative_ttl = (config.TESTER_NEGATIVE_TTL
+                             if negative_ttl is None else negative_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.refreshed_emails = 0
+        self._testers = {}
+        self._groups = {}
+        self._apps = {}
+        self._dirty = set()
+        self._missing = {}
+        self._built_at = None
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+
+    def build(self):
+        """(Re)build the index from a full listing of beta testers."""
+        with self._build_lock:
+            testers, groups, apps = {}, {}, {}
+            for page in self.beta_service.iter_testers_with_memberships().pages():
+                self._merge_page(page, testers, groups, apps)
+            with self._lock:
+                self._testers, self._groups, self._apps = testers, groups, apps
+                self._dirty.clear()
+                self._missing.clear()
+                self._built_at = time.monotonic()
+                self.builds += 1
+            logging.info("Tester index built with %d testers in %d groups",
+                         len(testers), len(groups))
+        return len(testers)
+
+    def mark_dirty(self, emails):
+        """Re-fetch ``emails`` before the next lookup, after they were changed."""
+        with self._lock:
+            for email in emails:
+                self._dirty.add(email.lower())
+                self._missing.pop(email.lower(), None)
+
+    def update_groups(self, emails, group_ids, linked: bool):
+        """Record that ``emails`` were linked to (or unlinked from) ``group_ids``.
+
+        The entries are changed in place, without a request; testers the
+        index does not hold are marked dirty instead.
+        """
+        group_ids = frozenset(group_ids)
+        unknown = []
+        with self._lock:
+            for email in emails:
+                entry = self._testers.get(email.lower())
+                if entry is None:
+                    unknown.append(email)
+                    continue
+                groups = entry["groups"] | group_ids if linked else entry["groups"] - group_ids
+                self._testers[email.lower()] = {**entry, "groups": groups}
+        if unknown:
+            self.mark_dirty(unknown)
+
+    def _ensure_current(self):
+        """Build the index if needed and re-fetch the testers marked dirty."""
+        with self._lock:
+            stale = (self._built_at is None
+                     or time.monotonic() - self._built_at > self.max_age)
+        if stale:
+            self.build()
+            return
+        with self._lock:
+            dirty, self._dirty = sorted(self._dirty), set()
+        if dirty:
+            self.refresh(dirty)
+
+    def refresh(self, emails):
+        """Re-fetch the given testers and replace their entries."""
+        for start in range(0, len(emails), self.batch_size):
+            batch = emails[start:start + self.batch_size]
+            testers, groups, apps = {}, {}, {}
+            for page in self.beta_service.iter_testers_with_memberships(batch).pages():
+                self._merge_page(page, testers, groups, apps)
+            now = time.monotonic()
+            with self._lock:
+                for email in batch:
+                    self._testers.pop(email.lower(), None)
+                    if email.lower() not in testers:
+                        self._missing[email.lower()] = now + self.negative_ttl
+                self._testers.update(testers)
+                for group_id, group in groups.items():
+                    self._groups.setdefault(group_id, group)
+                self._apps.update(apps)
+                self.refreshed_emails += len(batch)
+
+    @staticmethod
+    def _merge_page(page, testers, groups, apps):
+        """Add the testers, groups and apps of one listing page to the given dicts."""
+        for item in page.get("included", []):
+            attributes = item.get("attributes", {})
+            if item.get("type") == "betaGroups":
+                groups[item["id"]] = {"id": item["id"], "name": attributes.get("name")}
+            elif item.get("type") == "apps":
+                apps[item["id"]] = {"id": item["id"],
+                                    "bundleId": attributes.get("bundleId"),
+                                    "name": attributes.get("name")}
+        for tester in page.get("data", []):
+            attributes = tester.get("attributes", {})
+            email = attributes.get("email")
+            if not email:
+                continue
+            relationships = tester.get("relationships", {})
+            testers[email.lower()] = {
+                "id": tester["id"],
+                "email": email,
+                "firstName": attributes.get("firstName"),
+                "lastName": attributes.get("lastName"),
+                "groups": frozenset(ref["id"] for ref in
+                                    relationships.get("betaGroups", {}).get("data") or []),
+                "apps": frozenset(ref["id"] for ref in
+                                  relationships.get("apps", {}).get("data") or []),
+            }
+
+    def _entry(self, email):
+        """Return the index entry for ``email``, fetching it if it is unknown."""
+        self._ensure_current()
+        key = email.lower()
+        with self._lock:
+            entry = self._testers.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            expires = self._missing.get(key)
+            if expires is not None:
+                if time.monotonic() < expires:
+                    self.hits += 1
+                    return None
+                del self._missing[key]
+            self.misses += 1
+        # The tester may have been added after the index was built.
+        self.refresh([email])
+        with self._lock:
+            return self._testers.get(key)
+
+    def tester_id(self, email: str, app_id: str = None):
+        """Return the tester ID for ``email`` (optionally only if they test ``app_id``)."""
+        entry = self._entry(email)
+        if entry is None or (app_id and app_id not in entry["apps"]):
+            return None
+        return entry["id"]
+
+    def find(self, email: str):
+        """Return a tester with the names of their groups and the apps they test."""
+        entry = self._entry(email)
+        if entry is None:
+            return None
+        with self._lock:
+            return {
+                "id": entry["id"],
+                "email": entry["email"],
+                "firstName": entry["firstName"],
+                "lastName": entry["lastName"],
+                "groups": sorted(
+                    (self._groups.get(group_id, {"id": group_id, "name": None})
+                     for group_id in entry["groups"]),
+                    key=lambda group: group["id"]),
+                "apps": sorted(
+                    (self._apps.get(app_id, {"id": app_id}) for app_id in entry["apps"]),
+                    key=lambda app: app["id"]),
+            }
+
+    def group_member_counts(self, group_ids=None):
+        """Return ``{group_id: {"name", "members"}}`` for the given (or all) groups."""
+        self._ensure_current()
+        with self._lock:
+            counts = {group_id: {"name": group["name"], "members": 0}
+                      for group_id, group in self._groups.items()}
+            for entry in self._testers.values():
+                for group_id in entry["groups"]:
+                    counts.setdefault(group_id, {"name": None, "members": 0})
+                    counts[group_id]["members"] += 1
+        if group_ids is not None:
+            counts = {group_id: counts.get(group_id, {"name": None, "members": 0})
+                      for group_id in group_ids}
+        return counts
+
+    def stats(self):
+        """Return the size and hit counters of the index."""
+        with self._lock:
+            return {
+                "testers": len(self._testers),
+                "groups": len(self._groups),
+                "age_seconds": (int(time.monotonic() - self._built_at)
+                                if self._built_at is not None else None),
+                "dirty": len(self._dirty),
+                "missing": len(self._missing),
+                "hits": self.hits,
+                "misses": self.misses,
+                "builds": self.builds,
+                "refreshed_emails": self.refreshed_emails,
+            }
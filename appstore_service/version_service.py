@@ -1,6 +1,8 @@
 """Service for managing App Store Connect app version operations."""
-import requests
 from .api_auth import AppStoreConnectAuth
+from .fieldsets import query_params
+from .http_client import HttpClient
+from .pagination import Paginator
 
 # Default timeout for all requests (30 seconds)
 REQUEST_TIMEOUT = 30
@@ -9,8 +11,9 @@ REQUEST_TIMEOUT = 30
 class VersionService:
     """Service for managing App Store Connect app version operations."""
 
-    def __init__(self, auth: AppStoreConnectAuth):
+    def __init__(self, auth: AppStoreConnectAuth, http: HttpClient = None):
         self.auth = auth
+        self.http = http or HttpClient()
 
     def create_version(
             self,
@@ -38,19 +41,35 @@ class VersionService:
                 }
             }
         }
-        response = requests.post(
-            url, headers=self.auth.headers, json=payload, timeout=REQUEST_TIMEOUT)
+        response = self.http.post(
+            url, headers=self.auth.write_headers, json=payload, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
-    def get_version(self, app_id: str, version_string: str):
+    def get_version(
+            self,
+            app_id: str,
+            version_string: str,
+            platform: str = None,
+            fields: dict = None,
+            include=None):
         """
         Get an app store version by version string.
+        Endpoint: GET https://api.appstoreconnect.apple.com/v1/apps/{APP_ID}
+        /appStoreVersions?filter[versionString]={VERSION}&filter[platform]={PLATFORM}
         """
-        url = (f"{self.auth.base_url}/appStoreVersions"
-               f"?filter[app]={app_id}&filter[versionString]={version_string}")
-        response = requests.get(
-            url, headers=self.auth.headers, timeout=REQUEST_TIMEOUT)
+        url = f"{self.auth.base_url}/apps/{app_id}/appStoreVersions"
+        params = {
+            "filter[versionString]": version_string,
+            **query_params("appStoreVersions", fields, include),
+        }
+        if platform:
+            params["filter[platform]"] = platform
+        response = self.http.get(
+            url,
+            headers=self.auth.headers,
+            params=params,
+            timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
@@ -65,8 +84,8 @@ class VersionService:
                 "id": build_id
             }
         }
-        response = requests.patch(
-            url, headers=self.auth.headers, json=payload, timeout=REQUEST_TIMEOUT)
+        response = self.http.patch(
+            url, headers=self.auth.write_headers, json=payload, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
@@ -88,8 +107,8 @@ class VersionService:
                 }
             }
         }
-        response = requests.post(
-            url, headers=self.auth.headers, json=payload, timeout=REQUEST_TIMEOUT)
+        response = self.http.post(
+            url, headers=self.auth.write_headers, json=payload, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
@@ -111,17 +130,37 @@ class VersionService:
                 }
             }
         }
-        response = requests.post(
-            url, headers=self.auth.headers, json=payload, timeout=REQUEST_TIMEOUT)
+        response = self.http.post(
+            url, headers=self.auth.write_headers, json=payload, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
 
-    def list(self, app_id: str):
+    def iter_versions(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
         """
-        List all app store versions for an app.
+        Page through the app store versions of an app.
+        ``fields`` maps resource types to the attributes to fetch and
+        ``include`` names related resources to embed; see fieldsets.query_params.
         """
         url = f"{self.auth.base_url}/apps/{app_id}/appStoreVersions"
-        response = requests.get(
-            url, headers=self.auth.headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response.json()
+        return Paginator(
+            self.http, self.auth, url, query_params("appStoreVersions", fields, include),
+            max_items=max_items, max_seconds=max_seconds)
+
+    def list(
+            self,
+            app_id: str,
+            max_items: int = None,
+            max_seconds: float = None,
+            fields: dict = None,
+            include=None):
+        """
+        List all app store versions for an app, following every page.
+        """
+        return self.iter_versions(
+            app_id, max_items, max_seconds, fields, include).collect()
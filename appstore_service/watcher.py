@@ -0,0 +1,254 @@
+"""Background polling of build processing and App Store version states.
+
+Every watched build and version is checked on each poll, but the checks are
+batched: builds are fetched with ``GET /v1/builds?filter[id]=...`` and
+versions through their apps with ``GET /v1/apps?filter[id]=...
+&include=appStoreVersions``, so watching 30 apps costs one or two requests
+per poll rather than 30. The poll interval grows while nothing changes and
+drops back to the minimum after a change.
+
+Only an app's 50 most recent versions are included, so a watched version
+outside them (or one that does not exist) is reported as NOT_FOUND and no
+longer polled.
+"""
+import itertools
+import logging
+import threading
+import time
+from . import config
+
+# Build processing states after which a build no longer changes.
+BUILD_FINAL_STATES = frozenset({"VALID", "FAILED", "INVALID"})
+
+# State reported for a watched version its app's versions do not include.
+NOT_FOUND = "NOT_FOUND"
+
+
+def _chunks(items, size):
+    """Split ``items`` into lists of at most ``size``."""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class Watch:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """A build or version being watched for state changes."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, watch_id, kind, app_id, label, until, *, build_id=None,
+            version_string=None):
+        self.id = watch_id
+        self.kind = kind
+        self.app_id = app_id
+        self.label = label
+        self.until = frozenset(until or ())
+        self.build_id = build_id
+        self.version_string = version_string
+        self.state = None
+        self.changed_at = None
+        self.changes = 0
+        self.active = True
+
+    def describe(self):
+        """Return the watch as reported by list-watches."""
+        description = {
+            "watchId": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "state": self.state,
+            "changedAt": self.changed_at,
+            "changes": self.changes,
+            "active": self.active,
+        }
+        if self.until:
+            description["until"] = sorted(self.until)
+        return description
+
+
+class Watcher:  # pylint: disable=too-many-instance-attributes
+    """Tracks many builds and versions and reports their state changes.
+
+    Listeners added with ``add_listener`` are called with one event dict per
+    change, from the polling thread. The thread starts with the first watch
+    and sleeps while there is nothing to watch.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            build_service,
+            app_info_service,
+            *,
+            min_interval: float = None,
+            max_interval: float = None,
+            backoff: float = None,
+            batch_size: int = None):
+        self.build_service = build_service
+        self.app_info_service = app_info_service
+        self.min_interval = min_interval or config.WATCH_MIN_INTERVAL
+        self.max_interval = max_interval or config.WATCH_MAX_INTERVAL
+        self.backoff = backoff or config.WATCH_BACKOFF
+        self.batch_size = batch_size or config.WATCH_BATCH_SIZE
+        self.interval = self.min_interval
+        self.polls = 0
+        self.requests = 0
+        self.errors = 0
+        self._ids = itertools.count(1)
+        self._watches = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_listener(self, listener):
+        """Call ``listener(event)`` for every state change."""
+        self._listeners.append(listener)
+
+    def watch_build(self, app_id: str, build_id: str, label: str = None, until=None):
+        """Watch a build's processing state; stops once it is VALID, FAILED or INVALID."""
+        return self._add(
+            "build", app_id, label or build_id, until or BUILD_FINAL_STATES,
+            build_id=build_id)
+
+    def watch_version(self, app_id: str, version_string: str, label: str = None,
+                      until=None):
+        """Watch a version's App Store state; without ``until`` it stops at the first change."""
+        return self._add(
+            "version", app_id, label or version_string, until,
+            version_string=version_string)
+
+    def _add(self, kind, app_id, label, until, **target):
+        with self._lock:
+            watch = Watch(next(self._ids), kind, app_id, label, until, **target)
+            self._watches[watch.id] = watch
+            self.interval = self.min_interval
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="watcher", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return watch.describe()
+
+    def unwatch(self, watch_id: int):
+        """Stop and forget a watch. Returns False if there is no such watch."""
+        with self._lock:
+            return self._watches.pop(watch_id, None) is not None
+
+    def list(self):
+        """Return every watch and the polling counters."""
+        with self._lock:
+            return {
+                "watches": [watch.describe() for watch in self._watches.values()],
+                "interval_seconds": round(self.interval, 1),
+                "polls": self.polls,
+                "requests": self.requests,
+                "errors": self.errors,
+            }
+
+    def stop(self):
+        """Stop the polling thread."""
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self):
+        """Poll until stopped, waiting ``interval`` seconds between polls."""
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.poll_once()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                with self._lock:
+                    self.errors += 1
+                    self.interval = min(self.max_interval, self.interval * self.backoff)
+                logging.warning("Watch poll failed: %s", e)
+
+    def poll_once(self):
+        """Check every active watch once and report changes. Returns the events."""
+        with self._lock:
+            active = [watch for watch in self._watches.values() if watch.active]
+        if not active:
+            return []
+
+        builds = [watch for watch in active if watch.kind == "build"]
+        versions = [watch for watch in active if watch.kind == "version"]
+        states = {}
+        if builds:
+            states.update(self._build_states({watch.build_id for watch in builds}))
+        if versions:
+            states.update(self._version_states({watch.app_id for watch in versions}))
+
+        events = []
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with self._lock:
+            self.polls += 1
+            for watch in active:
+                if watch.kind == "build":
+                    state = states.get(("build", watch.build_id))
+                else:
+                    # Versions are fetched per app, so a missing one is not coming back.
+                    state = states.get(("version", watch.app_id, watch.version_string),
+                                       NOT_FOUND)
+                if state is None or state == watch.state:
+                    continue
+                previous, watch.state = watch.state, state
+                watch.changed_at = now
+                if previous is not None:
+                    watch.changes += 1
+                if (state in watch.until or state == NOT_FOUND
+                        or (not watch.until and previous is not None)):
+                    watch.active = False
+                events.append({
+                    "watchId": watch.id,
+                    "kind": watch.kind,
+                    "label": watch.label,
+                    "from": previous,
+                    "to": state,
+                    "done": not watch.active,
+                    "at": now,
+                })
+            changed = any(event["from"] is not None for event in events)
+            self.interval = (self.min_interval if changed
+                             else min(self.max_interval, self.interval * self.backoff))
+
+        for event in events:
+            for listener in self._listeners:
+                listener(event)
+        return events
+
+    def _build_states(self, build_ids):
+        """Fetch the processing state of ``build_ids`` in batches."""
+        states = {}
+        for batch in _chunks(sorted(build_ids), self.batch_size):
+            page = self.build_service.get_builds_by_id(
+                batch, {"builds": ("processingState",)}, cache=False)
+            with self._lock:
+                self.requests += 1
+            for build in page.get("data", []):
+                states[("build", build["id"])] = build["attributes"].get("processingState")
+        return states
+
+    def _version_states(self, app_ids):
+        """Fetch the state of every recent version of ``app_ids`` in batches."""
+        states = {}
+        for batch in _chunks(sorted(app_ids), self.batch_size):
+            page = self.app_info_service.get_apps_with_versions(
+                batch,
+                {"apps": ("bundleId",),
+                 "appStoreVersions": ("versionString", "appStoreState")},
+                cache=False)
+            with self._lock:
+                self.requests += 1
+            versions = {item["id"]: item.get("attributes", {})
+                        for item in page.get("included", [])
+                        if item.get("type") == "appStoreVersions"}
+            for app in page.get("data", []):
+                linked = (app.get("relationships", {})
+                          .get("appStoreVersions", {}).get("data") or [])
+                for reference in linked:
+                    attributes = versions.get(reference["id"])
+                    if attributes:
+                        key = ("version", app["id"], attributes.get("versionString"))
+                        states[key] = attributes.get("appStoreState")
+        return states
@@ -0,0 +1,154 @@
+"""Encoding of tool results into the text sent back to MCP clients.
+
+Raw JSON:API documents carry ``links`` on every resource and relationship
+objects the client rarely needs. ``ResultEncoder`` projects them down to
+what each tool declares, optionally to caller-selected attributes, and
+encodes the result compactly. orjson is used when it is installed.
+"""
+import json
+import threading
+from appstore_service import config
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson for faster encoding.
+    orjson = None
+
+ENCODING_MODES = ("compact", "pretty")
+
+
+def _is_resource(value):
+    """Return True if ``value`` looks like a JSON:API resource object."""
+    return isinstance(value, dict) and "type" in value and "id" in value
+
+
+def project_resource(resource: dict, relationships=(), fields=None):
+    """Return a slimmed copy of a JSON:API resource object.
+
+    ``links`` are dropped, only the named relationships are kept (and only
+    their ``data`` linkage), and when ``fields`` is given only those
+    attributes are kept. The input is never modified, since parsed
+    responses are shared with the response cache.
+    """
+    projected = {"type": resource["type"], "id": resource["id"]}
+    attributes = resource.get("attributes")
+    if attributes is not None:
+        projected["attributes"] = (
+            attributes if fields is None
+            else {name: value for name, value in attributes.items() if name in fields})
+    kept = {}
+    for name, relationship in (resource.get("relationships") or {}).items():
+        if name in relationships or (fields is not None and name in fields):
+            if isinstance(relationship, dict) and "data" in relationship:
+                kept[name] = {"data": relationship["data"]}
+    if kept:
+        projected["relationships"] = kept
+    return projected
+
+
+def project(result, relationships=(), fields=None):
+    """Project a tool result: a JSON:API document, a bare resource or a list of resources.
+
+    Anything else is returned as is.
+    """
+    if _is_resource(result):
+        return project_resource(result, relationships, fields)
+    if isinstance(result, list):
+        return [project_resource(item, relationships, fields)
+                if _is_resource(item) else item for item in result]
+    if not isinstance(result, dict) or "data" not in result:
+        return result
+    projected = {}
+    for key, value in result.items():
+        if key == "links":
+            continue
+        if key in ("data", "included"):
+            if isinstance(value, list):
+                value = [project_resource(item, relationships, fields)
+                         if _is_resource(item) else item for item in value]
+            elif _is_resource(value):
+                value = project_resource(value, relationships, fields)
+        projected[key] = value
+    return projected
+
+
+def dumps(value, pretty: bool = False):
+    """Encode ``value`` as JSON text, preferring orjson when it is available."""
+    if orjson is not None:
+        try:
+            # pylint: disable-next=no-member  # orjson is not installed in the lint job.
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+        except TypeError:
+            # Integers wider than 64 bits and other types orjson rejects.
+            pass
+    if pretty:
+        return json.dumps(value, indent=2)
+    return json.dumps(value, separators=(",", ":"))
+
+
+class ResultEncoder:
+    """Projects and encodes tool results, tracking the bytes saved per tool.
+
+    ``projections`` maps a tool name to the relationships its results keep;
+    every other relationship and all ``links`` are removed. Every
+    ``sample_every``-th call of a tool is also encoded the way the server
+    used to (unprojected, indented) to measure the size reduction.
+    """
+
+    def __init__(
+            self,
+            projections: dict = None,
+            mode: str = None,
+            project_results: bool = None,
+            sample_every: int = None):
+        self.projections = projections or {}
+        self.mode = mode or config.RESULT_ENCODING
+        if self.mode not in ENCODING_MODES:
+            raise ValueError(
+                f"RESULT_ENCODING must be one of {', '.join(ENCODING_MODES)}, not {self.mode!r}")
+        self.project_results = (config.RESULT_PROJECTION
+                                if project_results is None else project_results)
+        self.sample_every = sample_every or config.RESULT_SIZE_SAMPLE_EVERY
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def encode(self, tool_name: str, result, fields=None):
+        """Return the text sent to the client for one tool result."""
+        if self.project_results or fields is not None:
+            field_set = frozenset(fields) if fields is not None else None
+            projected = project(result, self.projections.get(tool_name, ()), field_set)
+        else:
+            projected = result
+        text = dumps(projected, pretty=self.mode == "pretty")
+        size = len(text.encode())
+
+        with self._lock:
+            stats = self._stats.setdefault(tool_name, {
+                "calls": 0, "bytes_sent": 0,
+                "sampled_calls": 0, "sampled_raw_bytes": 0, "sampled_bytes_sent": 0,
+            })
+            stats["calls"] += 1
+            stats["bytes_sent"] += size
+            sampled = (stats["calls"] - 1) % self.sample_every == 0
+        if sampled:
+            raw_bytes = len(json.dumps(result, indent=2).encode())
+            with self._lock:
+                stats["sampled_calls"] += 1
+                stats["sampled_raw_bytes"] += raw_bytes
+                stats["sampled_bytes_sent"] += size
+        return text
+
+    def stats(self):
+        """Return per-tool byte counts and the measured size reduction."""
+        with self._lock:
+            report = {}
+            for tool_name, stats in self._stats.items():
+                raw = stats["sampled_raw_bytes"]
+                report[tool_name] = dict(
+                    stats,
+                    reduction=round(1 - stats["sampled_bytes_sent"] / raw, 3) if raw else None)
+            return {
+                "encoding": self.mode,
+                "backend": "orjson" if orjson is not None else "json",
+                "tools": report,
+            }
@@ -0,0 +1,150 @@
+"""Non-blocking logging for the MCP server.
+
+Log records are put on a bounded in-memory queue and written to a rotating
+log file and stderr by a background thread, so the stdio loop never waits
+on disk I/O. Raw JSON-RPC payloads go through ``PayloadLogger``, which can
+truncate, sample or skip them entirely.
+"""
+import atexit
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from appstore_service import config
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+PAYLOAD_MODES = ("off", "truncate", "full")
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Called under the handler lock, so the counter needs no lock of its own.
+            self.dropped += 1
+
+
+def setup_logging(  # pylint: disable=too-many-arguments
+        log_file,
+        *,
+        level: str = None,
+        stderr_level: str = None,
+        max_bytes: int = None,
+        backup_count: int = None,
+        queue_size: int = None):
+    """Route root logging through a background writer.
+
+    Args:
+        log_file: Path of the log file; it is rotated once it reaches
+            ``max_bytes``.
+        level: Minimum level written to the log file.
+        stderr_level: Minimum level written to stderr.
+        max_bytes: File size that triggers a rotation.
+        backup_count: Number of rotated files kept.
+        queue_size: Records buffered before new ones are dropped.
+
+    Returns:
+        QueueListener: The running listener. It is stopped (and the queue
+        flushed) at interpreter exit.
+    """
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=max_bytes or config.LOG_MAX_BYTES,
+        backupCount=config.LOG_BACKUP_COUNT if backup_count is None else backup_count,
+        delay=True)
+    file_handler.setLevel(level or config.LOG_LEVEL)
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(stderr_level or config.LOG_STDERR_LEVEL)
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in (file_handler, stderr_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(queue_size or config.LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = QueueListener(
+        log_queue, file_handler, stderr_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    # Records below both handler levels are discarded before they are queued.
+    root.setLevel(min(file_handler.level, stderr_handler.level))
+
+    listener.start()
+    atexit.register(stop_listener, listener)
+    return listener
+
+
+def dropped_records():
+    """Return how many log records were dropped because the queue was full."""
+    return sum(handler.dropped for handler in logging.getLogger().handlers
+               if isinstance(handler, DroppingQueueHandler))
+
+
+def stop_listener(listener: QueueListener):
+    """Flush the queue and stop the writer thread, if it is still running.
+
+    Records dropped on a full queue are reported once the queue is flushed.
+    """
+    if listener._thread is None:  # pylint: disable=protected-access
+        return
+    listener.stop()
+    dropped = dropped_records()
+    if dropped:
+        # The writer thread is gone, so the warning goes straight to its handlers.
+        record = logging.makeLogRecord({
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": "%d log records were dropped because the log queue was full",
+            "args": (dropped,),
+        })
+        for handler in listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class PayloadLogger:  # pylint: disable=too-few-public-methods
+    """Logs raw JSON-RPC payloads without paying for the whole payload.
+
+    ``mode`` is ``"off"`` (payloads are never logged), ``"truncate"`` (only
+    the first ``max_chars`` characters are kept) or ``"full"``.
+    ``sample_rate`` is the fraction of payloads logged at all.
+    """
+
+    def __init__(
+            self,
+            mode: str = None,
+            max_chars: int = None,
+            sample_rate: float = None,
+            logger: logging.Logger = None):
+        self.mode = mode or config.LOG_PAYLOADS
+        if self.mode not in PAYLOAD_MODES:
+            raise ValueError(
+                f"LOG_PAYLOADS must be one of {', '.join(PAYLOAD_MODES)}, not {self.mode!r}")
+        self.max_chars = max_chars or config.LOG_PAYLOAD_MAX_CHARS
+        self.sample_rate = (config.LOG_PAYLOAD_SAMPLE_RATE
+                            if sample_rate is None else sample_rate)
+        self.logger = logger or logging.getLogger("app_store_connect_server.payloads")
+
+    def log(self, label: str, payload):
+        """Log ``payload`` under ``label`` if payload logging is on and sampled in."""
+        if self.mode == "off" or not self.logger.isEnabledFor(logging.INFO):
+            return
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        text = payload if isinstance(payload, str) else str(payload)
+        if self.mode == "truncate" and len(text) > self.max_chars:
+            self.logger.info(
+                "%s: %r... (%d of %d chars)",
+                label, text[:self.max_chars], self.max_chars, len(text))
+        else:
+            self.logger.info("%s: %r", label, text)
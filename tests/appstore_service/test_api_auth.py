@@ -1,8 +1,10 @@
 """Unit tests for appstore_service.api_auth module."""
+import threading
 import time
 import pytest
 from unittest.mock import patch, mock_open, MagicMock
-from appstore_service.api_auth import AppStoreConnectAuth
+from appstore_service.api_auth import (
+    AppStoreConnectAuth, CredentialPool, TOKEN_REFRESH_MARGIN)
 
 
 class TestAppStoreConnectAuth:
@@ -28,18 +30,21 @@ class TestAppStoreConnectAuth:
 
     @patch('appstore_service.api_auth.config')
     @patch('appstore_service.api_auth.jwt.encode')
-    @patch('builtins.open', new_callable=mock_open, read_data="fake_private_key")
+    @patch('appstore_service.api_auth.serialization.load_pem_private_key')
+    @patch('builtins.open', new_callable=mock_open, read_data=b"fake_private_key")
     @patch('time.time', return_value=1000000)
-    def test_generate_jwt(self, mock_time, mock_file, mock_jwt_encode, mock_config):
+    def test_generate_jwt(self, mock_time, mock_file, mock_load_key, mock_jwt_encode, mock_config):
         """Test JWT token generation."""
         mock_config.KEY_ID = "test_key_id"
         mock_config.ISSUER_ID = "test_issuer_id"
         mock_config.PRIVATE_KEY_PATH = "test_path.p8"
         mock_config.EXPIRATION_MINUTES = 19
 
+        parsed_key = MagicMock()
+        mock_load_key.return_value = parsed_key
         mock_jwt_encode.return_value = "fake_jwt_token"
         
-        auth = AppStoreConnectAuth()
+        auth = AppStoreConnectAuth(background_refresh=False)
         auth._generate_jwt()
 
         # Verify JWT encode was called with correct parameters
@@ -55,15 +60,115 @@ class TestAppStoreConnectAuth:
             "aud": "appstoreconnect-v1"
         }
         
+        mock_load_key.assert_called_once_with(b"fake_private_key", password=None)
         mock_jwt_encode.assert_called_once_with(
             expected_payload,
-            "fake_private_key",
+            parsed_key,
             algorithm="ES256",
             headers=expected_headers
         )
         
         assert auth._token == "fake_jwt_token"
         assert auth._token_generated_time == 1000000
+        assert auth.signing_stats()["tokens_signed"] == 1
+
+    @patch('appstore_service.api_auth.config')
+    @patch('appstore_service.api_auth.jwt.encode', return_value="token")
+    @patch('appstore_service.api_auth.serialization.load_pem_private_key')
+    @patch('builtins.open', new_callable=mock_open, read_data=b"fake_private_key")
+    def test_private_key_is_parsed_once(
+            self, mock_file, mock_load_key, mock_jwt_encode, mock_config):
+        """Test that the .p8 file is read and parsed only for the first token."""
+        mock_config.EXPIRATION_MINUTES = 19
+
+        auth = AppStoreConnectAuth(background_refresh=False)
+        auth._generate_jwt()
+        auth._generate_jwt()
+
+        mock_file.assert_called_once()
+        mock_load_key.assert_called_once()
+        assert mock_jwt_encode.call_count == 2
+
+    @patch('appstore_service.api_auth.config')
+    @patch('time.time')
+    def test_token_refreshed_inside_margin(self, mock_time, mock_config):
+        """Test that a token is replaced shortly before it expires."""
+        mock_config.EXPIRATION_MINUTES = 19
+
+        auth = AppStoreConnectAuth(background_refresh=False)
+        auth._token = "old_token"
+        auth._token_generated_time = 1000000
+        mock_time.return_value = 1000000 + (19 * 60) - TOKEN_REFRESH_MARGIN
+
+        with patch.object(auth, '_generate_jwt') as mock_generate:
+            _ = auth.token
+            mock_generate.assert_called_once()
+
+    @patch('appstore_service.api_auth.config')
+    def test_concurrent_callers_sign_once(self, mock_config):
+        """Test that callers racing on an expired token share one signature."""
+        mock_config.EXPIRATION_MINUTES = 19
+        auth = AppStoreConnectAuth(background_refresh=False)
+        signed = []
+
+        def generate():
+            time.sleep(0.05)
+            signed.append(1)
+            auth._token = "new_token"
+            auth._token_generated_time = time.time()
+
+        with patch.object(auth, '_generate_jwt', side_effect=generate):
+            threads = [threading.Thread(target=lambda: auth.token) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert signed == [1]
+
+    @patch('appstore_service.api_auth.config')
+    @patch('appstore_service.api_auth.threading.Timer')
+    def test_background_refresh_scheduled(self, mock_timer, mock_config):
+        """Test that a refresh is scheduled ahead of expiry after signing."""
+        mock_config.EXPIRATION_MINUTES = 19
+
+        auth = AppStoreConnectAuth()
+        auth._schedule_refresh()
+
+        delay, callback = mock_timer.call_args.args
+        assert delay == 19 * 60 - TOKEN_REFRESH_MARGIN
+        assert callback == auth._refresh_in_background
+        mock_timer.return_value.start.assert_called_once()
+
+    @patch('appstore_service.api_auth.config')
+    @patch('appstore_service.api_auth.threading.Timer')
+    def test_background_refresh_stops_when_idle(self, mock_timer, mock_config):
+        """Test that a token nobody used since signing is not refreshed again."""
+        mock_config.EXPIRATION_MINUTES = 19
+        auth = AppStoreConnectAuth()
+        auth._token = "old_token"
+        auth._token_used = False
+
+        with patch.object(auth, '_generate_jwt') as mock_generate:
+            auth._refresh_in_background()
+
+        mock_generate.assert_not_called()
+        assert auth._refresh_timer is None
+        mock_timer.assert_not_called()
+
+    @patch('appstore_service.api_auth.config')
+    def test_background_refresh_renews_used_token(self, mock_config):
+        """Test that a token used since signing is refreshed ahead of expiry."""
+        mock_config.EXPIRATION_MINUTES = 19
+        auth = AppStoreConnectAuth(background_refresh=False)
+        auth._token = "old_token"
+        auth._token_generated_time = time.time()
+        _ = auth.token
+
+        with patch.object(auth, '_generate_jwt') as mock_generate:
+            auth._refresh_in_background()
+
+        mock_generate.assert_called_once()
 
     @patch('appstore_service.api_auth.config')
     def test_token_property_generates_new_token_when_none_exists(self, mock_config):
@@ -143,4 +248,89 @@ class TestAppStoreConnectAuth:
             "Content-Type": "application/json"
         }
         
-        assert headers == expected_headers
\ No newline at end of file
+        assert headers == expected_headers
+
+
+def make_key(key_id):
+    """Build a mock key whose headers name the key."""
+    key = MagicMock()
+    key.key_id = key_id
+    key.issuer_id = "issuer"
+    key.base_url = "https://api.appstoreconnect.apple.com/v1"
+    key.headers = {"Authorization": f"Bearer {key_id}"}
+    return key
+
+
+class TestCredentialPool:
+    """Test cases for CredentialPool class."""
+
+    def test_least_used_selection_rotates_keys(self):
+        """Test that least-used selection spreads reads evenly."""
+        pool = CredentialPool(
+            [make_key("A"), make_key("B")], selection="least_used")
+
+        used = [pool.headers.resolve()["Authorization"] for _ in range(4)]
+
+        assert sorted(used) == ["Bearer A", "Bearer A", "Bearer B", "Bearer B"]
+        assert pool.usage() == {"A": 2, "B": 2}
+
+    def test_budget_selection_prefers_most_remaining(self):
+        """Test that the key with the most quota left is picked."""
+        remaining = {"A": 50, "B": 3000, "C": 10}
+        pool = CredentialPool(
+            [make_key("A"), make_key("B"), make_key("C")],
+            selection="remaining_budget", budget=remaining.get)
+
+        assert pool.headers.resolve()["Authorization"] == "Bearer B"
+
+    def test_budget_selection_tries_unseen_keys_first(self):
+        """Test that a key without known quota is used before known ones."""
+        remaining = {"A": 3000}
+        pool = CredentialPool(
+            [make_key("A"), make_key("B")],
+            selection="remaining_budget", budget=remaining.get)
+
+        assert pool.headers.resolve()["Authorization"] == "Bearer B"
+
+    def test_writes_are_pinned(self):
+        """Test that mutating requests always use the pinned key."""
+        pool = CredentialPool(
+            [make_key("A"), make_key("B")],
+            write_key_id="B", selection="least_used")
+
+        assert {pool.write_headers["Authorization"] for _ in range(3)} == {"Bearer B"}
+        assert pool.usage() == {"A": 0, "B": 3}
+
+    def test_key_is_picked_when_headers_are_resolved(self):
+        """Test that building headers does not use up a key until they are sent."""
+        pool = CredentialPool([make_key("A"), make_key("B")], selection="least_used")
+
+        headers = pool.headers.copy()
+        headers["Accept"] = "application/json"
+
+        assert pool.usage() == {"A": 0, "B": 0}
+        assert headers.resolve() == {"Authorization": "Bearer A",
+                                     "Content-Type": "application/json",
+                                     "Accept": "application/json"}
+        assert pool.usage() == {"A": 1, "B": 0}
+
+    def test_unknown_write_key_rejected(self):
+        """Test that pinning to a key outside the pool is an error."""
+        with pytest.raises(ValueError):
+            CredentialPool([make_key("A")], write_key_id="Z")
+
+    @patch('appstore_service.api_auth.config')
+    def test_from_config_adds_extra_keys(self, mock_config):
+        """Test that the pool holds the main key plus EXTRA_API_KEYS."""
+        mock_config.KEY_ID = "MAIN"
+        mock_config.ISSUER_ID = "issuer"
+        mock_config.EXPIRATION_MINUTES = 19
+        mock_config.WRITE_KEY_ID = None
+        mock_config.KEY_SELECTION = "least_used"
+        mock_config.EXTRA_API_KEYS = [
+            {"key_id": "EXTRA", "issuer_id": "issuer", "private_key_path": "extra.p8"}]
+
+        pool = CredentialPool.from_config()
+
+        assert list(pool.keys) == ["MAIN", "EXTRA"]
+        assert pool.keys["EXTRA"].private_key_path == "extra.p8"
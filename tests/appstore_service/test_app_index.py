@@ -0,0 +1,84 @@
+"""Unit tests for appstore_service.app_index module."""
+import json
+from unittest.mock import Mock, patch
+from appstore_service.app_index import AppIdIndex
+
+
+def make_app(app_id, bundle_id):
+    """Build an app resource."""
+    return {"id": app_id, "type": "apps", "attributes": {"bundleId": bundle_id}}
+
+
+class TestAppIdIndex:
+    """Test cases for AppIdIndex class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_service = Mock()
+        pages = [
+            {"data": [make_app("1", "com.example.one")]},
+            {"data": [make_app("2", "com.example.two")]},
+        ]
+        self.mock_service.iter_apps.return_value.pages.return_value = pages
+
+    def test_first_lookup_prewarms_with_one_sweep(self):
+        """Test that a cold index fills itself and then answers from memory."""
+        index = AppIdIndex(self.mock_service)
+
+        assert index.get("com.example.two") == "2"
+        assert index.get("com.example.one") == "1"
+
+        self.mock_service.iter_apps.assert_called_once()
+        self.mock_service.get_app_id_by_bundle_id.assert_not_called()
+        assert index.stats()["hits"] == 1
+
+    def test_unknown_bundle_id_is_negatively_cached(self):
+        """Test that a missing bundle ID is not looked up again within the TTL."""
+        index = AppIdIndex(self.mock_service, negative_ttl=60)
+        index.prewarm()
+        self.mock_service.get_app_id_by_bundle_id.return_value = None
+
+        assert index.get("com.example.missing") is None
+        assert index.get("com.example.missing") is None
+
+        self.mock_service.get_app_id_by_bundle_id.assert_called_once_with(
+            "com.example.missing")
+
+    @patch('appstore_service.app_index.time.monotonic')
+    def test_negative_entry_expires(self, mock_monotonic):
+        """Test that a missing bundle ID is looked up again after the TTL."""
+        mock_monotonic.return_value = 1000
+        index = AppIdIndex(self.mock_service, negative_ttl=60)
+        index.prewarm()
+        self.mock_service.get_app_id_by_bundle_id.return_value = None
+        index.get("com.example.new")
+
+        mock_monotonic.return_value = 1061
+        self.mock_service.get_app_id_by_bundle_id.return_value = "3"
+
+        assert index.get("com.example.new") == "3"
+
+    def test_warm_index_looks_up_apps_added_later(self):
+        """Test that an app missing from the sweep is found with a point lookup."""
+        index = AppIdIndex(self.mock_service)
+        index.prewarm()
+        self.mock_service.get_app_id_by_bundle_id.return_value = "9"
+
+        assert index.get("com.example.later") == "9"
+        assert index.get("com.example.later") == "9"
+        self.mock_service.get_app_id_by_bundle_id.assert_called_once()
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a saved index is reused without a sweep."""
+        path = tmp_path / "cache" / "index.json"
+        AppIdIndex(self.mock_service, str(path)).prewarm()
+
+        assert json.loads(path.read_text())["apps"] == {
+            "com.example.one": "1", "com.example.two": "2"}
+
+        fresh_service = Mock()
+        index = AppIdIndex(fresh_service, str(path))
+
+        assert index.warm is True
+        assert index.get("com.example.one") == "1"
+        fresh_service.iter_apps.assert_not_called()
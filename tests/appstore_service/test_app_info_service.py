@@ -13,10 +13,10 @@ class TestAppInfoService:
         self.mock_auth = Mock()
         self.mock_auth.base_url = "https://api.appstoreconnect.apple.com/v1"
         self.mock_auth.headers = {"Authorization": "Bearer test_token"}
-        self.service = AppInfoService(self.mock_auth)
+        self.mock_http = Mock()
+        self.service = AppInfoService(self.mock_auth, self.mock_http)
 
-    @patch('requests.get')
-    def test_list_apps_success(self, mock_get):
+    def test_list_apps_success(self):
         """Test successful apps listing."""
         expected_response = {
             "data": [
@@ -26,29 +26,28 @@ class TestAppInfoService:
         
         mock_response = Mock()
         mock_response.json.return_value = expected_response
-        mock_get.return_value = mock_response
+        self.mock_http.get.return_value = mock_response
         
         result = self.service.list_apps()
         
-        mock_get.assert_called_once_with(
+        self.mock_http.get.assert_called_once_with(
             "https://api.appstoreconnect.apple.com/v1/apps",
             headers={"Authorization": "Bearer test_token"},
-            timeout=REQUEST_TIMEOUT
+            params={"fields[apps]": "name,bundleId,sku,primaryLocale", "limit": 200}
         )
-        assert result == expected_response
+        assert result["data"] == expected_response["data"]
+        assert result["meta"]["truncated"] is False
 
-    @patch('requests.get')
-    def test_list_apps_http_error(self, mock_get):
+    def test_list_apps_http_error(self):
         """Test list_apps handles HTTP errors properly."""
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = requests.HTTPError("API Error")
-        mock_get.return_value = mock_response
+        self.mock_http.get.return_value = mock_response
         
         with pytest.raises(requests.HTTPError):
             self.service.list_apps()
 
-    @patch('requests.get')
-    def test_get_app_info_success(self, mock_get):
+    def test_get_app_info_success(self):
         """Test successful app info retrieval."""
         bundle_id = "com.example.testapp"
         expected_response = {
@@ -66,37 +65,36 @@ class TestAppInfoService:
         
         mock_response = Mock()
         mock_response.json.return_value = expected_response
-        mock_get.return_value = mock_response
+        self.mock_http.get.return_value = mock_response
         
         result = self.service.get_app_info(bundle_id)
         
-        mock_get.assert_called_once_with(
+        self.mock_http.get.assert_called_once_with(
             f"https://api.appstoreconnect.apple.com/v1/apps?filter[bundleId]={bundle_id}",
             headers={"Authorization": "Bearer test_token"},
+            params={"fields[apps]": "name,bundleId,sku,primaryLocale"},
             timeout=REQUEST_TIMEOUT
         )
         assert result == expected_response["data"][0]
 
-    @patch('requests.get')
-    def test_get_app_info_not_found(self, mock_get):
+    def test_get_app_info_not_found(self):
         """Test get_app_info when app is not found."""
         bundle_id = "com.example.nonexistent"
         expected_response = {"data": []}
         
         mock_response = Mock()
         mock_response.json.return_value = expected_response
-        mock_get.return_value = mock_response
+        self.mock_http.get.return_value = mock_response
         
         result = self.service.get_app_info(bundle_id)
         
         assert result == {"error": "App not found"}
 
-    @patch('requests.get')
-    def test_get_app_info_http_error(self, mock_get):
+    def test_get_app_info_http_error(self):
         """Test get_app_info handles HTTP errors properly."""
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = requests.HTTPError("API Error")
-        mock_get.return_value = mock_response
+        self.mock_http.get.return_value = mock_response
         
         with pytest.raises(requests.HTTPError):
             self.service.get_app_info("com.example.test")
@@ -0,0 +1,185 @@
+"""Unit tests for AppStore class."""
+import threading
+import time
+from unittest.mock import Mock, patch
+import pytest
+import requests
+from appstore_service.app_store import AppStore
+from appstore_service.cancellation import cancellation_scope, is_cancelled
+from appstore_service.perf_metrics import MetricColumns
+
+
+@pytest.fixture(name="app_store")
+def fixture_app_store():
+    """An AppStore whose services and indexes are mocks."""
+    with patch("appstore_service.app_store.config.APP_ID_INDEX_PATH", None), \
+            patch("appstore_service.app_store.config.METRICS_STORE_PATH", None), \
+            patch("appstore_service.app_store.config.REVIEW_STORE_PATH", None):
+        store = AppStore()
+    store.app_index = Mock()
+    store.app_index.get.return_value = "app-1"
+    store.build_index = Mock()
+    store.version_service = Mock()
+    yield store
+    store.lookup_executor.shutdown(wait=True)
+
+
+def version(state):
+    """An appStoreVersions resource for version 1.2.3 in ``state``."""
+    return {"type": "appStoreVersions", "id": "v1",
+            "attributes": {"versionString": "1.2.3", "appStoreState": state}}
+
+
+class TestReleaseVersion:
+    """Test cases for AppStore.release_version."""
+
+    def test_submits_with_filtered_version_lookup(self, app_store):
+        """Test the happy path and that the version is looked up by filter."""
+        app_store.build_index.get.return_value = "build-9"
+        app_store.version_service.get_version.return_value = {
+            "data": [version("PREPARE_FOR_SUBMISSION")]}
+        app_store.version_service.submit_for_review.return_value = {"data": {"id": "s1"}}
+
+        result = app_store.release_version("com.example", "1.2.3", "42")
+
+        app_store.build_index.get.assert_called_once_with("app-1", "1.2.3", "42")
+        app_store.version_service.get_version.assert_called_once_with("app-1", "1.2.3")
+        app_store.version_service.associate_build_to_version.assert_called_once_with(
+            "v1", "build-9")
+        assert result["data"] == {"id": "s1"}
+        assert set(result["timings_ms"]) == {
+            "app_id", "build_lookup", "version_lookup", "lookups", "action", "total"}
+
+    def test_lookups_run_concurrently(self, app_store):
+        """Test that the build and version lookups overlap."""
+        both_started = threading.Barrier(2, timeout=5)
+
+        def find_build(*_args):
+            both_started.wait()
+            return "build-9"
+
+        def get_version(*_args):
+            both_started.wait()
+            return {"data": [version("READY_FOR_SALE")]}
+
+        app_store.build_index.get.side_effect = find_build
+        app_store.version_service.get_version.side_effect = get_version
+
+        result = app_store.release_version("com.example", "1.2.3", "42")
+
+        assert result["status"].startswith("Version is already 'READY_FOR_SALE'")
+
+    def test_build_lookup_sees_cancellation_scope(self, app_store):
+        """Test that the worker thread inherits the caller's cancellation scope."""
+        event = threading.Event()
+        seen = []
+
+        def find_build(*_args):
+            event.set()
+            seen.append(is_cancelled())
+            return None
+
+        app_store.build_index.get.side_effect = find_build
+        app_store.version_service.get_version.return_value = {
+            "data": [version("PREPARE_FOR_SUBMISSION")]}
+
+        with cancellation_scope(event):
+            result = app_store.release_version("com.example", "1.2.3", "42")
+
+        assert seen == [True]
+        assert result["error"].startswith("Could not find build")
+
+    def test_missing_version(self, app_store):
+        """Test that a version the filter does not return is reported."""
+        app_store.build_index.get.return_value = "build-9"
+        app_store.version_service.get_version.return_value = {"data": []}
+
+        result = app_store.release_version("com.example", "1.2.3", "42")
+
+        assert result["error"] == (
+            "Version 1.2.3 not found. Please create it on App Store Connect first.")
+
+    def test_missing_version_cancels_build_lookup(self, app_store):
+        """Test that the build lookup is cancelled, not awaited, without a version."""
+        app_store.version_service.get_version.return_value = {"data": []}
+
+        with patch("appstore_service.app_store.submit_in_context") as mock_submit:
+            result = app_store.release_version("com.example", "1.2.3", "42")
+
+        mock_submit.return_value.cancel.assert_called_once()
+        mock_submit.return_value.result.assert_not_called()
+        assert result["error"].startswith("Version 1.2.3 not found")
+
+    def test_missing_version_stops_running_build_lookup(self, app_store):
+        """Test that a build lookup already running sees its scope cancelled."""
+        started, stopped = threading.Event(), threading.Event()
+
+        def find_build(*_args):
+            started.set()
+            while not is_cancelled():
+                time.sleep(0.01)
+            stopped.set()
+
+        def get_version(*_args):
+            started.wait(5)
+            return {"data": []}
+
+        app_store.build_index.get.side_effect = find_build
+        app_store.version_service.get_version.side_effect = get_version
+
+        result = app_store.release_version("com.example", "1.2.3", "42")
+
+        assert result["error"].startswith("Version 1.2.3 not found")
+        assert stopped.wait(5)
+
+    def test_failed_version_lookup_cancels_build_lookup(self, app_store):
+        """Test that the build lookup is cancelled when the version lookup raises."""
+        app_store.version_service.get_version.side_effect = (
+            requests.exceptions.HTTPError("500 Server Error"))
+
+        with patch("appstore_service.app_store.submit_in_context") as mock_submit:
+            app_store.release_version("com.example", "1.2.3", "42")
+
+        mock_submit.return_value.cancel.assert_called_once()
+        mock_submit.return_value.result.assert_not_called()
+
+
+class TestPerformanceRegressions:
+    """Test cases for AppStore.detect_performance_regressions."""
+
+    def test_metrics_are_fetched_only_while_history_is_empty(self, app_store):
+        """Test that stored history answers later checks without a request."""
+        app_store.performance_service = Mock()
+        app_store.performance_service.get_metric_columns.return_value = MetricColumns({
+            "productData": [{"platform": "iOS", "metricCategories": [{
+                "identifier": "LAUNCH", "metrics": [{
+                    "identifier": "launchTime", "datasets": [{
+                        "filterCriteria": {"device": "all_iPhones",
+                                           "percentile": "percentile.fifty"},
+                        "points": [{"version": "3.3", "value": 400.0},
+                                   {"version": "3.4", "value": 500.0}]}]}]}]}]})
+
+        first = app_store.detect_performance_regressions("com.example")
+        second = app_store.detect_performance_regressions("com.example", baseline="3.3")
+
+        app_store.performance_service.get_metric_columns.assert_called_once_with(
+            "app-1", None)
+        assert first == second
+        assert first["regressions"][0]["metric"] == "launchTime"
+        assert first["bundleId"] == "com.example"
+
+
+class TestCustomerReviews:
+    """Test cases for the AppStore customer review tools."""
+
+    def test_reviews_are_synced_only_while_none_are_stored(self, app_store):
+        """Test that search and histograms read the local index after the first sync."""
+        app_store.review_store = Mock()
+        app_store.review_store.has_reviews.side_effect = [False, True]
+        app_store.review_store.search.return_value = []
+
+        app_store.search_customer_reviews("com.example", "crash")
+        app_store.get_review_rating_histogram("com.example", "territory")
+
+        app_store.review_store.sync.assert_called_once_with("app-1")
+        app_store.review_store.histogram.assert_called_once_with("app-1", "territory")
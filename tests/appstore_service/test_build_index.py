@@ -0,0 +1,123 @@
+"""Unit tests for build_index module."""
+from unittest.mock import Mock
+import pytest
+import requests
+from appstore_service.build_index import BuildIndex, builds_in_page
+
+
+def make_page(*builds):
+    """Build a /v1/builds page from (build_id, build_number, marketing_version) tuples."""
+    return {
+        "data": [{
+            "type": "builds",
+            "id": build_id,
+            "attributes": {"version": build_number},
+            "relationships": {"preReleaseVersion": {
+                "data": {"type": "preReleaseVersions", "id": f"p-{marketing}"}}},
+        } for build_id, build_number, marketing in builds],
+        "included": [{
+            "type": "preReleaseVersions",
+            "id": f"p-{marketing}",
+            "attributes": {"version": marketing},
+        } for marketing in {marketing for _, _, marketing in builds}],
+    }
+
+
+def test_builds_in_page_skips_unlinked_builds():
+    """Test that builds without an included pre-release version are skipped."""
+    page = make_page(("b1", "10", "1.0"))
+    page["data"].append({"type": "builds", "id": "b2", "attributes": {"version": "11"}})
+
+    assert list(builds_in_page(page)) == [("1.0", "10", "b1")]
+
+
+class TestBuildIndex:
+    """Test cases for BuildIndex class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.build_service = Mock()
+        self.index = BuildIndex(self.build_service)
+
+    def test_filtered_lookup(self):
+        """Test that the server-filtered request is tried first."""
+        self.build_service.find_builds.return_value = make_page(("b1", "10", "1.0"))
+
+        assert self.index.get("app", "1.0", "10") == "b1"
+        self.build_service.find_builds.assert_called_once_with("app", "1.0", "10")
+        self.build_service.iter_builds.assert_not_called()
+
+    def test_repeat_lookup_is_served_from_memory(self):
+        """Test that a known build does not cost another request."""
+        self.build_service.find_builds.return_value = make_page(("b1", "10", "1.0"))
+        self.index.get("app", "1.0", "10")
+
+        assert self.index.get("app", "1.0", "10") == "b1"
+        assert self.build_service.find_builds.call_count == 1
+        assert self.index.stats()["hits"] == 1
+
+    def test_scan_fallback_stops_at_match_and_indexes_every_build(self):
+        """Test the paginated fallback when the filter is rejected."""
+        self.build_service.find_builds.side_effect = requests.exceptions.HTTPError(
+            response=Mock(status_code=400))
+        pages = [make_page(("b3", "12", "1.1"), ("b2", "11", "1.0")),
+                 make_page(("b1", "10", "1.0")),
+                 make_page(("b0", "9", "0.9"))]
+        consumed = []
+
+        def pages_gen():
+            for page in pages:
+                consumed.append(page)
+                yield page
+        self.build_service.iter_builds.return_value.pages.side_effect = pages_gen
+
+        assert self.index.get("app", "1.0", "10") == "b1"
+        assert len(consumed) == 2
+        assert self.index.get("app", "1.1", "12") == "b3"
+        assert self.build_service.find_builds.call_count == 1
+
+    def test_missing_build_is_not_scanned_for(self):
+        """Test that an empty filtered result sends no iter_builds request."""
+        self.build_service.find_builds.return_value = {"data": []}
+
+        assert self.index.get("app", "2.0", "20") is None
+        self.build_service.iter_builds.assert_not_called()
+        assert self.index.stats()["scans"] == 0
+
+    def test_missing_build_is_remembered(self):
+        """Test that a miss is answered from memory until the negative TTL expires."""
+        self.build_service.find_builds.return_value = {"data": []}
+        self.index.get("app", "2.0", "20")
+
+        assert self.index.get("app", "2.0", "20") is None
+        assert self.build_service.find_builds.call_count == 1
+
+        self.index.negative_ttl = 0
+        self.index.get("app", "2.1", "21")
+        self.index.get("app", "2.1", "21")
+        assert self.build_service.find_builds.call_count == 3
+
+    def test_rejected_filter_falls_back_to_scan(self):
+        """Test that a 400 from the filtered request falls back to paging."""
+        self.build_service.find_builds.side_effect = requests.exceptions.HTTPError(
+            response=Mock(status_code=400))
+        self.build_service.iter_builds.return_value.pages.return_value = iter(
+            [make_page(("b1", "10", "1.0"))])
+
+        assert self.index.get("app", "1.0", "10") == "b1"
+
+    def test_other_errors_propagate(self):
+        """Test that errors other than a rejected filter are raised."""
+        self.build_service.find_builds.side_effect = requests.exceptions.HTTPError(
+            response=Mock(status_code=401))
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            self.index.get("app", "1.0", "10")
+
+    def test_index_is_per_app(self):
+        """Test that builds of one app do not answer lookups for another."""
+        self.index.add_page("app-a", make_page(("b1", "10", "1.0")))
+        self.build_service.find_builds.return_value = {"data": []}
+        self.build_service.iter_builds.return_value.pages.return_value = iter([])
+
+        assert self.index.get("app-b", "1.0", "10") is None
@@ -0,0 +1,128 @@
+"""Unit tests for diagnostics and diagnostics_service modules."""
+import io
+import threading
+from unittest.mock import Mock
+import pytest
+import requests
+from appstore_service.cancellation import RequestCancelled
+from appstore_service.diagnostics import DiagnosticsReport
+from appstore_service.diagnostics_service import DiagnosticsService
+
+
+def builds_page(*builds):
+    """A builds page with (build id, version, build number) tuples and their versions."""
+    return {
+        "data": [{"id": build_id, "attributes": {"version": number},
+                  "relationships": {"preReleaseVersion": {"data": {"id": f"v{version}"}}}}
+                 for build_id, version, number in builds],
+        "included": [{"type": "preReleaseVersions", "id": f"v{version}",
+                      "attributes": {"version": version}}
+                     for _, version, _ in builds],
+    }
+
+
+def signature(signature_id, diagnostic_type, name, weight):
+    """A diagnosticSignatures resource."""
+    return {"type": "diagnosticSignatures", "id": signature_id, "attributes": {
+        "diagnosticType": diagnostic_type, "signature": name, "weight": weight}}
+
+
+SIGNATURES = {
+    "b1": [signature("s1", "HANGS", "main.render", 0.5),
+           signature("s2", "HANGS", "db.query", 0.5),
+           signature("s3", "DISK_WRITES", "cache.flush", 1.0)],
+    "b2": [signature("s4", "HANGS", "main.render", 0.75),
+           signature("s5", "HANGS", "net.sync", 0.25)],
+}
+
+
+@pytest.fixture(name="report")
+def fixture_report():
+    """A report over two builds whose signatures are fetched at the same time."""
+    build_service = Mock()
+    build_service.iter_builds.return_value.pages.return_value = [
+        builds_page(("b1", "2.0", "10"), ("b2", "2.1", "11"))]
+    diagnostics_service = Mock()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def iter_signatures(build_id, _types):
+        # Both builds must be in flight before either returns.
+        barrier.wait()
+        return iter(SIGNATURES[build_id])
+
+    diagnostics_service.iter_signatures.side_effect = iter_signatures
+    return DiagnosticsReport(build_service, diagnostics_service, max_workers=2)
+
+
+class TestDiagnosticsReport:
+    """Test cases for DiagnosticsReport class."""
+
+    def test_signatures_are_ranked_across_builds(self, report):
+        """Test that weights are averaged over builds and ranked per type."""
+        result = report.top_signatures("app1", last_builds=2, limit=2)
+
+        assert result["builds"] == ["2.0 (10)", "2.1 (11)"]
+        hangs = result["signatures"]["HANGS"]
+        assert [(entry["signature"], entry["weight"]) for entry in hangs] == [
+            ("main.render", 0.625), ("db.query", 0.25)]
+        assert hangs[0]["buildCount"] == 2
+        assert [build["signatureId"] for build in hangs[0]["builds"]] == ["s4", "s1"]
+        assert result["signatures"]["DISK_WRITES"][0]["weight"] == 0.5
+
+    @pytest.mark.parametrize("error", [requests.exceptions.HTTPError("404"),
+                                       requests.exceptions.Timeout("timed out")])
+    def test_failed_build_is_reported_and_excluded(self, report, error):
+        """Test that one build's error does not fail the report."""
+        def iter_signatures(build_id, _types):
+            if build_id == "b2":
+                raise error
+            return iter(SIGNATURES[build_id])
+
+        report.diagnostics_service.iter_signatures.side_effect = iter_signatures
+
+        result = report.top_signatures("app1", last_builds=2)
+
+        assert list(result["errors"]) == ["b2"]
+        assert result["signatures"]["HANGS"][0]["weight"] == 0.5
+
+    def test_logs_are_streamed_to_files(self, report, tmp_path):
+        """Test that each log is written to its own file and unsafe IDs are refused."""
+        def stream_logs(signature_id, out):
+            out.write(b'{"logs": "' + signature_id.encode() + b'"}')
+            return 16
+
+        report.diagnostics_service.stream_logs.side_effect = stream_logs
+
+        results = report.download_logs(["s1", "../s2"], str(tmp_path))
+
+        assert results[0]["bytes"] == 16
+        assert (tmp_path / "s1.json").read_bytes() == b'{"logs": "s1"}'
+        assert results[1] == {"signatureId": "../s2", "error": "Invalid signature ID"}
+        assert not list(tmp_path.glob("*.part"))
+
+    def test_cancelled_download_removes_partial_file(self, report, tmp_path):
+        """Test that a download cancelled mid-stream leaves no partial file."""
+        def stream_logs(_signature_id, out):
+            out.write(b'{"logs"')
+            raise RequestCancelled()
+
+        report.diagnostics_service.stream_logs.side_effect = stream_logs
+
+        with pytest.raises(RequestCancelled):
+            report.download_logs(["s1"], str(tmp_path))
+
+        assert not list(tmp_path.iterdir())
+
+
+def test_stream_logs_copies_chunks():
+    """Test that the log body is copied chunk by chunk from a streamed response."""
+    http = Mock()
+    response = http.get.return_value
+    response.iter_content.return_value = iter([b"abc", b"de"])
+    service = DiagnosticsService(Mock(base_url="https://example.com/v1", headers={}), http)
+    out = io.BytesIO()
+
+    assert service.stream_logs("s1", out) == 5
+    assert out.getvalue() == b"abcde"
+    assert http.get.call_args.kwargs["stream"] is True
+    response.close.assert_called_once()
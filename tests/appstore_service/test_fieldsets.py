@@ -0,0 +1,45 @@
+"""Unit tests for fieldsets module."""
+from unittest.mock import patch
+from appstore_service.fieldsets import DEFAULT_FIELDS, query_params
+
+
+class TestQueryParams:
+    """Test cases for query_params function."""
+
+    def test_defaults(self):
+        """Test that the default fieldset is requested for the primary type."""
+        assert query_params("apps") == {
+            "fields[apps]": ",".join(DEFAULT_FIELDS["apps"])}
+
+    def test_default_include_adds_relationship_and_included_fields(self):
+        """Test that included resources get a fieldset and stay linked."""
+        params = query_params("builds", default_include=("preReleaseVersion",))
+
+        assert params["include"] == "preReleaseVersion"
+        assert params["fields[builds]"].split(",")[-1] == "preReleaseVersion"
+        assert params["fields[preReleaseVersions]"] == "version,platform"
+
+    def test_fields_override_defaults(self):
+        """Test that caller fields replace the defaults for their type only."""
+        params = query_params(
+            "builds", {"builds": ("version",)}, default_include=("preReleaseVersion",))
+
+        assert params["fields[builds]"] == "version,preReleaseVersion"
+        assert params["fields[preReleaseVersions]"] == "version,platform"
+
+    def test_none_requests_every_attribute(self):
+        """Test that a None fieldset drops the fields parameter for that type."""
+        assert query_params("apps", {"apps": None}) == {}
+
+    def test_empty_include_overrides_default(self):
+        """Test that include=() turns off the default include."""
+        params = query_params("builds", include=(), default_include=("preReleaseVersion",))
+
+        assert "include" not in params
+        assert "fields[preReleaseVersions]" not in params
+
+    def test_disabled(self):
+        """Test that SPARSE_FIELDSETS = False keeps only the include parameter."""
+        with patch("appstore_service.fieldsets.config.SPARSE_FIELDSETS", False):
+            assert query_params("builds", include=("preReleaseVersion",)) == {
+                "include": "preReleaseVersion"}
@@ -0,0 +1,202 @@
+"""Unit tests for appstore_service.http_client module."""
+import threading
+from unittest.mock import Mock, patch
+import pytest
+from appstore_service.api_auth import CredentialPool
+from appstore_service.cancellation import RequestCancelled, cancellation_scope
+from appstore_service.http_client import HttpClient, REQUEST_TIMEOUT
+
+
+def make_response(status_code, headers=None):
+    """Build a mock response with the given status and headers."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = b"{}"
+    return response
+
+
+class TestHttpClient:
+    """Test cases for HttpClient class."""
+
+    def test_init_mounts_pooled_adapter(self):
+        """Test that the session uses an adapter with the configured pool sizes."""
+        client = HttpClient(pool_connections=2, pool_maxsize=7, pool_block=False)
+
+        adapter = client.session.get_adapter("https://api.appstoreconnect.apple.com")
+
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 7
+        assert adapter._pool_block is False
+
+    @patch('appstore_service.http_client.config')
+    def test_init_defaults_from_config(self, mock_config):
+        """Test that pool settings default to the config values."""
+        mock_config.HTTP_POOL_CONNECTIONS = 3
+        mock_config.HTTP_POOL_MAXSIZE = 5
+        mock_config.HTTP_POOL_BLOCK = True
+
+        client = HttpClient()
+
+        assert client.pool_connections == 3
+        assert client.pool_maxsize == 5
+        assert client.pool_block is True
+
+    def test_requests_share_one_session(self):
+        """Test that every verb goes through the same pooled session."""
+        client = HttpClient()
+
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = make_response(200)
+            client.get("https://example.com/a")
+            client.post("https://example.com/b", json={})
+            client.delete("https://example.com/c", timeout=5)
+
+        assert [call.args for call in mock_request.call_args_list] == [
+            ("GET", "https://example.com/a"),
+            ("POST", "https://example.com/b"),
+            ("DELETE", "https://example.com/c"),
+        ]
+        assert mock_request.call_args_list[0].kwargs["timeout"] == REQUEST_TIMEOUT
+        assert mock_request.call_args_list[2].kwargs["timeout"] == 5
+
+    def test_cancelled_call_sends_nothing(self):
+        """Test that no request is sent once the current call is cancelled."""
+        client = HttpClient()
+        cancel_event = threading.Event()
+        cancel_event.set()
+
+        with patch.object(client.session, 'request') as mock_request:
+            with cancellation_scope(cancel_event):
+                with pytest.raises(RequestCancelled):
+                    client.get("https://example.com/a")
+
+        mock_request.assert_not_called()
+
+    @patch('appstore_service.http_client.wait')
+    def test_retries_rate_limited_request(self, mock_wait):
+        """Test that a 429 is retried after the Retry-After delay."""
+        client = HttpClient()
+
+        rate_limiter = client.rate_limiter_for("")
+
+        with patch.object(client.session, 'request') as mock_request, \
+                patch('appstore_service.rate_limit.wait') as mock_limiter_wait:
+            # The 429 pauses the key's bucket; end the pause instead of sleeping.
+            mock_limiter_wait.side_effect = lambda seconds: setattr(
+                rate_limiter, '_paused_until', 0.0)
+            rate_limited = make_response(429, {"Retry-After": "3"})
+            mock_request.side_effect = [
+                rate_limited,
+                make_response(200, {"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:42;"}),
+            ]
+            response = client.post("https://example.com/a", json={})
+
+        assert response.status_code == 200
+        assert mock_request.call_count == 2
+        mock_wait.assert_called_once_with(3.0)
+        rate_limited.close.assert_called_once_with()
+        response.close.assert_not_called()
+        assert client.rate_limit_status()[""]["remaining"] == 42
+
+    @patch('appstore_service.http_client.wait')
+    def test_server_error_not_retried_for_post(self, mock_wait):
+        """Test that a 5xx on a non-idempotent request is returned as-is."""
+        client = HttpClient()
+
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = make_response(503)
+            response = client.post("https://example.com/a", json={})
+
+        assert response.status_code == 503
+        assert mock_request.call_count == 1
+        mock_wait.assert_not_called()
+
+    def test_get_served_from_cache_until_write(self):
+        """Test that a repeated GET is cached and a related write invalidates it."""
+        client = HttpClient()
+        url = "https://api.appstoreconnect.apple.com/v1/betaGroups"
+        headers = {"Authorization": "Bearer test_token"}
+
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = make_response(200)
+            client.get(url, headers=headers, params={"filter[app]": "1"})
+            client.get(url, headers=headers, params={"filter[app]": "1"})
+            assert mock_request.call_count == 1
+
+            client.post(
+                "https://api.appstoreconnect.apple.com/v1/betaTesters",
+                headers=headers, json={})
+            client.get(url, headers=headers, params={"filter[app]": "1"})
+
+        assert mock_request.call_count == 3
+        stats = client.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["invalidations"] == 1
+
+    def test_get_racing_a_write_is_not_cached(self):
+        """Test that a GET in flight while a related write lands is not cached."""
+        client = HttpClient()
+        url = "https://api.appstoreconnect.apple.com/v1/betaGroups"
+
+        def request(method, _url, **_kwargs):
+            if method == "GET" and mock_request.call_count == 1:
+                # The write completes while the first GET is still in flight.
+                client.post("https://api.appstoreconnect.apple.com/v1/betaTesters", json={})
+            return make_response(200)
+
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.side_effect = request
+            client.get(url)
+            client.get(url)
+
+        assert [call.args[0] for call in mock_request.call_args_list] == [
+            "GET", "POST", "GET"]
+
+    def test_cache_bypass(self):
+        """Test that cache=False always goes upstream."""
+        client = HttpClient()
+        url = "https://api.appstoreconnect.apple.com/v1/builds"
+
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = make_response(200)
+            client.get(url)
+            client.get(url, cache=False)
+
+        assert mock_request.call_count == 2
+
+    def test_pooled_reads_share_cache_across_keys(self):
+        """Test that repeated reads through a key pool hit the cache and use one key."""
+        keys = [Mock(key_id=key_id, issuer_id="issuer", base_url="https://example.com",
+                     headers={"Authorization": f"Bearer {key_id}"}) for key_id in "AB"]
+        pool = CredentialPool(keys, selection="least_used")
+        client = HttpClient()
+        url = "https://api.appstoreconnect.apple.com/v1/apps"
+
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = make_response(200)
+            for _ in range(3):
+                client.get(url, headers=pool.headers)
+
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.kwargs["headers"]["Authorization"] == "Bearer A"
+        assert pool.usage() == {"A": 1, "B": 0}
+
+    def test_rate_limits_tracked_per_key(self):
+        """Test that each signing key gets its own quota tracking."""
+        client = HttpClient()
+        url = "https://api.appstoreconnect.apple.com/v1/apps"
+
+        with patch.object(client.session, 'request') as mock_request, \
+                patch('appstore_service.http_client.request_identity',
+                      side_effect=lambda headers: headers["Authorization"]):
+            mock_request.side_effect = [
+                make_response(200, {"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:10;"}),
+                make_response(200, {"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:900;"}),
+            ]
+            client.get(url, headers={"Authorization": "KEY_A"})
+            client.get(url, headers={"Authorization": "KEY_B"})
+
+        assert client.remaining_budget("KEY_A") == 10
+        assert client.remaining_budget("KEY_B") == 900
+        assert client.remaining_budget("KEY_C") is None
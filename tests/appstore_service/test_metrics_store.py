@@ -0,0 +1,79 @@
+"""Unit tests for metrics_store module."""
+import pytest
+from appstore_service.metrics_store import MetricsStore
+from appstore_service.perf_metrics import MetricColumns
+
+
+def document(points, margin=0.01):
+    """A perfPowerMetrics document with launchTime and hangRate points per version."""
+    def metric(identifier, values):
+        return {"identifier": identifier, "unit": {"identifier": "ms"}, "datasets": [{
+            "filterCriteria": {"device": "all_iPhones", "percentile": "percentile.fifty"},
+            "points": [{"version": version, "value": value, "errorMargin": margin}
+                       for version, value in values.items()]}]}
+    return {"productData": [{"platform": "iOS", "metricCategories": [
+        {"identifier": "LAUNCH", "metrics": [metric("launchTime", points["launchTime"])]},
+        {"identifier": "HANG", "metrics": [metric("hangRate", points["hangRate"])]},
+    ]}]}
+
+
+@pytest.fixture(name="store")
+def fixture_store(tmp_path):
+    """A store on disk holding metrics for versions 3.3 and 3.4."""
+    store = MetricsStore(str(tmp_path / "metrics.sqlite3"))
+    store.record("app1", MetricColumns(document({
+        "launchTime": {"3.3": 400.0, "3.4": 480.0},
+        "hangRate": {"3.3": 1.0, "3.4": 1.01},
+    }, margin=10.0)))
+    yield store
+    store.close()
+
+
+class TestMetricsStore:
+    """Test cases for MetricsStore class."""
+
+    def test_snapshots_are_deduplicated(self, store):
+        """Test that recording the same points again does not add rows."""
+        store.record("app1", MetricColumns(document({
+            "launchTime": {"3.4": 470.0, "3.5": 300.0}, "hangRate": {}})))
+
+        assert store.stats()["points"] == 5
+        assert store.versions("app1") == ["3.3", "3.4", "3.5"]
+        assert [point["value"] for point in store.history("app1", "launchTime")] == [
+            400.0, 470.0, 300.0]
+
+    def test_newest_version_is_compared_with_the_previous_one(self, store):
+        """Test that a large launch time increase is flagged and noise is not."""
+        result = store.regressions("app1")
+
+        assert (result["version"], result["baseline"]) == ("3.4", "3.3")
+        assert [entry["metric"] for entry in result["regressions"]] == ["launchTime"]
+        regression = result["regressions"][0]
+        assert regression["change"] == 80.0
+        assert regression["changePercent"] == 20.0
+        assert regression["zScore"] > 1.96
+        assert [entry["metric"] for entry in result["unchanged"]] == ["hangRate"]
+
+    def test_change_within_error_margin_is_not_significant(self, tmp_path):
+        """Test that a change smaller than the combined error margins is not flagged."""
+        store = MetricsStore(str(tmp_path / "metrics.sqlite3"))
+        store.record("app1", MetricColumns(document({
+            "launchTime": {"1.0": 400.0, "1.1": 440.0}, "hangRate": {}}, margin=40.0)))
+
+        result = store.regressions("app1", version="1.1", baseline="1.0")
+
+        assert result["regressions"] == []
+        assert result["unchanged"][0]["changePercent"] == 10.0
+
+    def test_improvements(self, store):
+        """Test that a significant decrease is reported as an improvement."""
+        result = store.regressions("app1", version="3.3", baseline="3.4")
+
+        assert [entry["metric"] for entry in result["improvements"]] == ["launchTime"]
+
+    def test_history_survives_reopening(self, store):
+        """Test that stored points are read back by a new store on the same file."""
+        reopened = MetricsStore(store.path)
+
+        assert reopened.versions("app1") == ["3.3", "3.4"]
+        assert reopened.regressions("app2")["baseline"] is None
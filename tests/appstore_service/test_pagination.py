@@ -0,0 +1,108 @@
+"""Unit tests for appstore_service.pagination module."""
+from unittest.mock import Mock, patch
+from appstore_service.pagination import Paginator, MAX_PAGE_LIMIT
+
+BASE_URL = "https://api.appstoreconnect.apple.com/v1"
+
+
+def make_response(data, next_url=None, included=None, total=None):
+    """Build a mock response holding one JSON:API page."""
+    page = {"data": data, "links": {}}
+    if next_url:
+        page["links"]["next"] = next_url
+    if included is not None:
+        page["included"] = included
+    if total is not None:
+        page["meta"] = {"paging": {"total": total, "limit": MAX_PAGE_LIMIT}}
+    response = Mock()
+    response.json.return_value = page
+    return response
+
+
+class TestPaginator:
+    """Test cases for Paginator class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_auth = Mock()
+        self.mock_auth.headers = {"Authorization": "Bearer test_token"}
+        self.mock_http = Mock()
+
+    def test_follows_next_links(self):
+        """Test that every page is fetched and the cursor link is used as-is."""
+        self.mock_http.get.side_effect = [
+            make_response([{"id": "1"}, {"id": "2"}], f"{BASE_URL}/apps?cursor=a"),
+            make_response([{"id": "3"}]),
+        ]
+
+        paginator = Paginator(self.mock_http, self.mock_auth, f"{BASE_URL}/apps")
+        ids = [item["id"] for item in paginator]
+
+        assert ids == ["1", "2", "3"]
+        first, second = self.mock_http.get.call_args_list
+        assert first.kwargs["params"] == {"limit": MAX_PAGE_LIMIT}
+        assert second.args == (f"{BASE_URL}/apps?cursor=a",)
+        assert second.kwargs["params"] is None
+        assert paginator.pages_fetched == 2
+        assert paginator.truncated is False
+
+    def test_pages_are_fetched_lazily(self):
+        """Test that stopping early does not download the remaining pages."""
+        self.mock_http.get.side_effect = [
+            make_response([{"id": "1"}], f"{BASE_URL}/apps?cursor=a"),
+            make_response([{"id": "2"}]),
+        ]
+
+        paginator = Paginator(self.mock_http, self.mock_auth, f"{BASE_URL}/apps")
+        first = next(iter(paginator))
+
+        assert first == {"id": "1"}
+        assert self.mock_http.get.call_count == 1
+
+    def test_max_items_caps_results(self):
+        """Test that max_items trims the last page and stops paging."""
+        self.mock_http.get.side_effect = [
+            make_response([{"id": "1"}, {"id": "2"}], f"{BASE_URL}/apps?cursor=a"),
+            make_response([{"id": "3"}, {"id": "4"}], f"{BASE_URL}/apps?cursor=b"),
+        ]
+
+        paginator = Paginator(
+            self.mock_http, self.mock_auth, f"{BASE_URL}/apps", max_items=3)
+        ids = [item["id"] for item in paginator]
+
+        assert ids == ["1", "2", "3"]
+        assert self.mock_http.get.call_args_list[0].kwargs["params"] == {"limit": 3}
+        assert self.mock_http.get.call_count == 2
+        assert paginator.truncated is True
+
+    @patch('appstore_service.pagination.time.monotonic')
+    def test_max_seconds_stops_paging(self, mock_monotonic):
+        """Test that the time budget stops further page requests."""
+        mock_monotonic.side_effect = [100.0, 106.0]
+        self.mock_http.get.side_effect = [
+            make_response([{"id": "1"}], f"{BASE_URL}/apps?cursor=a"),
+        ]
+
+        paginator = Paginator(
+            self.mock_http, self.mock_auth, f"{BASE_URL}/apps", max_seconds=5)
+        ids = [item["id"] for item in paginator]
+
+        assert ids == ["1"]
+        assert paginator.truncated is True
+
+    def test_collect_merges_pages_and_dedupes_included(self):
+        """Test that collect builds one document with unique included resources."""
+        shared = {"type": "preReleaseVersions", "id": "p1"}
+        self.mock_http.get.side_effect = [
+            make_response([{"id": "1"}], f"{BASE_URL}/builds?cursor=a",
+                          included=[shared], total=2),
+            make_response([{"id": "2"}], included=[shared], total=2),
+        ]
+
+        document = Paginator(
+            self.mock_http, self.mock_auth, f"{BASE_URL}/builds").collect()
+
+        assert document["data"] == [{"id": "1"}, {"id": "2"}]
+        assert document["included"] == [shared]
+        assert document["meta"] == {
+            "paging": {"total": 2, "fetched": 2}, "truncated": False}
@@ -0,0 +1,93 @@
+"""Unit tests for perf_metrics module."""
+from unittest.mock import Mock
+import pytest
+from appstore_service.perf_metrics import MetricColumns
+from appstore_service.performance_service import PerformanceService
+
+
+def dataset(device, percentile, points):
+    """A dataset of (version, value) points for one device and percentile."""
+    return {"filterCriteria": {"device": device, "percentile": percentile},
+            "points": [{"version": version, "value": value, "errorMargin": 0.01}
+                       for version, value in points]}
+
+
+def metric(identifier, unit, *datasets):
+    """A metric with its unit and datasets."""
+    return {"identifier": identifier, "unit": {"identifier": unit},
+            "datasets": list(datasets)}
+
+
+DOCUMENT = {"productData": [{"platform": "iOS", "metricCategories": [
+    {"identifier": "LAUNCH", "metrics": [metric(
+        "launchTime", "ms",
+        dataset("all_iPhones", "percentile.fifty",
+                [("1.9", 400.0), ("1.10", 500.0), ("1.8", 400.0)]),
+        dataset("all_iPhones", "percentile.ninety", [("1.10", 900.0)]),
+        dataset("all_iPads", "percentile.fifty", [("1.10", 300.0)]))]},
+    {"identifier": "HANG", "metrics": [metric(
+        "hangRate", "s/hr",
+        dataset("all_iPhones", "percentile.fifty", [("1.9", 0.5), ("1.10", 0.25)]))]},
+    {"identifier": "DISK", "metrics": [metric(
+        "diskWrites", "MB",
+        dataset("all_iPhones", "percentile.fifty", [("1.10", 10.0)]))]},
+]}]}
+
+
+class TestMetricColumns:
+    """Test cases for MetricColumns class."""
+
+    def test_points_become_columns(self):
+        """Test that every point becomes one row."""
+        columns = MetricColumns(DOCUMENT)
+
+        assert len(columns) == 8
+        assert columns.metric_names == ["launchTime", "hangRate", "diskWrites"]
+        assert columns.units["hangRate"] == "s/hr"
+        assert columns.value.dtype.kind == "f"
+
+    def test_summary_orders_versions_and_computes_deltas(self):
+        """Test values, deltas and relative deltas per metric."""
+        summary = MetricColumns(DOCUMENT).summarize()
+
+        assert summary["versions"] == ["1.8", "1.9", "1.10"]
+        assert set(summary["metrics"]) == {"launchTime", "hangRate"}
+        launch = summary["metrics"]["launchTime"]
+        assert launch["values"] == [400.0, 400.0, 500.0]
+        assert launch["deltas"] == [0.0, 100.0]
+        assert launch["deltaPercent"] == [0.0, 25.0]
+        hangs = summary["metrics"]["hangRate"]
+        assert hangs["category"] == "HANG"
+        assert hangs["values"] == [None, 0.5, 0.25]
+        assert hangs["deltas"] == [None, -0.25]
+
+    @pytest.mark.parametrize("options, expected", [
+        ({"percentile": "percentile.ninety"}, [900.0]),
+        ({"device": "all_iPads"}, [300.0]),
+        ({"last_versions": 1}, [500.0]),
+    ])
+    def test_summary_filters(self, options, expected):
+        """Test selecting a percentile, device class or the newest versions."""
+        summary = MetricColumns(DOCUMENT).summarize(categories=["LAUNCH"], **options)
+
+        assert summary["metrics"]["launchTime"]["values"] == expected
+
+    def test_empty_document(self):
+        """Test that a document without data summarizes to nothing."""
+        summary = MetricColumns({}).summarize()
+
+        assert summary["versions"] == []
+        assert summary["metrics"] == {}
+
+
+def test_columns_are_reused_for_the_same_document():
+    """Test that columns are rebuilt only when the document changes."""
+    http = Mock()
+    http.get.return_value.json.return_value = DOCUMENT
+    service = PerformanceService(Mock(base_url="https://example.com/v1", headers={}), http)
+
+    first = service.get_metric_columns("app1")
+    assert service.get_metric_columns("app1") is first
+
+    http.get.return_value.json.return_value = {"productData": []}
+    assert service.get_metric_columns("app1") is not first
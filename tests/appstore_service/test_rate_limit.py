@@ -0,0 +1,94 @@
+"""Unit tests for appstore_service.rate_limit module."""
+from unittest.mock import Mock, patch
+from appstore_service.rate_limit import RateLimiter, parse_rate_limit_header
+
+
+def make_response(status_code=200, headers=None):
+    """Build a mock response with the given status and headers."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestParseRateLimitHeader:
+    """Test cases for parse_rate_limit_header function."""
+
+    def test_parses_limit_and_remaining(self):
+        """Test parsing a well-formed header."""
+        assert parse_rate_limit_header(
+            "user-hour-lim:3600;user-hour-rem:3412;") == (3600, 3412)
+
+    def test_missing_header(self):
+        """Test that a missing header yields no values."""
+        assert parse_rate_limit_header(None) == (None, None)
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter class."""
+
+    def test_burst_is_spent_without_waiting(self):
+        """Test that requests within the burst are not delayed."""
+        limiter = RateLimiter(rate_per_second=1, burst=3)
+
+        with patch('appstore_service.rate_limit.wait') as mock_wait:
+            for _ in range(3):
+                limiter.acquire()
+
+        mock_wait.assert_not_called()
+        assert limiter.requests_sent == 3
+
+    def test_waits_when_bucket_is_empty(self):
+        """Test that acquire sleeps once the bucket is drained."""
+        limiter = RateLimiter(rate_per_second=10, burst=1)
+        limiter.acquire()
+
+        with patch('appstore_service.rate_limit.wait') as mock_wait:
+            mock_wait.side_effect = lambda seconds: setattr(
+                limiter, '_tokens', 1.0)
+            limiter.acquire()
+
+        delay = mock_wait.call_args.args[0]
+        assert 0 < delay <= 0.1
+
+    def test_pace_slows_below_low_watermark(self):
+        """Test that the refill rate drops as the reported quota runs out."""
+        limiter = RateLimiter(rate_per_second=4, low_watermark=0.1)
+
+        limiter.update(make_response(
+            headers={"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:3000;"}))
+        assert limiter.budget()["rate_per_second"] == 4
+
+        limiter.update(make_response(
+            headers={"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:180;"}))
+        assert limiter.budget()["rate_per_second"] == 2
+
+    def test_should_retry(self):
+        """Test which responses are retried."""
+        limiter = RateLimiter(max_retries=2)
+
+        assert limiter.should_retry("POST", make_response(429), 0)
+        assert limiter.should_retry("GET", make_response(503), 1)
+        assert not limiter.should_retry("POST", make_response(503), 0)
+        assert not limiter.should_retry("GET", make_response(404), 0)
+        assert not limiter.should_retry("GET", make_response(429), 2)
+
+    @patch('appstore_service.rate_limit.random.uniform', side_effect=lambda low, high: high)
+    def test_backoff_is_exponential_and_capped(self, mock_uniform):
+        """Test the jitter window doubles per attempt up to the cap."""
+        limiter = RateLimiter(backoff_base=1, backoff_max=5)
+
+        delays = [limiter.backoff(make_response(503), attempt) for attempt in range(4)]
+
+        assert delays == [1, 2, 4, 5]
+
+    def test_rate_limited_response_pauses_bucket(self):
+        """Test that a 429 empties the bucket for the Retry-After period."""
+        limiter = RateLimiter()
+
+        delay = limiter.backoff(make_response(429, {"Retry-After": "30"}), 0)
+
+        budget = limiter.budget()
+        assert delay == 30
+        assert budget["tokens"] < 1
+        assert 29 < budget["paused_for_seconds"] <= 30
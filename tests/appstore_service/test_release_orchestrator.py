@@ -0,0 +1,127 @@
+"""Unit tests for release_orchestrator module."""
+import threading
+from unittest.mock import Mock
+import pytest
+import requests
+from appstore_service.release_orchestrator import ReleaseOrchestrator
+
+STATES = {
+    "com.example.new": "PREPARE_FOR_SUBMISSION",
+    "com.example.approved": "PENDING_DEVELOPER_RELEASE",
+    "com.example.live": "READY_FOR_SALE",
+    "com.example.odd": "DEVELOPER_REJECTED",
+}
+
+
+@pytest.fixture(name="app_store")
+def fixture_app_store():
+    """A mock AppStore whose apps are in the states listed in STATES."""
+    store = Mock()
+    store._get_app_id.side_effect = lambda bundle_id: (
+        f"app-{bundle_id}" if bundle_id in STATES else None)
+    store._find_build_id.side_effect = lambda app_id, version, build: f"build-{app_id}"
+    store._find_version_info.side_effect = lambda app_id, version: {
+        "id": f"version-{app_id}",
+        "attributes": {"versionString": version,
+                       "appStoreState": STATES[app_id[len("app-"):]]}}
+    store.version_service.submit_for_review.return_value = {"data": {"id": "submission"}}
+    store.version_service.release_pending_version.return_value = {"data": {"id": "request"}}
+    store._handle_error.side_effect = lambda err: {"error": str(err)}
+    return store
+
+
+def by_bundle(report):
+    """Index the per-app results of a run by bundle ID."""
+    return {result["bundleId"]: result for result in report["results"]}
+
+
+class TestReleaseOrchestrator:
+    """Test cases for ReleaseOrchestrator class."""
+
+    def test_runs_the_steps_each_state_needs(self, app_store):
+        """Test that each app gets only the write steps its state calls for."""
+        report = ReleaseOrchestrator(app_store, max_concurrency=3).run([
+            ("com.example.new", "1.0", "1"),
+            ("com.example.approved", "2.0", "2"),
+            ("com.example.live", "3.0", "3"),
+        ])
+
+        results = by_bundle(report)
+        assert results["com.example.new"]["status"] == "submitted"
+        assert results["com.example.approved"]["status"] == "released"
+        assert results["com.example.live"]["status"] == "no_action"
+        assert results["com.example.live"]["steps"]["release"]["status"] == "skipped"
+        app_store.version_service.associate_build_to_version.assert_called_once_with(
+            "version-app-com.example.new", "build-app-com.example.new")
+        app_store.version_service.submit_for_review.assert_called_once_with(
+            "version-app-com.example.new")
+        app_store.version_service.release_pending_version.assert_called_once_with(
+            "version-app-com.example.approved")
+
+    def test_dry_run_sends_no_writes(self, app_store):
+        """Test that a dry run plans write steps without calling them."""
+        report = ReleaseOrchestrator(app_store).run(
+            [("com.example.new", "1.0", "1")], dry_run=True)
+
+        result = report["results"][0]
+        assert report["dry_run"] is True
+        assert result["status"] == "planned"
+        assert result["steps"]["associate_build"]["status"] == "planned"
+        assert result["steps"]["submit_for_review"]["status"] == "planned"
+        assert result["steps"]["release"]["status"] == "skipped"
+        app_store.version_service.associate_build_to_version.assert_not_called()
+        app_store.version_service.submit_for_review.assert_not_called()
+
+    def test_failure_blocks_dependents_only(self, app_store):
+        """Test that a failed step blocks its own app but not the others."""
+        report = ReleaseOrchestrator(app_store).run([
+            ("com.example.missing", "1.0", "1"),
+            ("com.example.odd", "1.0", "1"),
+            ("com.example.new", "1.0", "1"),
+        ])
+
+        results = by_bundle(report)
+        missing = results["com.example.missing"]
+        assert missing["status"] == "failed"
+        assert missing["steps"]["resolve_app"]["status"] == "failed"
+        assert missing["steps"]["submit_for_review"]["status"] == "blocked"
+        assert results["com.example.odd"]["steps"]["find_version"]["detail"] == (
+            "Version is in an unhandled state: 'DEVELOPER_REJECTED'")
+        assert results["com.example.new"]["status"] == "submitted"
+
+    def test_http_errors_are_reported(self, app_store):
+        """Test that an HTTP error fails the step with the API error."""
+        app_store.version_service.submit_for_review.side_effect = (
+            requests.exceptions.HTTPError("409 Conflict"))
+
+        result = ReleaseOrchestrator(app_store).run(
+            [("com.example.new", "1.0", "1")])["results"][0]
+
+        assert result["status"] == "failed"
+        assert result["steps"]["submit_for_review"]["detail"] == {"error": "409 Conflict"}
+
+    def test_lookups_of_different_apps_overlap(self, app_store):
+        """Test that steps of several apps run concurrently."""
+        both_started = threading.Barrier(2, timeout=5)
+
+        def get_app_id(bundle_id):
+            both_started.wait()
+            return f"app-{bundle_id}"
+
+        app_store._get_app_id.side_effect = get_app_id
+
+        report = ReleaseOrchestrator(app_store, max_concurrency=2).run([
+            ("com.example.live", "1.0", "1"), ("com.example.new", "1.0", "1")])
+
+        assert {r["status"] for r in report["results"]} == {"no_action", "submitted"}
+
+    def test_results_are_delivered_as_each_app_finishes(self, app_store):
+        """Test that on_result fires once per app, in completion order."""
+        delivered = []
+
+        report = ReleaseOrchestrator(app_store).run(
+            [("com.example.missing", "1.0", "1"), ("com.example.live", "1.0", "1")],
+            on_result=delivered.append)
+
+        assert delivered == report["results"]
+        assert delivered[0]["bundleId"] == "com.example.missing"
@@ -0,0 +1,102 @@
+"""Unit tests for appstore_service.response_cache module."""
+from unittest.mock import Mock, patch
+from appstore_service.response_cache import ResponseCache, resource_types
+
+BASE_URL = "https://api.appstoreconnect.apple.com/v1"
+
+
+def make_response(content=b"{}", status_code=200):
+    """Build a mock response with the given body."""
+    response = Mock()
+    response.status_code = status_code
+    response.content = content
+    return response
+
+
+class TestResourceTypes:
+    """Test cases for resource_types function."""
+
+    def test_path_and_include(self):
+        """Test that path collections and included relationships are found."""
+        assert resource_types(
+            f"{BASE_URL}/apps/123/appStoreVersions?include=build") == [
+                "apps", "appStoreVersions", "build"]
+
+    def test_relationship_urls(self):
+        """Test that ids and the relationships segment are skipped."""
+        assert resource_types(
+            f"{BASE_URL}/betaTesters/ab-12/relationships/betaGroups") == [
+                "betaTesters", "betaGroups"]
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class."""
+
+    def test_ttl_per_resource(self):
+        """Test that the TTL comes from the last collection in the path."""
+        cache = ResponseCache(ttls={"apps": 100, "perfPowerMetrics": 5})
+
+        assert cache.ttl_for(f"{BASE_URL}/apps?filter[bundleId]=x") == 100
+        assert cache.ttl_for(f"{BASE_URL}/apps/1/perfPowerMetrics") == 5
+        assert cache.ttl_for(f"{BASE_URL}/apps/1/customerReviews") == 0
+
+    @patch('appstore_service.response_cache.time.monotonic')
+    def test_entries_expire(self, mock_monotonic):
+        """Test that an entry is served until its TTL passes."""
+        cache = ResponseCache(ttls={"builds": 60})
+        response = make_response()
+        mock_monotonic.return_value = 1000
+        cache.put("k", response, f"{BASE_URL}/builds")
+
+        mock_monotonic.return_value = 1059
+        assert cache.get("k") is response
+        mock_monotonic.return_value = 1060
+        assert cache.get("k") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_uncacheable_responses_are_skipped(self):
+        """Test that errors and resources without a TTL are not stored."""
+        cache = ResponseCache(ttls={"builds": 60})
+
+        assert not cache.put("a", make_response(status_code=404), f"{BASE_URL}/builds")
+        assert not cache.put("b", make_response(), f"{BASE_URL}/customerReviews")
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_respects_memory_budget(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_bytes=10, ttls={"builds": 60})
+        cache.put("a", make_response(b"1234"), f"{BASE_URL}/builds")
+        cache.put("b", make_response(b"1234"), f"{BASE_URL}/builds")
+        cache.get("a")
+        cache.put("c", make_response(b"1234"), f"{BASE_URL}/builds")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["bytes"] == 8
+        assert cache.stats()["evictions"] == 1
+
+    def test_write_invalidates_related_entries(self):
+        """Test that a write drops entries for the resource and related ones."""
+        cache = ResponseCache(ttls={"betaGroups": 60, "appStoreVersions": 60, "apps": 60})
+        cache.put("groups", make_response(), f"{BASE_URL}/betaGroups", {"filter[app]": "1"})
+        cache.put("versions", make_response(), f"{BASE_URL}/apps/1/appStoreVersions")
+        cache.put("apps", make_response(), f"{BASE_URL}/apps")
+
+        assert cache.invalidate(f"{BASE_URL}/betaTesters") == 1
+        assert cache.invalidate(f"{BASE_URL}/appStoreVersionSubmissions") == 1
+        assert cache.get("apps") is not None
+
+    def test_put_after_invalidation_is_skipped(self):
+        """Test that a response fetched before a related write is not cached."""
+        cache = ResponseCache(ttls={"betaGroups": 60})
+        url = f"{BASE_URL}/betaGroups"
+        generation = cache.generation(url)
+
+        cache.invalidate(f"{BASE_URL}/betaTesters")
+
+        assert cache.put("groups", make_response(), url, generation=generation) is False
+        assert cache.get("groups") is None
+        assert cache.stats()["stale_puts"] == 1
+        assert cache.put("groups", make_response(), url,
+                         generation=cache.generation(url)) is True
@@ -0,0 +1,100 @@
+"""Unit tests for review_store module."""
+from unittest.mock import Mock
+import pytest
+from appstore_service.review_store import ReviewStore
+
+
+def review(review_id, rating, title, body, territory="USA", created="2024-01-01"):
+    """A customerReviews resource."""
+    return {"type": "customerReviews", "id": review_id, "attributes": {
+        "rating": rating, "title": title, "body": body, "reviewerNickname": "nick",
+        "territory": territory, "createdDate": created}}
+
+
+def paginator(*pages):
+    """A Paginator mock yielding ``pages`` of resources."""
+    return Mock(pages=Mock(side_effect=lambda: iter([{"data": list(page)} for page in pages])))
+
+
+R1 = review("r1", 1, "Crashes", "The app crashes on launch", "GBR", "2024-01-01")
+R2 = review("r2", 5, "Love it", "Dark mode looks great", "USA", "2024-01-02")
+R3 = review("r3", 2, "Sync broken", "Syncing freezes the app", "USA", "2024-01-03")
+R4 = review("r4", 4, "Better", "No more crashes", "USA", "2024-01-04")
+
+
+@pytest.fixture(name="store")
+def fixture_store(tmp_path):
+    """A store whose first sync sees r3, r2 and r1, newest first, over two pages."""
+    app_info_service = Mock()
+    app_info_service.iter_customer_reviews.return_value = paginator([R3, R2], [R1])
+    app_info_service.iter_version_customer_reviews.side_effect = lambda version_id: (
+        paginator([R3]) if version_id == "v2" else paginator([R2, R1]))
+    version_service = Mock()
+    version_service.iter_versions.return_value = [
+        {"id": "v1", "attributes": {"versionString": "1.0", "createdDate": "2023-12-01"}},
+        {"id": "v2", "attributes": {"versionString": "1.1", "createdDate": "2024-01-03"}},
+    ]
+    store = ReviewStore(app_info_service, version_service,
+                        str(tmp_path / "reviews.sqlite3"), version_window=2)
+    yield store
+    store.close()
+
+
+class TestReviewStore:
+    """Test cases for ReviewStore class."""
+
+    def test_sync_stops_at_stored_reviews(self, store):
+        """Test that only the first page is read once the backfill is done."""
+        first = store.sync("app1")
+        store.app_info_service.iter_customer_reviews.return_value = paginator(
+            [R4, R3], [R2, R1])
+
+        second = store.sync("app1")
+
+        assert (first["new"], first["pages"]) == (3, 2)
+        assert (second["new"], second["pages"]) == (1, 1)
+        assert [item["id"] for item in store.new_since_last_sync("app1")] == ["r4"]
+        assert store.stats()["reviews"] == 4
+
+    def test_interrupted_backfill_is_completed(self, store):
+        """Test that a sync that never finished does not cut the next one short."""
+        store.version_service.iter_versions.side_effect = RuntimeError("interrupted")
+        with pytest.raises(RuntimeError):
+            store.sync("app1")
+        store.version_service.iter_versions.side_effect = None
+
+        assert store.has_reviews("app1") is False
+        assert store.sync("app1")["pages"] == 2
+
+    def test_reviews_are_tagged_with_recent_versions(self, store):
+        """Test that histograms group reviews by the version they were listed under."""
+        result = store.sync("app1")
+
+        assert result["versionsTagged"] == 3
+        histogram = store.histogram("app1")
+        assert histogram["1.0"]["ratings"] == {"1": 1, "2": 0, "3": 0, "4": 0, "5": 1}
+        assert histogram["1.0"]["average"] == 3.0
+        assert histogram["1.1"]["count"] == 1
+        assert store.histogram("app1", "territory")["USA"]["average"] == 3.5
+
+    def test_histogram_skips_unrated_reviews(self, store):
+        """Test that a review without a rating is not counted or bucketed."""
+        store.sync("app1")
+        # pylint: disable-next=protected-access
+        store._insert("app1", [review("r9", None, "?", "No stars", "GBR")], 99)
+
+        histogram = store.histogram("app1", "territory")
+
+        assert histogram["GBR"]["ratings"] == {"1": 1, "2": 0, "3": 0, "4": 0, "5": 0}
+        assert histogram["GBR"]["count"] == 1
+
+    def test_search(self, store):
+        """Test full-text search with filters and with unparseable queries."""
+        store.sync("app1")
+
+        assert [item["id"] for item in store.search("app1", "crashes")] == ["r1"]
+        assert {item["id"] for item in store.search("app1", "sync* OR dark")} == {"r2", "r3"}
+        assert store.search("app1", "app", rating=2)[0]["title"] == "Sync broken"
+        assert store.search("app1", "app", version="1.0")[0]["id"] == "r1"
+        assert store.search("app1", 'launch"')[0]["reviewerNickname"] == "nick"
+        assert store.search("app2", "crashes") == []
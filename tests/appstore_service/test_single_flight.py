@@ -0,0 +1,113 @@
+"""Unit tests for appstore_service.single_flight module."""
+import threading
+import pytest
+from appstore_service.cancellation import RequestCancelled
+from appstore_service.single_flight import SingleFlight
+
+
+def run_concurrently(flight, key, fn, callers):
+    """Call flight.do from several threads once the first call is running."""
+    results = []
+    errors = []
+
+    def target():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    threads = [threading.Thread(target=target) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight class."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Test that identical concurrent calls run once and share the result."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        executions = []
+        shared = {"data": []}
+
+        def fn():
+            executions.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return shared
+
+        leader = threading.Thread(target=flight.do, args=("k", fn))
+        leader.start()
+        started.wait(timeout=5)
+        threads, results, errors = run_concurrently(flight, "k", fn, 3)
+        while flight.stats()["deduplicated"] < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads + [leader]:
+            thread.join(timeout=5)
+
+        assert executions == [1]
+        assert not errors
+        assert all(result is shared for result in results)
+        assert flight.stats() == {"in_flight": 0, "executed": 1, "deduplicated": 3}
+
+    def test_errors_are_shared(self):
+        """Test that a failed call is cleaned up and its exception raised."""
+        flight = SingleFlight()
+
+        def fn():
+            raise ValueError("bad")
+
+        with pytest.raises(ValueError):
+            flight.do("k", fn)
+        assert flight.stats()["in_flight"] == 0
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """Test that a finished call does not serve later callers."""
+        flight = SingleFlight()
+        calls = []
+
+        flight.do("k", lambda: calls.append(1))
+        flight.do("k", lambda: calls.append(2))
+
+        assert calls == [1, 2]
+
+    def test_follower_retries_when_leader_cancelled(self):
+        """Test that a follower runs the call itself if the leader was cancelled."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        attempts = []
+
+        def fn():
+            attempts.append(1)
+            if len(attempts) == 1:
+                started.set()
+                release.wait(timeout=5)
+                raise RequestCancelled()
+            return "fresh"
+
+        leader_errors = []
+
+        def lead():
+            try:
+                flight.do("k", fn)
+            except RequestCancelled as e:
+                leader_errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(timeout=5)
+        threads, results, errors = run_concurrently(flight, "k", fn, 1)
+        while flight.stats()["deduplicated"] < 1:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads + [leader]:
+            thread.join(timeout=5)
+
+        assert leader_errors
+        assert results == ["fresh"]
+        assert not errors
@@ -0,0 +1,136 @@
+"""Unit tests for tester_import module."""
+from unittest.mock import Mock
+import pytest
+import requests
+from appstore_service.tester_import import BulkTesterUpdate, parse_testers
+
+
+class TestParseTesters:
+    """Test cases for parse_testers function."""
+
+    def test_mixed_list_and_csv(self):
+        """Test that strings, dicts and CSV rows are merged and de-duplicated."""
+        csv_text = "email,firstName,lastName\nb@example.com,Bea,Smith\nA@example.com,,\n"
+
+        testers = parse_testers(["a@example.com", {"email": "c@example.com"}], csv_text)
+
+        assert testers == [
+            {"email": "a@example.com", "firstName": None, "lastName": None},
+            {"email": "c@example.com", "firstName": None, "lastName": None},
+            {"email": "b@example.com", "firstName": "Bea", "lastName": "Smith"},
+        ]
+
+    def test_plain_email_lines(self):
+        """Test a CSV without a header, one email per line."""
+        assert [t["email"] for t in parse_testers(csv_text="x@example.com\n\ny@example.com")] == [
+            "x@example.com", "y@example.com"]
+
+    def test_plain_email_containing_email(self):
+        """Test that a first address containing "email" is not taken as a header."""
+        assert [t["email"] for t in parse_testers(csv_text="myemail@gmail.com\nbob@x.com")] == [
+            "myemail@gmail.com", "bob@x.com"]
+
+    def test_header_names_are_normalized(self):
+        """Test that spreadsheet-style headers map to the tester fields."""
+        csv_text = "Email Address,First Name,Last Name\nb@example.com,Bea,Smith\n"
+
+        assert parse_testers(csv_text=csv_text) == [
+            {"email": "b@example.com", "firstName": "Bea", "lastName": "Smith"}]
+
+    def test_invalid_entry(self):
+        """Test that an entry without an email is rejected."""
+        with pytest.raises(ValueError):
+            parse_testers([{"firstName": "Nobody"}])
+
+
+class TestBulkTesterUpdate:
+    """Test cases for BulkTesterUpdate class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.beta_service = Mock()
+        self.beta_service.find_testers_by_email.side_effect = lambda emails: {"data": [
+            {"type": "betaTesters", "id": f"id-{email}", "attributes": {"email": email}}
+            for email in emails if email.startswith("old")]}
+        self.beta_service.add_tester_to_groups.side_effect = (
+            lambda email, *_args: {"data": {"id": f"new-{email}"}})
+        self.bulk = BulkTesterUpdate(self.beta_service, max_workers=2, batch_size=2)
+
+    def test_add_links_existing_in_batches_and_creates_new(self):
+        """Test that existing testers are linked per batch and new ones created."""
+        testers = parse_testers(["old1@x.com", "old2@x.com", "old3@x.com", "new1@x.com"])
+        streamed = []
+
+        report = self.bulk.add(testers, ["g1", "g2"], on_outcome=streamed.append)
+
+        assert self.beta_service.find_testers_by_email.call_count == 2
+        link_calls = [call.args for call in
+                      self.beta_service.add_testers_to_group.call_args_list]
+        assert link_calls == [
+            ("g1", ["id-old1@x.com", "id-old2@x.com"]),
+            ("g2", ["id-old1@x.com", "id-old2@x.com"]),
+            ("g1", ["id-old3@x.com"]),
+            ("g2", ["id-old3@x.com"]),
+        ]
+        self.beta_service.add_tester_to_groups.assert_called_once_with(
+            "new1@x.com", ["g1", "g2"], None, None)
+        assert report["summary"] == {"linked": 3, "created": 1, "total": 4}
+        assert streamed == report["outcomes"]
+
+    def test_failed_creation_is_reported_per_tester(self):
+        """Test that one failed creation does not stop the others."""
+        response = Mock(status_code=409)
+        response.json.return_value = {"errors": [{"code": "ENTITY_ERROR"}]}
+
+        def create(email, *_args):
+            if email == "new1@x.com":
+                raise requests.exceptions.HTTPError(response=response)
+            return {"data": {"id": "t2"}}
+        self.beta_service.add_tester_to_groups.side_effect = create
+
+        report = self.bulk.add(parse_testers(["new1@x.com", "new2@x.com"]), ["g1"])
+
+        outcomes = {o["email"]: o for o in report["outcomes"]}
+        assert outcomes["new1@x.com"]["detail"] == {"errors": [{"code": "ENTITY_ERROR"}]}
+        assert outcomes["new2@x.com"] == {
+            "email": "new2@x.com", "status": "created", "testerId": "t2"}
+
+    def test_remove_unlinks_existing_and_reports_unknown(self):
+        """Test bulk removal through the relationship endpoint."""
+        report = self.bulk.remove(parse_testers(["old1@x.com", "nobody@x.com"]), ["g1"])
+
+        self.beta_service.remove_testers_from_group.assert_called_once_with(
+            "g1", ["id-old1@x.com"])
+        assert report["summary"] == {"not_found": 1, "removed": 1, "total": 2}
+
+    def test_sync_applies_only_the_delta(self):
+        """Test that sync adds missing testers and removes extra members."""
+        self.beta_service.iter_testers_in_group.return_value = iter([
+            {"type": "betaTesters", "id": "m1", "attributes": {"email": "Keep@x.com"}},
+            {"type": "betaTesters", "id": "m2", "attributes": {"email": "gone@x.com"}},
+        ])
+
+        report = self.bulk.sync(
+            "g1", parse_testers(["keep@x.com", "old1@x.com", "new1@x.com"]))
+
+        self.beta_service.find_testers_by_email.assert_called_once_with(
+            ["old1@x.com", "new1@x.com"])
+        self.beta_service.add_testers_to_group.assert_called_once_with(
+            "g1", ["id-old1@x.com"])
+        self.beta_service.add_tester_to_groups.assert_called_once_with(
+            "new1@x.com", ["g1"], None, None)
+        self.beta_service.remove_testers_from_group.assert_called_once_with("g1", ["m2"])
+        assert report["operations"] == {
+            "current": 2, "desired": 3, "unchanged": 1, "to_add": 2, "to_remove": 1}
+        assert report["summary"] == {"linked": 1, "created": 1, "removed": 1, "total": 3}
+
+    def test_sync_dry_run_changes_nothing(self):
+        """Test that a dry run only reports the diff."""
+        self.beta_service.iter_testers_in_group.return_value = iter([
+            {"type": "betaTesters", "id": "m2", "attributes": {"email": "gone@x.com"}}])
+
+        report = self.bulk.sync("g1", parse_testers(["new1@x.com"]), dry_run=True)
+
+        assert report["summary"] == {"would_add": 1, "would_remove": 1, "total": 2}
+        self.beta_service.find_testers_by_email.assert_not_called()
+        self.beta_service.remove_testers_from_group.assert_not_called()
@@ -0,0 +1,125 @@
+"""Unit tests for tester_index module."""
+from unittest.mock import Mock
+import pytest
+from appstore_service.beta_service import BetaService
+from appstore_service import tester_index
+
+
+def beta_tester(tester_id, email, groups=(), apps=()):
+    """A betaTesters resource linked to the given groups and apps."""
+    return {"type": "betaTesters", "id": tester_id,
+            "attributes": {"email": email, "firstName": None, "lastName": None},
+            "relationships": {
+                "betaGroups": {"data": [{"type": "betaGroups", "id": g} for g in groups]},
+                "apps": {"data": [{"type": "apps", "id": a} for a in apps]}}}
+
+
+def listing_page(testers, groups=(), apps=()):
+    """A betaTesters listing page with groups and apps included."""
+    return {"data": testers, "included": [
+        *({"type": "betaGroups", "id": g, "attributes": {"name": f"Group {g}"}} for g in groups),
+        *({"type": "apps", "id": a, "attributes": {"bundleId": f"com.{a}"}} for a in apps)]}
+
+
+@pytest.fixture(name="beta_service")
+def fixture_beta_service():
+    """A BetaService mock whose account has two testers."""
+    service = Mock()
+    listing = [listing_page([beta_tester("t1", "Ann@x.com", ["g1", "g2"], ["a1"]),
+                             beta_tester("t2", "bob@x.com", ["g1"], ["a1"])],
+                            ["g1", "g2"], ["a1"])]
+    service.iter_testers_with_memberships.side_effect = (
+        lambda emails=None: Mock(pages=Mock(return_value=iter(listing))) if emails is None
+        else Mock(pages=Mock(return_value=iter([listing_page([])]))))
+    return service
+
+
+class TestTesterIndex:
+    """Test cases for TesterIndex class."""
+
+    def test_lookups_are_answered_from_one_listing(self, beta_service):
+        """Test email, group and count lookups after a single build."""
+        index = tester_index.TesterIndex(beta_service, max_age=3600)
+
+        assert index.tester_id("ann@x.com") == "t1"
+        assert index.tester_id("ann@x.com", app_id="a2") is None
+        found = index.find("ANN@x.com")
+        assert [group["name"] for group in found["groups"]] == ["Group g1", "Group g2"]
+        assert found["apps"] == [{"id": "a1", "bundleId": "com.a1", "name": None}]
+        assert index.group_member_counts() == {
+            "g1": {"name": "Group g1", "members": 2},
+            "g2": {"name": "Group g2", "members": 1}}
+        assert index.group_member_counts(["g2", "g9"])["g9"]["members"] == 0
+        beta_service.iter_testers_with_memberships.assert_called_once_with()
+
+    def test_dirty_emails_are_refetched_in_bulk(self, beta_service):
+        """Test that changed testers are refreshed with one filtered request."""
+        index = tester_index.TesterIndex(beta_service, max_age=3600)
+        index.build()
+        beta_service.iter_testers_with_memberships.side_effect = lambda emails=None: Mock(
+            pages=Mock(return_value=iter(
+                [listing_page([beta_tester("t2", "bob@x.com", ["g2"], ["a1"])])])))
+
+        index.mark_dirty(["bob@x.com", "ann@x.com"])
+        counts = index.group_member_counts()
+
+        beta_service.iter_testers_with_memberships.assert_called_with(
+            ["ann@x.com", "bob@x.com"])
+        assert index.tester_id("ann@x.com") is None
+        assert counts["g2"]["members"] == 1
+        assert counts["g1"]["members"] == 0
+
+    def test_unknown_email_is_fetched_on_demand(self, beta_service):
+        """Test that a tester added elsewhere is found by a point lookup."""
+        index = tester_index.TesterIndex(beta_service, max_age=3600)
+
+        assert index.tester_id("new@x.com") is None
+        beta_service.iter_testers_with_memberships.assert_called_with(["new@x.com"])
+        assert index.stats()["misses"] == 1
+
+    def test_unknown_email_is_remembered_as_missing(self, beta_service):
+        """Test that a repeated lookup of an unknown email makes no request."""
+        index = tester_index.TesterIndex(beta_service, max_age=3600, negative_ttl=60)
+        index.tester_id("new@x.com")
+        calls = beta_service.iter_testers_with_memberships.call_count
+
+        assert index.tester_id("new@x.com") is None
+        assert beta_service.iter_testers_with_memberships.call_count == calls
+        assert index.stats()["missing"] == 1
+
+        index.mark_dirty(["new@x.com"])
+        assert index.stats()["missing"] == 0
+
+    def test_group_changes_update_the_entry_in_place(self, beta_service):
+        """Test that linking and unlinking a tester makes no request."""
+        index = tester_index.TesterIndex(beta_service, max_age=3600)
+        index.build()
+
+        index.update_groups(["ann@x.com"], ["g1"], linked=False)
+        index.update_groups(["bob@x.com"], ["g2"], linked=True)
+
+        assert index.group_member_counts() == {
+            "g1": {"name": "Group g1", "members": 1},
+            "g2": {"name": "Group g2", "members": 2}}
+        beta_service.iter_testers_with_memberships.assert_called_once_with()
+
+    def test_index_is_rebuilt_when_old(self, beta_service):
+        """Test that an expired index is rebuilt from a full listing."""
+        index = tester_index.TesterIndex(beta_service, max_age=0)
+        index.tester_id("ann@x.com")
+        index.tester_id("ann@x.com")
+
+        assert index.stats()["builds"] == 2
+
+
+def test_beta_service_resolves_emails_through_index():
+    """Test that BetaService uses the index instead of a filtered request."""
+    http = Mock()
+    service = BetaService(Mock(base_url="https://example.com/v1"), http)
+    service.tester_index = Mock()
+    service.tester_index.tester_id.return_value = "t1"
+    http.delete.return_value = Mock(status_code=204)
+
+    assert service.remove_tester_from_groups("ann@x.com", ["g1"], "a1") is True
+    service.tester_index.tester_id.assert_called_once_with("ann@x.com", "a1")
+    http.get.assert_not_called()
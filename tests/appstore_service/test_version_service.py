@@ -0,0 +1,31 @@
+"""Unit tests for appstore_service.version_service module."""
+from unittest.mock import Mock
+from appstore_service.fieldsets import DEFAULT_FIELDS
+from appstore_service.version_service import VersionService, REQUEST_TIMEOUT
+
+DEFAULT_FIELDS_PARAM = ",".join(DEFAULT_FIELDS["appStoreVersions"])
+
+
+class TestVersionService:
+    """Test cases for VersionService class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_auth = Mock()
+        self.mock_auth.base_url = "https://api.appstoreconnect.apple.com/v1"
+        self.mock_auth.headers = {"Authorization": "Bearer test_token"}
+        self.mock_http = Mock()
+        self.service = VersionService(self.mock_auth, self.mock_http)
+
+    def test_get_version_lists_the_app_versions(self):
+        """Test that the version is looked up through the app's relationship."""
+        self.mock_http.get.return_value.json.return_value = {"data": []}
+
+        self.service.get_version("123", "1.2.3", platform="IOS")
+
+        self.mock_http.get.assert_called_once_with(
+            "https://api.appstoreconnect.apple.com/v1/apps/123/appStoreVersions",
+            headers={"Authorization": "Bearer test_token"},
+            params={"filter[versionString]": "1.2.3", "filter[platform]": "IOS",
+                    "fields[appStoreVersions]": DEFAULT_FIELDS_PARAM},
+            timeout=REQUEST_TIMEOUT)
@@ -0,0 +1,134 @@
+"""Unit tests for watcher module."""
+from unittest.mock import Mock
+import pytest
+from appstore_service.watcher import Watcher
+
+
+def builds_page(states):
+    """A /v1/builds page with the given {build_id: processingState}."""
+    return {"data": [{"type": "builds", "id": build_id,
+                      "attributes": {"processingState": state}}
+                     for build_id, state in states.items()]}
+
+
+def apps_page(versions):
+    """A /v1/apps page with versions given as {app_id: {versionString: state}}."""
+    data, included = [], []
+    for app_id, states in versions.items():
+        linked = []
+        for version_string, state in states.items():
+            version_id = f"{app_id}-{version_string}"
+            linked.append({"type": "appStoreVersions", "id": version_id})
+            included.append({"type": "appStoreVersions", "id": version_id,
+                             "attributes": {"versionString": version_string,
+                                            "appStoreState": state}})
+        data.append({"type": "apps", "id": app_id,
+                     "relationships": {"appStoreVersions": {"data": linked}}})
+    return {"data": data, "included": included}
+
+
+@pytest.fixture(name="watcher")
+def fixture_watcher():
+    """A Watcher with mock services whose polling thread never polls by itself."""
+    watcher = Watcher(Mock(), Mock(), min_interval=30, max_interval=120,
+                      backoff=2, batch_size=2)
+    watcher.stop()
+    yield watcher
+
+
+class TestWatcher:
+    """Test cases for Watcher class."""
+
+    def test_builds_are_batched(self, watcher):
+        """Test that builds are fetched with filter[id] in batches."""
+        watcher.build_service.get_builds_by_id.side_effect = lambda ids, *_a, **_k: (
+            builds_page({build_id: "PROCESSING" for build_id in ids}))
+        for build_id in ("b1", "b2", "b3"):
+            watcher.watch_build("app", build_id)
+
+        events = watcher.poll_once()
+
+        calls = watcher.build_service.get_builds_by_id.call_args_list
+        assert [call.args[0] for call in calls] == [["b1", "b2"], ["b3"]]
+        assert all(call.kwargs["cache"] is False for call in calls)
+        assert [event["to"] for event in events] == ["PROCESSING"] * 3
+        assert watcher.list()["requests"] == 2
+
+    def test_versions_of_many_apps_share_requests(self, watcher):
+        """Test that versions are read through /apps?include=appStoreVersions."""
+        watcher.app_info_service.get_apps_with_versions.return_value = apps_page({
+            "a1": {"1.0": "WAITING_FOR_REVIEW"},
+            "a2": {"2.0": "IN_REVIEW", "1.9": "READY_FOR_SALE"}})
+        watcher.watch_version("a1", "1.0")
+        watcher.watch_version("a2", "2.0")
+
+        events = watcher.poll_once()
+
+        watcher.app_info_service.get_apps_with_versions.assert_called_once()
+        assert {(e["label"], e["to"]) for e in events} == {
+            ("1.0", "WAITING_FOR_REVIEW"), ("2.0", "IN_REVIEW")}
+
+    def test_change_is_reported_and_ends_version_watch(self, watcher):
+        """Test that a version watch without until stops at its first change."""
+        service = watcher.app_info_service.get_apps_with_versions
+        service.return_value = apps_page({"a1": {"1.0": "WAITING_FOR_REVIEW"}})
+        listener = Mock()
+        watcher.add_listener(listener)
+        watcher.watch_version("a1", "1.0", label="com.example 1.0")
+        watcher.poll_once()
+
+        service.return_value = apps_page({"a1": {"1.0": "IN_REVIEW"}})
+        events = watcher.poll_once()
+
+        assert events[0]["from"] == "WAITING_FOR_REVIEW"
+        assert events[0]["to"] == "IN_REVIEW"
+        assert events[0]["done"] is True
+        assert listener.call_count == 2
+        assert watcher.poll_once() == []
+        assert service.call_count == 2
+
+    def test_version_not_found_ends_watch(self, watcher):
+        """Test that a version outside the app's included versions is not polled forever."""
+        service = watcher.app_info_service.get_apps_with_versions
+        service.return_value = apps_page({"a1": {"2.0": "READY_FOR_SALE"}})
+        watcher.watch_version("a1", "1.0")
+
+        events = watcher.poll_once()
+
+        assert events[0]["to"] == "NOT_FOUND"
+        assert events[0]["done"] is True
+        assert watcher.poll_once() == []
+        assert service.call_count == 1
+
+    def test_build_watch_ends_in_final_state(self, watcher):
+        """Test that a build watch stops once processing is finished."""
+        service = watcher.build_service.get_builds_by_id
+        service.return_value = builds_page({"b1": "PROCESSING"})
+        watcher.watch_build("app", "b1")
+        watcher.poll_once()
+        service.return_value = builds_page({"b1": "VALID"})
+
+        assert watcher.poll_once()[0]["done"] is True
+        assert watcher.list()["watches"][0]["active"] is False
+
+    def test_interval_backs_off_and_resets(self, watcher):
+        """Test the adaptive poll interval."""
+        service = watcher.build_service.get_builds_by_id
+        service.return_value = builds_page({"b1": "PROCESSING"})
+        watcher.watch_build("app", "b1", until=["NEVER"])
+
+        watcher.poll_once()
+        watcher.poll_once()
+        assert watcher.interval == 120
+        service.return_value = builds_page({"b1": "VALID"})
+        watcher.poll_once()
+        assert watcher.interval == 30
+
+    def test_unwatch(self, watcher):
+        """Test that an unwatched build is no longer polled."""
+        watch = watcher.watch_build("app", "b1")
+
+        assert watcher.unwatch(watch["watchId"]) is True
+        assert watcher.unwatch(watch["watchId"]) is False
+        assert watcher.poll_once() == []
+        watcher.build_service.get_builds_by_id.assert_not_called()
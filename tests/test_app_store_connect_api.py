@@ -124,4 +124,47 @@ class TestAppStoreConnectApi:
         result, status_code = app_store_connect_api.list_builds("")
         
         assert result == {"error": "Missing required parameter: bundleId"}
-        assert status_code == 400
\ No newline at end of file
+        assert status_code == 400
+
+    @patch('app_store_connect_api.app_store_instance')
+    def test_get_rate_limit_status(self, mock_app_store):
+        """Test get_rate_limit_status function."""
+        expected_status = {"hourly_limit": 3600, "remaining": 3500}
+        mock_app_store.get_rate_limit_status.return_value = expected_status
+
+        result = app_store_connect_api.get_rate_limit_status()
+
+        mock_app_store.get_rate_limit_status.assert_called_once()
+        assert result == expected_status
+
+    @patch('app_store_connect_api.app_store_instance')
+    def test_get_cache_stats(self, mock_app_store):
+        """Test get_cache_stats function."""
+        expected_stats = {"responses": {"hits": 3}, "app_ids": {"hits": 5}}
+        mock_app_store.get_cache_stats.return_value = expected_stats
+
+        result = app_store_connect_api.get_cache_stats()
+
+        mock_app_store.get_cache_stats.assert_called_once()
+        assert result == {**expected_stats, "log_records_dropped": 0}
+
+    @patch('app_store_connect_api.app_store_instance')
+    def test_release_versions(self, mock_app_store):
+        """Test release_versions converts targets to tuples."""
+        mock_app_store.release_versions.return_value = {"results": []}
+
+        result = app_store_connect_api.release_versions(
+            [{"bundleId": "com.example", "version": "1.0", "buildNumber": "7"}],
+            dry_run=True)
+
+        mock_app_store.release_versions.assert_called_once_with(
+            [("com.example", "1.0", "7")], dry_run=True, max_concurrency=None)
+        assert result == {"results": []}
+
+    def test_release_versions_incomplete_target(self):
+        """Test release_versions with a target missing its build number."""
+        result, status_code = app_store_connect_api.release_versions(
+            [{"bundleId": "com.example", "version": "1.0"}])
+
+        assert result == {"error": "Each target needs bundleId, version and buildNumber"}
+        assert status_code == 400
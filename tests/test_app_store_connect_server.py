@@ -0,0 +1,239 @@
+"""Unit tests for app_store_connect_server module."""
+import json
+import threading
+from unittest.mock import patch
+import app_store_connect_server as server
+from appstore_service.cancellation import check_cancelled
+
+
+class TestToolCallDispatcher:
+    """Test cases for ToolCallDispatcher class."""
+
+    def test_responses_written_out_of_order(self):
+        """Test that a fast call is answered while a slow call is still running."""
+        release_slow = threading.Event()
+        written = []
+
+        def handler(message):
+            if message["id"] == 1:
+                release_slow.wait(timeout=5)
+            return {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+
+        def writer(response):
+            written.append(response["id"])
+            if response["id"] == 2:
+                release_slow.set()
+
+        dispatcher = server.ToolCallDispatcher(
+            max_workers=2, handler=handler, writer=writer)
+        dispatcher.submit({"id": 1, "method": "tools/call"})
+        dispatcher.submit({"id": 2, "method": "tools/call"})
+        dispatcher.shutdown(wait=True)
+
+        assert written == [2, 1]
+
+    def test_concurrency_limit(self):
+        """Test that no more than max_workers calls run at the same time."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def handler(message):
+            with lock:
+                running.append(message["id"])
+                peak.append(len(running))
+            threading.Event().wait(0.02)
+            with lock:
+                running.remove(message["id"])
+            return {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+
+        dispatcher = server.ToolCallDispatcher(
+            max_workers=2, handler=handler, writer=lambda response: None)
+        for request_id in range(6):
+            dispatcher.submit({"id": request_id, "method": "tools/call"})
+        dispatcher.shutdown(wait=True)
+
+        assert max(peak) <= 2
+
+    def test_handler_exception_becomes_error_response(self):
+        """Test that an unexpected handler error still produces a response."""
+        written = []
+
+        def handler(message):
+            raise RuntimeError("boom")
+
+        dispatcher = server.ToolCallDispatcher(
+            max_workers=1, handler=handler, writer=written.append)
+        dispatcher.submit({"id": 7, "method": "tools/call"})
+        dispatcher.shutdown(wait=True)
+
+        assert written[0]["id"] == 7
+        assert written[0]["error"]["code"] == -32000
+
+    @patch('app_store_connect_server.config')
+    def test_default_max_workers_from_config(self, mock_config):
+        """Test that the concurrency limit defaults to the config value."""
+        mock_config.MAX_CONCURRENT_TOOL_CALLS = 3
+
+        dispatcher = server.ToolCallDispatcher(writer=lambda response: None)
+        dispatcher.shutdown()
+
+        assert dispatcher.max_workers == 3
+
+    def test_cancel_queued_call_never_runs(self):
+        """Test that cancelling a queued call drops it without a response."""
+        release_first = threading.Event()
+        handled = []
+        written = []
+
+        def handler(message):
+            handled.append(message["id"])
+            if message["id"] == 1:
+                release_first.wait(timeout=5)
+            return {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+
+        dispatcher = server.ToolCallDispatcher(
+            max_workers=1, handler=handler, writer=written.append)
+        dispatcher.submit({"id": 1, "method": "tools/call"})
+        dispatcher.submit({"id": 2, "method": "tools/call"})
+
+        assert dispatcher.cancel(2, "user gave up") is True
+        release_first.set()
+        dispatcher.shutdown(wait=True)
+
+        assert handled == [1]
+        assert [response["id"] for response in written] == [1]
+        assert dispatcher.in_flight() == []
+
+    def test_cancel_running_call_stops_at_checkpoint(self):
+        """Test that a running call stops at its next checkpoint and is not answered."""
+        started = threading.Event()
+        resume = threading.Event()
+        reached_second_step = []
+        written = []
+
+        def handler(message):
+            started.set()
+            resume.wait(timeout=5)
+            check_cancelled()
+            reached_second_step.append(message["id"])
+            return {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+
+        dispatcher = server.ToolCallDispatcher(
+            max_workers=1, handler=handler, writer=written.append)
+        dispatcher.submit({"id": "abc", "method": "tools/call"})
+        started.wait(timeout=5)
+
+        server.handle_notification(
+            {"method": "notifications/cancelled",
+             "params": {"requestId": "abc", "reason": "timeout"}},
+            dispatcher)
+        resume.set()
+        dispatcher.shutdown(wait=True)
+
+        assert not reached_second_step
+        assert not written
+
+    def test_cancel_unknown_request(self):
+        """Test that cancelling an unknown id is ignored."""
+        dispatcher = server.ToolCallDispatcher(
+            max_workers=1, writer=lambda response: None)
+
+        assert dispatcher.cancel(99) is False
+        dispatcher.shutdown()
+
+
+class TestHandleToolsCall:
+    """Test cases for handle_tools_call function."""
+
+    @patch('app_store_connect_api.app_store_instance')
+    def test_dispatches_through_registry(self, mock_app_store):
+        """Test that a known tool is called with mapped arguments."""
+        mock_app_store.get_builds.return_value = {"data": []}
+
+        response = server.handle_tools_call({
+            "id": 1,
+            "params": {"name": "app-store-connect/list-builds",
+                       "arguments": {"bundleId": "com.example"}}})
+
+        mock_app_store.get_builds.assert_called_once_with("com.example")
+        assert response["result"]["content"][0]["type"] == "text"
+
+    @patch('app_store_connect_api.app_store_instance')
+    def test_fields_argument_projects_result(self, mock_app_store):
+        """Test that the fields argument selects attributes and is not passed on."""
+        mock_app_store.list_apps.return_value = {
+            "data": [{"type": "apps", "id": "1",
+                      "attributes": {"name": "App", "sku": "SKU"},
+                      "links": {"self": "https://example.com/apps/1"}}],
+            "links": {"self": "https://example.com/apps"}}
+
+        response = server.handle_tools_call({
+            "id": 5,
+            "params": {"name": "app-store-connect/list-apps",
+                       "arguments": {"fields": ["name"]}}})
+
+        mock_app_store.list_apps.assert_called_once_with()
+        assert json.loads(response["result"]["content"][0]["text"]) == {
+            "data": [{"type": "apps", "id": "1", "attributes": {"name": "App"}}]}
+
+    def test_unknown_tool(self):
+        """Test that an unknown tool returns a method-not-found error."""
+        response = server.handle_tools_call({
+            "id": 2, "params": {"name": "app-store-connect/nope"}})
+
+        assert response["error"]["code"] == -32601
+
+    def test_missing_required_argument(self):
+        """Test that schema validation rejects a call before it runs."""
+        response = server.handle_tools_call({
+            "id": 3, "params": {"name": "app-store-connect/list-beta-testers",
+                                "arguments": {"bundleId": "com.example"}}})
+
+        assert response["error"] == {
+            "code": -32602, "message": "Invalid params: groupId is required."}
+
+    def test_tools_list_lists_every_registered_tool(self):
+        """Test that tools/list is served from the registry."""
+        response = json.loads(server.handle_tools_list({"id": 4}))
+
+        names = [tool["name"] for tool in response["result"]["tools"]]
+        assert names == server.api.registry.names()
+        assert "app-store-connect/release-version" in names
+
+
+@patch('app_store_connect_server.write_message')
+def test_send_watch_notification(mock_write):
+    """Test that a watch state change is sent as an MCP log notification."""
+    event = {"watchId": 1, "kind": "version", "label": "com.example 1.0",
+             "from": "WAITING_FOR_REVIEW", "to": "IN_REVIEW", "done": True}
+
+    server.send_watch_notification(event)
+
+    mock_write.assert_called_once_with({
+        "jsonrpc": "2.0",
+        "method": "notifications/message",
+        "params": {"level": "notice", "logger": "app-store-connect/watch", "data": event},
+    })
+
+
+@patch('app_store_connect_server.write_message')
+@patch.dict(server.client_log_level, {"level": "debug"})
+def test_log_level_filters_watch_notifications(mock_write):
+    """Test that logging/setLevel drops watch notifications below the level."""
+    response = server.handle_logging_set_level(
+        {"id": 5, "params": {"level": "notice"}})
+
+    server.send_watch_notification({"watchId": 1, "from": None, "to": "IN_REVIEW"})
+    server.send_watch_notification({"watchId": 1, "from": "IN_REVIEW", "to": "APPROVED"})
+
+    assert response == {"jsonrpc": "2.0", "id": 5, "result": {}}
+    assert mock_write.call_count == 1
+    assert mock_write.call_args.args[0]["params"]["level"] == "notice"
+
+
+def test_unknown_log_level():
+    """Test that an unknown level is rejected as an invalid parameter."""
+    response = server.handle_logging_set_level({"id": 6, "params": {"level": "loud"}})
+
+    assert response["error"]["code"] == -32602
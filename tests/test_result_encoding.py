@@ -0,0 +1,173 @@
+"""Unit tests for result_encoding module."""
+import copy
+import json
+from unittest.mock import patch
+import pytest
+import result_encoding
+from result_encoding import ResultEncoder, dumps, project
+
+BUILDS = {
+    "data": [{
+        "type": "builds",
+        "id": "b1",
+        "attributes": {"version": "42", "processingState": "VALID", "expired": False},
+        "relationships": {
+            "app": {"links": {"self": "https://example.com/app"}},
+            "preReleaseVersion": {
+                "data": {"type": "preReleaseVersions", "id": "p1"},
+                "links": {"related": "https://example.com/prv"},
+            },
+            "betaGroups": {"data": [], "links": {"self": "https://example.com/bg"}},
+        },
+        "links": {"self": "https://example.com/builds/b1"},
+    }],
+    "included": [{
+        "type": "preReleaseVersions",
+        "id": "p1",
+        "attributes": {"version": "1.2.3", "platform": "IOS"},
+        "links": {"self": "https://example.com/prv/p1"},
+    }],
+    "links": {"self": "https://example.com/builds"},
+    "meta": {"paging": {"total": 1}},
+}
+
+
+class TestProject:
+    """Test cases for project function."""
+
+    def test_strips_links_and_unlisted_relationships(self):
+        """Test the default projection of a JSON:API document."""
+        projected = project(BUILDS, relationships=("preReleaseVersion",))
+
+        assert "links" not in projected
+        assert projected["meta"] == BUILDS["meta"]
+        assert projected["data"][0] == {
+            "type": "builds",
+            "id": "b1",
+            "attributes": BUILDS["data"][0]["attributes"],
+            "relationships": {
+                "preReleaseVersion": {"data": {"type": "preReleaseVersions", "id": "p1"}},
+            },
+        }
+        assert projected["included"][0] == {
+            "type": "preReleaseVersions",
+            "id": "p1",
+            "attributes": {"version": "1.2.3", "platform": "IOS"},
+        }
+
+    def test_fields_select_attributes(self):
+        """Test that fields keep only the named attributes."""
+        projected = project(BUILDS, fields=frozenset({"version"}))
+
+        assert projected["data"][0]["attributes"] == {"version": "42"}
+        assert "relationships" not in projected["data"][0]
+        assert projected["included"][0]["attributes"] == {"version": "1.2.3"}
+
+    def test_single_resource(self):
+        """Test that a document with one resource is projected."""
+        projected = project({"data": BUILDS["data"][0]})
+
+        assert "links" not in projected["data"]
+
+    def test_bare_resource(self):
+        """Test that fields apply to a tool result that is a resource itself."""
+        projected = project(BUILDS["data"][0], fields=frozenset({"version"}))
+
+        assert projected == {"type": "builds", "id": "b1", "attributes": {"version": "42"}}
+
+    def test_list_of_resources(self):
+        """Test that fields apply to each resource of a list result."""
+        projected = project(BUILDS["data"] + ["other"], fields=frozenset({"expired"}))
+
+        assert projected[0]["attributes"] == {"expired": False}
+        assert projected[1] == "other"
+
+    def test_does_not_modify_input(self):
+        """Test that shared parsed responses are left untouched."""
+        original = copy.deepcopy(BUILDS)
+
+        project(BUILDS, fields=frozenset({"version"}))
+
+        assert BUILDS == original
+
+    @pytest.mark.parametrize("result", [
+        {"error": "App not found"},
+        ({"error": "Missing"}, 400),
+        {"productData": [{"metrics": []}]},
+    ])
+    def test_other_results_pass_through(self, result):
+        """Test that results which are not JSON:API documents are unchanged."""
+        assert project(result) is result
+
+
+class TestDumps:
+    """Test cases for dumps function."""
+
+    @pytest.mark.parametrize("backend", [None, result_encoding.orjson])
+    def test_compact(self, backend):
+        """Test compact encoding with and without orjson."""
+        with patch.object(result_encoding, "orjson", backend):
+            assert dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+
+    def test_pretty(self):
+        """Test that pretty mode matches the previous indented output."""
+        with patch.object(result_encoding, "orjson", None):
+            assert dumps({"a": 1}, pretty=True) == json.dumps({"a": 1}, indent=2)
+
+
+class TestResultEncoder:
+    """Test cases for ResultEncoder class."""
+
+    def test_encode_projects_and_compacts(self):
+        """Test that the encoded text is the compact projected document."""
+        encoder = ResultEncoder({"tool": ("preReleaseVersion",)}, mode="compact",
+                                project_results=True, sample_every=1)
+
+        text = encoder.encode("tool", BUILDS)
+
+        assert json.loads(text) == project(BUILDS, ("preReleaseVersion",))
+        assert "\n" not in text
+
+    def test_fields_apply_without_default_projection(self):
+        """Test that explicit fields are honoured even with projections off."""
+        encoder = ResultEncoder(mode="compact", project_results=False, sample_every=1)
+
+        data = json.loads(encoder.encode("tool", BUILDS, ["expired"]))["data"]
+
+        assert data[0]["attributes"] == {"expired": False}
+
+    def test_raw_result_when_projection_disabled(self):
+        """Test that projections can be turned off."""
+        encoder = ResultEncoder(mode="compact", project_results=False, sample_every=1)
+
+        assert json.loads(encoder.encode("tool", BUILDS)) == BUILDS
+
+    def test_stats_measure_reduction_on_sampled_calls(self):
+        """Test that the size reduction is measured every Nth call."""
+        encoder = ResultEncoder(mode="compact", project_results=True, sample_every=2)
+
+        for _ in range(3):
+            encoder.encode("tool", BUILDS)
+
+        stats = encoder.stats()["tools"]["tool"]
+        sent = len(encoder.encode("other", BUILDS))
+        assert stats["calls"] == 3
+        assert stats["bytes_sent"] == 3 * sent
+        assert stats["sampled_calls"] == 2
+        assert stats["sampled_raw_bytes"] == 2 * len(json.dumps(BUILDS, indent=2))
+        assert 0 < stats["reduction"] < 1
+
+    @pytest.mark.parametrize("backend", [None, result_encoding.orjson])
+    def test_stats_count_utf8_bytes(self, backend):
+        """Test that non-ASCII text is counted in bytes, not characters."""
+        encoder = ResultEncoder(mode="compact", project_results=False, sample_every=1)
+
+        with patch.object(result_encoding, "orjson", backend):
+            text = encoder.encode("tool", {"name": "Café ☕"})
+
+        assert encoder.stats()["tools"]["tool"]["bytes_sent"] == len(text.encode("utf-8"))
+
+    def test_invalid_mode(self):
+        """Test that an unknown encoding mode is rejected."""
+        with pytest.raises(ValueError):
+            ResultEncoder(mode="binary")
@@ -0,0 +1,125 @@
+"""Unit tests for server_logging module."""
+import logging
+import queue
+from unittest.mock import Mock, patch
+import pytest
+from server_logging import (
+    DroppingQueueHandler, PayloadLogger, dropped_records, setup_logging, stop_listener)
+
+
+class TestPayloadLogger:
+    """Test cases for PayloadLogger class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.logger = Mock()
+        self.logger.isEnabledFor.return_value = True
+
+    def test_off_logs_nothing(self):
+        """Test that payload logging can be disabled entirely."""
+        PayloadLogger(mode="off", logger=self.logger).log("Sent", "x" * 10)
+
+        self.logger.info.assert_not_called()
+
+    def test_truncate_keeps_prefix(self):
+        """Test that long payloads are cut to max_chars."""
+        PayloadLogger(mode="truncate", max_chars=4, sample_rate=1,
+                      logger=self.logger).log("Sent", "abcdefgh")
+
+        self.logger.info.assert_called_once_with(
+            "%s: %r... (%d of %d chars)", "Sent", "abcd", 4, 8)
+
+    def test_short_payload_is_logged_whole(self):
+        """Test that payloads under the limit are not marked as truncated."""
+        PayloadLogger(mode="truncate", max_chars=100, sample_rate=1,
+                      logger=self.logger).log("Sent", "abc")
+
+        self.logger.info.assert_called_once_with("%s: %r", "Sent", "abc")
+
+    def test_full_mode(self):
+        """Test that full mode ignores max_chars."""
+        PayloadLogger(mode="full", max_chars=2, sample_rate=1,
+                      logger=self.logger).log("Sent", "abcdef")
+
+        self.logger.info.assert_called_once_with("%s: %r", "Sent", "abcdef")
+
+    @patch("server_logging.random.random")
+    def test_sampling(self, mock_random):
+        """Test that only the sampled fraction of payloads is logged."""
+        payload_log = PayloadLogger(mode="full", sample_rate=0.25, logger=self.logger)
+
+        mock_random.return_value = 0.5
+        payload_log.log("Sent", "skipped")
+        mock_random.return_value = 0.1
+        payload_log.log("Sent", "kept")
+
+        self.logger.info.assert_called_once_with("%s: %r", "Sent", "kept")
+
+    def test_disabled_level_skips_work(self):
+        """Test that nothing is formatted when INFO is filtered out."""
+        self.logger.isEnabledFor.return_value = False
+
+        PayloadLogger(mode="full", logger=self.logger).log("Sent", "abc")
+
+        self.logger.info.assert_not_called()
+
+    def test_invalid_mode(self):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            PayloadLogger(mode="sometimes")
+
+
+def test_dropping_queue_handler_never_blocks():
+    """Test that a full queue drops records instead of blocking the caller."""
+    handler = DroppingQueueHandler(queue.Queue(1))
+    record = logging.makeLogRecord({"msg": "hello"})
+
+    handler.handle(record)
+    handler.handle(record)
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_setup_logging_writes_through_listener(tmp_path):
+    """Test that records reach the rotating log file via the background thread."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    log_file = tmp_path / "server.log"
+    try:
+        listener = setup_logging(log_file, level="INFO", stderr_level="CRITICAL")
+        logging.debug("not written")
+        logging.info("written")
+        stop_listener(listener)
+    finally:
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+    contents = log_file.read_text()
+    assert "INFO - written" in contents
+    assert "not written" not in contents
+
+
+def test_dropped_records_reported_at_shutdown(tmp_path):
+    """Test that records lost to a full queue are counted in the log on shutdown."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    log_file = tmp_path / "server.log"
+    try:
+        listener = setup_logging(log_file, level="INFO", stderr_level="CRITICAL")
+        queue_handler = next(handler for handler in root.handlers
+                             if isinstance(handler, DroppingQueueHandler))
+        queue_handler.dropped = 3
+        assert dropped_records() == 3
+        stop_listener(listener)
+    finally:
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+    assert "WARNING - 3 log records were dropped" in log_file.read_text()
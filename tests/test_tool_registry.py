@@ -0,0 +1,102 @@
+"""Unit tests for tool_registry module."""
+import json
+import pytest
+from tool_registry import (
+    InvalidParams, Param, ToolNotFound, ToolRegistry, compile_schema)
+
+
+class TestCompileSchema:
+    """Test cases for compile_schema function."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.validate = compile_schema({
+            "type": "object",
+            "properties": {
+                "bundleId": {"type": "string"},
+                "limit": {"type": "integer", "minimum": 1},
+                "rating": {"type": "integer", "minimum": 1, "maximum": 5},
+                "mode": {"type": "string", "enum": ["compact", "pretty"]},
+                "emails": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["bundleId"],
+        })
+
+    def test_valid_arguments(self):
+        """Test that matching arguments pass, including undeclared ones."""
+        self.validate({"bundleId": "com.example", "limit": 3, "extra": True})
+
+    @pytest.mark.parametrize("args, message", [
+        ({}, "bundleId is required"),
+        ({"bundleId": ""}, "bundleId is required"),
+        ({"bundleId": "x", "limit": "3"}, "limit must be of type integer"),
+        ({"bundleId": "x", "limit": True}, "limit must be of type integer"),
+        ({"bundleId": "x", "limit": -3}, "limit must be at least 1"),
+        ({"bundleId": "x", "rating": 9}, "rating must be at most 5"),
+        ({"bundleId": "x", "mode": "raw"}, "mode must be one of compact, pretty"),
+        ({"bundleId": "x", "emails": ["a", 1]}, "every item of emails"),
+        ([], "arguments must be an object"),
+    ])
+    def test_invalid_arguments(self, args, message):
+        """Test that mismatched arguments raise InvalidParams."""
+        with pytest.raises(InvalidParams, match=message):
+            self.validate(args)
+
+
+class TestToolRegistry:
+    """Test cases for ToolRegistry class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.registry = ToolRegistry()
+
+        @self.registry.tool(
+            "test/create-group", "Create a group",
+            name=Param("group_name", "string", "Group name", required=True),
+            bundleId=Param("bundle_id", "string", "Bundle ID"))
+        def create_group(group_name, bundle_id="default"):
+            return {"name": group_name, "bundle": bundle_id}
+
+    def test_call_maps_arguments(self):
+        """Test that schema names are mapped to Python argument names."""
+        assert self.registry.call(
+            "test/create-group", {"name": "QA", "bundleId": "com.example"}) == {
+                "name": "QA", "bundle": "com.example"}
+
+    def test_call_leaves_defaults_for_missing_optionals(self):
+        """Test that omitted optional arguments fall back to function defaults."""
+        assert self.registry.call("test/create-group", {"name": "QA"}) == {
+            "name": "QA", "bundle": "default"}
+
+    def test_unknown_tool(self):
+        """Test that an unknown tool name raises ToolNotFound."""
+        with pytest.raises(ToolNotFound):
+            self.registry.call("test/missing", {})
+
+    def test_tools_list_is_encoded_once(self):
+        """Test that tools/list is serialized once and reused with any id."""
+        first = self.registry.tools_list_json()
+
+        assert self.registry.tools_list_json() is first
+        response = json.loads(self.registry.tools_list_response("abc"))
+        assert response["id"] == "abc"
+        assert response["result"]["tools"] == [{
+            "name": "test/create-group",
+            "description": "Create a group",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Group name"},
+                    "bundleId": {"type": "string", "description": "Bundle ID"},
+                },
+                "required": ["name"],
+            },
+        }]
+
+    def test_register_invalidates_cached_list(self):
+        """Test that adding a tool refreshes the cached tools/list payload."""
+        self.registry.tools_list_json()
+
+        self.registry.tool("test/other", "Other")(lambda: None)
+
+        assert "test/other" in self.registry.tools_list_json()
@@ -0,0 +1,174 @@
+"""Declarative registry of the MCP tools exposed by the server.
+
+Each tool is declared once, next to the function that implements it, with
+its description and parameters. The registry dispatches calls with a dict
+lookup, validates arguments with checks compiled when the tool is
+registered, and serializes the tools/list payload only once.
+"""
+import json
+
+_TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+}
+
+
+class ToolNotFound(LookupError):
+    """Raised when a tools/call names a tool that is not registered."""
+
+
+class InvalidParams(ValueError):
+    """Raised when tool arguments do not match the tool's input schema."""
+
+
+class Param:  # pylint: disable=too-few-public-methods
+    """A tool parameter: its JSON schema and the Python argument it maps to."""
+
+    def __init__(self, arg: str, schema_type: str, description: str,
+                 required: bool = False, **schema):
+        self.arg = arg
+        self.required = required
+        self.schema = {"type": schema_type, "description": description, **schema}
+
+
+def compile_schema(schema: dict):
+    """Turn an object input schema into a validation function.
+
+    Only the subset of JSON Schema the tools use is supported: property
+    types, ``enum``, ``minimum``/``maximum``, array ``items`` types and
+    ``required``. Properties that
+    are not declared are allowed, since older clients may still send them.
+    """
+    required = tuple(schema.get("required", ()))
+    checks = []
+    for name, prop in schema.get("properties", {}).items():
+        items_type = prop.get("items", {}).get("type")
+        checks.append((
+            name,
+            prop["type"],
+            _TYPE_CHECKS[prop["type"]],
+            frozenset(prop["enum"]) if "enum" in prop else None,
+            _TYPE_CHECKS[items_type] if items_type else None,
+            (prop.get("minimum"), prop.get("maximum")),
+        ))
+
+    def validate(args):
+        if not isinstance(args, dict):
+            raise InvalidParams("Invalid params: arguments must be an object.")
+        missing = [name for name in required if args.get(name) in (None, "")]
+        if missing:
+            raise InvalidParams(
+                f"Invalid params: {', '.join(missing)} "
+                f"{'is' if len(missing) == 1 else 'are'} required.")
+        for name, type_name, check, enum, item_check, (low, high) in checks:
+            value = args.get(name)
+            if value is None:
+                continue
+            if not check(value):
+                raise InvalidParams(f"Invalid params: {name} must be of type {type_name}.")
+            if enum is not None and value not in enum:
+                raise InvalidParams(
+                    f"Invalid params: {name} must be one of {', '.join(sorted(enum))}.")
+            if low is not None and value < low:
+                raise InvalidParams(f"Invalid params: {name} must be at least {low}.")
+            if high is not None and value > high:
+                raise InvalidParams(f"Invalid params: {name} must be at most {high}.")
+            if item_check is not None and not all(item_check(item) for item in value):
+                raise InvalidParams(f"Invalid params: every item of {name} has the wrong type.")
+
+    return validate
+
+
+class Tool:  # pylint: disable=too-few-public-methods
+    """A registered tool."""
+
+    def __init__(self, name, description, params, function, common=None):
+        self.name = name
+        self.description = description
+        self.function = function
+        self.arg_names = {key: param.arg for key, param in params.items()}
+        # Common parameters are validated and listed but read by the caller,
+        # not passed to the function.
+        params = {**(common or {}), **params}
+        self.input_schema = {
+            "type": "object",
+            "properties": {key: param.schema for key, param in params.items()},
+        }
+        required = [key for key, param in params.items() if param.required]
+        if required:
+            self.input_schema["required"] = required
+        self.validate = compile_schema(self.input_schema)
+
+    def call(self, args):
+        """Validate ``args`` and call the tool function with Python argument names."""
+        self.validate(args)
+        return self.function(**{
+            self.arg_names[key]: value for key, value in args.items()
+            if key in self.arg_names and value is not None})
+
+    def describe(self):
+        """Return the tools/list entry for this tool."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "inputSchema": self.input_schema,
+        }
+
+
+class ToolRegistry:
+    """Maps tool names to their functions and schemas."""
+
+    def __init__(self, **common):
+        """Keyword arguments are parameters every tool accepts, such as ``fields``."""
+        self.common = common
+        self._tools = {}
+        self._tools_list_json = None
+
+    def tool(self, tool_name: str, tool_description: str, /, **params):
+        """Decorator registering a function as the tool ``tool_name``.
+
+        Keyword arguments are the tool's parameters, keyed by their name in
+        the MCP schema (a parameter may be called ``name``), with ``Param``
+        values naming the Python argument.
+        """
+        def decorator(function):
+            self.register(
+                Tool(tool_name, tool_description, params, function, self.common))
+            return function
+        return decorator
+
+    def register(self, tool: Tool):
+        """Add a tool, replacing any tool with the same name."""
+        self._tools[tool.name] = tool
+        self._tools_list_json = None
+
+    def get(self, name: str):
+        """Return the tool registered as ``name``, or None."""
+        return self._tools.get(name)
+
+    def names(self):
+        """Return the registered tool names in registration order."""
+        return list(self._tools)
+
+    def call(self, name: str, args: dict):
+        """Look up, validate and run a tool."""
+        tool = self._tools.get(name)
+        if tool is None:
+            raise ToolNotFound(name)
+        return tool.call(args if args is not None else {})
+
+    def tools_list_json(self):
+        """Return the serialized ``tools/list`` result, encoding it only once."""
+        if self._tools_list_json is None:
+            self._tools_list_json = json.dumps(
+                {"tools": [tool.describe() for tool in self._tools.values()]})
+        return self._tools_list_json
+
+    def tools_list_response(self, request_id):
+        """Return the complete pre-encoded ``tools/list`` JSON-RPC response."""
+        return (f'{{"jsonrpc": "2.0", "id": {json.dumps(request_id)}, '
+                f'"result": {self.tools_list_json()}}}')